@@ -2,8 +2,9 @@ from fastapi import APIRouter, Depends
 from app.schemas.analysis_schemas import PlacementSuggestionsResponse, BuildabilityResponse
 from app.models.placement import PlacementModel
 from app.core.deps import get_placement_model
+from app.core.metrics import TimedRoute
 
-router = APIRouter(prefix="/api/analysis", tags=["analysis"])
+router = APIRouter(prefix="/api/analysis", tags=["analysis"], route_class=TimedRoute)
 
 
 @router.post("/optimal-placement", response_model=PlacementSuggestionsResponse)
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
 from app.schemas.elevation_schemas import ContourResponse
-from app.models.elevation import ElevationModel
+from app.models.elevation import ContourOutput, ElevationModel
 from app.core.deps import get_elevation_model
+from app.core.metrics import TimedRoute
+from app.core.responses import FastJSONResponse
 
-router = APIRouter(prefix="/api/elevation", tags=["elevation"])
+router = APIRouter(prefix="/api/elevation", tags=["elevation"], route_class=TimedRoute)
 
 
 @router.get("/contours", response_model=ContourResponse)
@@ -12,10 +15,16 @@ def get_contours(
     lon: float,
     radius_m: float = 500,
     interval_m: float = 2,
+    zoom: Optional[float] = Query(None, ge=0, le=24, description="Map zoom; simplify and quantize to its pixel size"),
+    tolerance_m: Optional[float] = Query(None, ge=0, description="Simplification tolerance (m); overrides zoom"),
+    precision: Optional[int] = Query(None, ge=0, le=10, description="Coordinate decimals; overrides zoom"),
     model: ElevationModel = Depends(get_elevation_model),
 ):
-    contours = model.get_contours(lat, lon, radius_m, interval_m)
-    return ContourResponse.from_domain(contours)
+    output = ContourOutput.for_request(lat, zoom, tolerance_m, precision)
+    contours = model.get_contours(lat, lon, radius_m, interval_m, output)
+    return FastJSONResponse(
+        {"type": contours.type, "features": contours.features, "properties": contours.properties}
+    )
 
 
 @router.get("/contours/bbox", response_model=ContourResponse)
@@ -25,8 +34,14 @@ def get_contours_for_bbox(
     maxx: float,
     maxy: float,
     interval_m: float = 5.0,
+    zoom: Optional[float] = Query(None, ge=0, le=24, description="Map zoom; simplify and quantize to its pixel size"),
+    tolerance_m: Optional[float] = Query(None, ge=0, description="Simplification tolerance (m); overrides zoom"),
+    precision: Optional[int] = Query(None, ge=0, le=10, description="Coordinate decimals; overrides zoom"),
     model: ElevationModel = Depends(get_elevation_model),
 ):
     """Generate contours for a bounding box region with jet colormap values."""
-    contours = model.get_contours_for_bbox(minx, miny, maxx, maxy, interval_m)
-    return ContourResponse.from_domain(contours)
+    output = ContourOutput.for_request((miny + maxy) / 2.0, zoom, tolerance_m, precision)
+    contours = model.get_contours_for_bbox(minx, miny, maxx, maxy, interval_m, output)
+    return FastJSONResponse(
+        {"type": contours.type, "features": contours.features, "properties": contours.properties}
+    )
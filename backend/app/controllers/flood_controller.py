@@ -2,8 +2,10 @@ from fastapi import APIRouter, Depends
 from app.schemas.analysis_schemas import FloodZoneResponse
 from app.models.flood_risk import FloodRiskModel
 from app.core.deps import get_flood_risk_model
+from app.core.metrics import TimedRoute
+from app.core.responses import FastJSONResponse
 
-router = APIRouter(prefix="/api/flood", tags=["flood"])
+router = APIRouter(prefix="/api/flood", tags=["flood"], route_class=TimedRoute)
 
 
 @router.get("/zones", response_model=FloodZoneResponse)
@@ -15,7 +17,7 @@ def get_flood_zones(
     model: FloodRiskModel = Depends(get_flood_risk_model),
 ):
     zones = model.get_flood_zones(minx, miny, maxx, maxy)
-    return FloodZoneResponse.from_domain(zones)
+    return FastJSONResponse({"type": zones.type, "features": zones.features})
 
 
 @router.get("/point")
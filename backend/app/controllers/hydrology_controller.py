@@ -1,23 +1,121 @@
-from fastapi import APIRouter, Depends, Query
-from app.schemas.hydrology_schemas import WatershedGridResponse
-from app.models.watershed import WatershedModel
+from typing import Literal, Union
+from fastapi import APIRouter, Depends, Query, Response
+from app.core import raster_encoding
+from app.core.parallel import run_in_compute_thread
+from app.core.responses import FastJSONResponse, NDJSONResponse
+from app.schemas.hydrology_schemas import (
+    WatershedBatchRequest,
+    WatershedBatchResponse,
+    WatershedGridResponse,
+    WatershedRasterResponse,
+)
+from app.models.watershed import WatershedModel, WatershedRaster
 from app.core.deps import get_watershed_model
+from app.core.metrics import TimedRoute, timed
 
-router = APIRouter(prefix="/api/hydrology", tags=["hydrology"])
+router = APIRouter(prefix="/api/hydrology", tags=["hydrology"], route_class=TimedRoute)
 
 
 @router.get("/watershed/grid", response_model=WatershedGridResponse)
-def get_watershed_grid(
+async def get_watershed_grid(
     minx: float,
     miny: float,
     maxx: float,
     maxy: float,
     grid_spacing_m: float = Query(100.0, ge=50, le=1000),
+    condition_dem: bool = False,
     model: WatershedModel = Depends(get_watershed_model),
 ):
     """
     Compute watershed area and time of concentration for a grid of points within the bbox.
     Returns GeoJSON FeatureCollection with normalized values for heatmap display.
+    With condition_dem, depressions are filled and flats resolved before flow routing.
     """
-    grid = model.compute_watershed_grid(minx, miny, maxx, maxy, grid_spacing_m)
-    return WatershedGridResponse.from_features(grid.features, grid.metadata)
+    grid = await model.compute_watershed_grid_async(minx, miny, maxx, maxy, grid_spacing_m, condition_dem)
+    # Built without validating every feature; response_model still documents the shape
+    return FastJSONResponse({"type": "FeatureCollection", "features": grid.features, "metadata": grid.metadata})
+
+
+@router.get(
+    "/watershed/grid/stream",
+    response_class=NDJSONResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}}},
+)
+async def stream_watershed_grid(
+    minx: float,
+    miny: float,
+    maxx: float,
+    maxy: float,
+    grid_spacing_m: float = Query(100.0, ge=50, le=1000),
+    condition_dem: bool = False,
+    model: WatershedModel = Depends(get_watershed_model),
+):
+    """
+    The watershed grid as newline-delimited JSON: one GeoJSON Feature per grid point with
+    raw area_ha and tc_min, sent as each chunk of points is evaluated, then a final
+    {"type": "Metadata", "metadata": {...}} line with the min/max values for normalization
+    (or the error).
+    """
+    records = await model.stream_watershed_grid_async(minx, miny, maxx, maxy, grid_spacing_m, condition_dem)
+    return NDJSONResponse(records)
+
+
+@timed("raster_encode")
+def _encode_raster(
+    raster: WatershedRaster, encoding: str, mode: str
+) -> Union[WatershedRasterResponse, Response]:
+    """Response body for get_watershed_grid_raster; CPU-bound, so run off the event loop."""
+    if encoding in ("float32", "uint8") or not raster.bands:
+        return WatershedRasterResponse.from_domain(raster, "uint8" if encoding == "uint8" else "float32")
+    if encoding == "cog":
+        return Response(raster_encoding.encode_geotiff(raster.bands, raster.transform), media_type="image/tiff")
+    rgba = raster_encoding.jet_rgba(raster.bands[f"jet_value_{mode}"])
+    headers = {"X-Raster-Transform": ",".join(f"{v:.10g}" for v in raster.transform)}
+    return Response(raster_encoding.encode_png(rgba), media_type="image/png", headers=headers)
+
+
+@router.get(
+    "/watershed/grid/raster",
+    response_model=WatershedRasterResponse,
+    responses={200: {"content": {"image/tiff": {}, "image/png": {}}}},
+)
+async def get_watershed_grid_raster(
+    minx: float,
+    miny: float,
+    maxx: float,
+    maxy: float,
+    grid_spacing_m: float = Query(100.0, ge=50, le=1000),
+    condition_dem: bool = False,
+    encoding: Literal["float32", "uint8", "cog", "png"] = "float32",
+    mode: Literal["area", "tc"] = "area",
+    model: WatershedModel = Depends(get_watershed_model),
+):
+    """
+    The watershed grid as rasters with one cell per grid point instead of GeoJSON rectangles.
+    float32/uint8 return JSON with base64 area_ha, tc_min, jet_value_area and jet_value_tc
+    bands; cog returns the four bands as a Cloud-Optimized GeoTIFF; png returns the jet
+    colormap of mode's jet value with transparent nodata, georeferenced by the
+    X-Raster-Transform header.
+    """
+    raster = await model.compute_watershed_raster_async(minx, miny, maxx, maxy, grid_spacing_m, condition_dem)
+    return await run_in_compute_thread(_encode_raster, raster, encoding, mode)
+
+
+@router.post("/watershed/batch", response_model=WatershedBatchResponse)
+async def delineate_watershed_batch(
+    request: WatershedBatchRequest,
+    model: WatershedModel = Depends(get_watershed_model),
+):
+    """
+    Delineate the watershed of every pour point from one shared DEM and flow grid.
+    Returns one feature per point, in request order, with area, Tc and outlet.
+    """
+    watersheds = await model.delineate_watersheds_async(
+        [(p.lat, p.lon) for p in request.points],
+        radius_m=request.radius_m,
+        condition_dem=request.condition_dem,
+        simplify_tolerance_m=request.simplify_tolerance_m,
+    )
+    return FastJSONResponse(
+        {"type": watersheds.type, "features": watersheds.features, "properties": watersheds.properties or {}}
+    )
@@ -0,0 +1,55 @@
+from typing import List
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.config import settings
+from app.core.deps import get_vector_tile_model
+from app.core.metrics import ROUTING_CACHE, gauge_lines, render_metrics
+from app.data.dem_cache import get_dem_tile_cache
+from app.data.singleflight import fetch_coalescer
+
+router = APIRouter(tags=["metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _cache_lines() -> List[str]:
+    """DEM tile cache, routing cache, vector tile cache and fetch coalescing stats, read at scrape time."""
+    lines = []
+    if settings.dem_cache_enabled:
+        stats = get_dem_tile_cache().stats()
+        events = ("memory_hits", "disk_hits", "misses", "evictions", "disk_evictions")
+        lines += gauge_lines(
+            "watershed_dem_cache_events_total", "DEM tile cache lookups and evictions.",
+            [({"event": e}, stats[e]) for e in events], kind="counter",
+        )
+        lines += gauge_lines("watershed_dem_cache_hit_ratio", "DEM tile cache hits per lookup.", [({}, stats["hit_ratio"])])
+        lines += gauge_lines("watershed_dem_cache_memory_bytes", "DEM tiles held in memory.", [({}, stats["memory_bytes"])])
+    hits, misses = ROUTING_CACHE.get("hit"), ROUTING_CACHE.get("miss")
+    lines += gauge_lines(
+        "watershed_routing_cache_hit_ratio", "Routing products cache hits per lookup.",
+        [({}, hits / (hits + misses) if hits + misses else 0.0)],
+    )
+    tiles = get_vector_tile_model().cache.stats()
+    lines += gauge_lines(
+        "watershed_tile_cache_events_total", "Rendered vector tile cache lookups and evictions.",
+        [({"event": e}, tiles[e]) for e in ("hits", "misses", "evictions")], kind="counter",
+    )
+    lines += gauge_lines("watershed_tile_cache_bytes", "Rendered vector tiles held in memory.", [({}, tiles["bytes"])])
+    coalesced = fetch_coalescer.stats()
+    lines += gauge_lines(
+        "watershed_upstream_calls_total", "Upstream fetches made per service.",
+        [({"service": k}, v) for k, v in sorted(coalesced["executed"].items())], kind="counter",
+    )
+    lines += gauge_lines(
+        "watershed_upstream_coalesced_total", "Duplicate fetches served by an in-flight call, per service.",
+        [({"service": k}, v) for k, v in sorted(coalesced["saved"].items())], kind="counter",
+    )
+    return lines
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    """Prometheus text exposition: stage and request latency histograms, errors and cache stats."""
+    return PlainTextResponse(render_metrics(_cache_lines()), media_type=PROMETHEUS_CONTENT_TYPE)
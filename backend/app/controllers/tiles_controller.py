@@ -0,0 +1,62 @@
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, Response
+from app.core import mvt
+from app.core.config import settings
+from app.core.deps import get_vector_tile_model
+from app.core.metrics import TimedRoute
+from app.models.tiles import VectorTileModel
+
+router = APIRouter(prefix="/api/tiles", tags=["tiles"], route_class=TimedRoute)
+
+
+def _etag_matches(etag: str, if_none_match: str) -> bool:
+    """If-None-Match is "*" or a comma-separated list of entity tags, compared weakly."""
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+
+
+def _tile_response(request: Request, model: VectorTileModel, layer: str, z: int, x: int, y: int, **params) -> Response:
+    # Only a tile outside the z grid is "not found"; rendering errors are server errors
+    if x >= 2 ** z or y >= 2 ** z:
+        raise HTTPException(status_code=404, detail=f"Tile {z}/{x}/{y} is outside the grid")
+    tile = model.get_tile(layer, z, x, y, **params)
+    headers = {"ETag": tile.etag, "Cache-Control": f"public, max-age={settings.tile_max_age_s}"}
+    if _etag_matches(tile.etag, request.headers.get("if-none-match", "")):
+        return Response(status_code=304, headers=headers)
+    return Response(content=tile.data, media_type=mvt.MEDIA_TYPE, headers=headers)
+
+
+@router.get("/contours/{z}/{x}/{y}.mvt", response_class=Response)
+def get_contour_tile(
+    request: Request,
+    z: int = Path(..., ge=0, le=24),
+    x: int = Path(..., ge=0),
+    y: int = Path(..., ge=0),
+    interval_m: float = Query(5.0, gt=0),
+    model: VectorTileModel = Depends(get_vector_tile_model),
+):
+    """Contour lines (elevation, jet_value) simplified and clipped to the tile."""
+    return _tile_response(request, model, "contours", z, x, y, interval_m=interval_m)
+
+
+@router.get("/watershed/{z}/{x}/{y}.mvt", response_class=Response)
+def get_watershed_tile(
+    request: Request,
+    z: int = Path(..., ge=0, le=24),
+    x: int = Path(..., ge=0),
+    y: int = Path(..., ge=0),
+    model: VectorTileModel = Depends(get_vector_tile_model),
+):
+    """Watershed heatmap cells (area_ha, tc_min and their jet values) with spacing set by zoom."""
+    return _tile_response(request, model, "watershed", z, x, y)
+
+
+@router.get("/flood/{z}/{x}/{y}.mvt", response_class=Response)
+def get_flood_tile(
+    request: Request,
+    z: int = Path(..., ge=0, le=24),
+    x: int = Path(..., ge=0),
+    y: int = Path(..., ge=0),
+    model: VectorTileModel = Depends(get_vector_tile_model),
+):
+    """FEMA flood zone polygons clipped to the tile."""
+    return _tile_response(request, model, "flood", z, x, y)
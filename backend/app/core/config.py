@@ -10,5 +10,61 @@ class Settings(BaseSettings):
     fema_base_url: str = "https://hazards.fema.gov/gis/nfhl/rest/services/public"
     osm_base_url: str = "https://api.openstreetmap.org"
 
+    # Pooled upstream HTTP: one keep-alive pool per host; HTTP/2 is used when h2 is installed
+    http2: bool = True
+    http_max_connections_per_host: int = 20
+    http_max_keepalive_per_host: int = 10
+    http_keepalive_expiry_s: float = 30.0
+    http_connect_timeout_s: float = 5.0
+    http_timeout_s: float = 30.0
+
+    # Points evaluated per chunk when streaming the grid (each chunk is sent as it completes)
+    grid_stream_chunk_size: int = 5000
+    # Threads for CPU-bound work behind async handlers (0 = one per CPU)
+    compute_threads: int = 0
+    # Routing passes (flow accumulation, basin labels, Tc) of DEMs with at least
+    # routing_parallel_min_cells cells run side by side on this many worker processes;
+    # <= 1 computes them serially, on demand
+    routing_workers: int = 1
+    routing_parallel_min_cells: int = 1_000_000
+    # Memory bound of the per-model cache of flow grids, routing graphs and derived rasters
+    routing_cache_bytes: int = 256 * 1024 * 1024
+
+    # DEM tile cache: fetches are snapped to a fixed grid of dem_tile_size_px square tiles.
+    # The memory tier is bounded in bytes with "lru" or "fifo" eviction; the disk tier
+    # (compressed float32 .npz under dem_cache_dir, "" disables it) is pruned past its bound.
+    dem_cache_enabled: bool = True
+    dem_tile_size_px: int = 256
+    dem_cache_memory_bytes: int = 256 * 1024 * 1024
+    dem_cache_eviction: str = "lru"
+    dem_cache_dir: str = ".dem_cache"
+    dem_cache_disk_bytes: int = 2 * 1024 ** 3
+
+    # DEM resolution: pixel budget per fetch, exportImage limit per side (larger requests
+    # are split), and DEM cells per grid spacing for compute_watershed_grid
+    dem_max_pixels: int = 4_000_000
+    usgs_max_image_px: int = 4000
+    # Concurrent DEM tile/block downloads per fetch, and the deadline for each one
+    dem_fetch_concurrency: int = 8
+    dem_tile_timeout_s: float = 30.0
+    grid_dem_cells_per_spacing: float = 2.0
+
+    # DEM source for models: "usgs", or "synthetic" to run offline on generated terrain
+    # (app.core.terrain: fractal, valleys, bowls, flats or cone; same seed, same raster)
+    dem_provider: str = "usgs"
+    synthetic_terrain: str = "fractal"
+    synthetic_seed: int = 0
+    synthetic_base_m: float = 100.0
+    synthetic_relief_m: float = 100.0
+
+    # Vector tiles: rendered-tile memory bound, browser/CDN max-age, the zoom below which
+    # tiles are empty (larger areas are too costly per tile), heatmap cells across a tile
+    # and how many tile widths past each edge the heatmap's DEM reaches
+    tile_cache_bytes: int = 64 * 1024 * 1024
+    tile_max_age_s: int = 3600
+    tile_min_zoom: int = 10
+    tile_grid_cells: int = 32
+    tile_dem_margin: float = 0.5
+
 
 settings = Settings()
@@ -0,0 +1,119 @@
+"""
+Multi-level contouring: every level from one contour-generator pass, vertices transformed
+in bulk, plus vectorized simplify/quantize and bbox clipping stages.
+"""
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import shapely
+from affine import Affine
+from contourpy import LineType, contour_generator
+
+
+def contour_lines(
+    arr: np.ndarray, levels: Sequence[float], transform: Affine, min_vertices: int = 3
+) -> List[Tuple[float, np.ndarray]]:
+    """
+    (level, vertices) for each contour line of each level, in level order. vertices is an
+    (n, 2) float64 array of x, y in transform's CRS, with the transform applied to (col, row)
+    grid indices like find_contours output; closed lines repeat their first vertex. NaN
+    cells are masked. Lines with fewer than min_vertices vertices, or collapsed to a point,
+    are dropped.
+    """
+    levels = [float(level) for level in levels]
+    if not levels:
+        return []
+    z = np.ma.masked_invalid(arr) if np.isnan(arr).any() else arr
+    # One generator caches the cell classification once and traces all levels from it
+    generator = contour_generator(z=z, name="serial", line_type=LineType.ChunkCombinedOffset)
+    per_level = generator.multi_lines(levels)
+
+    # Gather every vertex of every level, transform them in one pass, then split back
+    chunks, starts, line_levels = [], [], []
+    n_points = 0
+    for level, (points, offsets) in zip(levels, per_level):
+        if points[0] is None:
+            continue
+        chunks.append(points[0])
+        starts.append(offsets[0][:-1].astype(np.int64) + n_points)
+        line_levels.extend([level] * (len(offsets[0]) - 1))
+        n_points += len(points[0])
+    if not chunks:
+        return []
+    vertices = np.concatenate(chunks)
+    cols, rows = vertices[:, 0].copy(), vertices[:, 1].copy()
+    a, b, c, d, e, f = tuple(transform)[:6]
+    vertices[:, 0] = a * cols + b * rows + c
+    vertices[:, 1] = d * cols + e * rows + f
+
+    starts = np.concatenate(starts)
+    bounds = np.append(starts, n_points)
+    # A level exactly at a local extreme traces a zero-length loop around that point
+    extent = np.maximum.reduceat(vertices, starts, axis=0) - np.minimum.reduceat(vertices, starts, axis=0)
+    keep = (np.diff(bounds) >= min_vertices) & (extent.max(axis=1) > 0)
+    return [
+        (level, vertices[start:stop])
+        for level, start, stop, ok in zip(line_levels, bounds[:-1], bounds[1:], keep)
+        if ok
+    ]
+
+
+def _linestrings(lines: List[Tuple[float, np.ndarray]]) -> np.ndarray:
+    """All lines as one Shapely LineString array, built from their concatenated vertices."""
+    counts = np.fromiter((len(v) for _, v in lines), dtype=np.int64, count=len(lines))
+    index = np.repeat(np.arange(len(lines)), counts)
+    return shapely.linestrings(np.concatenate([v for _, v in lines]), indices=index)
+
+
+def simplify_lines(
+    lines: List[Tuple[float, np.ndarray]], tolerance: float = 0.0, decimals: Optional[int] = None
+) -> List[Tuple[float, np.ndarray]]:
+    """
+    Output stage for contour_lines results: topology-preserving simplification of every line
+    in one vectorized Shapely call (tolerance in CRS units), then coordinates rounded to
+    decimals places, dropping the repeated vertices rounding leaves. Lines left with fewer
+    than two vertices are removed.
+    """
+    if not lines or (tolerance <= 0 and decimals is None):
+        return lines
+    geoms = _linestrings(lines)
+    if tolerance > 0:
+        geoms = shapely.simplify(geoms, tolerance, preserve_topology=True)
+    coords, index = shapely.get_coordinates(geoms, return_index=True)
+    if decimals is not None:
+        coords = np.round(coords, decimals)
+        keep = np.ones(len(coords), dtype=bool)
+        keep[1:] = (coords[1:] != coords[:-1]).any(axis=1) | (index[1:] != index[:-1])
+        coords, index = coords[keep], index[keep]
+    bounds = np.searchsorted(index, np.arange(len(lines) + 1))
+    return [
+        (level, coords[start:stop])
+        for (level, _), start, stop in zip(lines, bounds[:-1], bounds[1:])
+        if stop - start >= 2
+    ]
+
+
+def clip_lines(
+    lines: List[Tuple[float, np.ndarray]], bbox: Tuple[float, float, float, float]
+) -> List[Tuple[float, np.ndarray]]:
+    """
+    Clip lines to bbox (minx, miny, maxx, maxy) in one vectorized Shapely call. A line that
+    leaves and re-enters the box becomes one part per pass inside it, each keeping its
+    level; lines entirely outside are dropped.
+    """
+    if not lines:
+        return lines
+    geoms = _linestrings(lines)
+    clipped = shapely.clip_by_rect(geoms, *bbox)
+    parts, part_line = shapely.get_parts(clipped, return_index=True)
+    # Lines grazing a corner can leave points; only line parts are kept
+    is_line = shapely.get_type_id(parts) == shapely.GeometryType.LINESTRING
+    parts, part_line = parts[is_line], part_line[is_line]
+    coords, part_index = shapely.get_coordinates(parts, return_index=True)
+    bounds = np.searchsorted(part_index, np.arange(len(parts) + 1))
+    levels = [lines[i][0] for i in part_line]
+    return [
+        (level, coords[start:stop])
+        for level, start, stop in zip(levels, bounds[:-1], bounds[1:])
+        if stop - start >= 2
+    ]
@@ -0,0 +1,110 @@
+"""Typed DEM raster passed from the data clients to the models."""
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from affine import Affine
+
+from app.core.geo_utils import meters_per_degree_lat, meters_per_degree_lon
+
+NODATA = -9999.0
+
+
+@dataclass
+class DEM:
+    """
+    North-up elevation raster: float32 data with NaN for nodata, the affine transform
+    mapping (col, row) cell corners to (x, y) in crs, and where the data came from.
+    complete is False when some of the tiles or blocks it was assembled from failed to
+    download, so NaN cells may be holes rather than nodata.
+    """
+    data: np.ndarray
+    transform: Affine
+    crs: str = "EPSG:4326"
+    source: str = "unknown"
+    complete: bool = True
+
+    def __post_init__(self):
+        # No copy when the array is already float32
+        self.data = np.asarray(self.data, dtype=np.float32)
+        if not isinstance(self.transform, Affine):
+            self.transform = Affine(*self.transform[:6])
+
+    @classmethod
+    def from_array(
+        cls, arr: np.ndarray, transform: Union[Affine, Sequence[float]], nodata: Optional[float] = None,
+        crs: str = "EPSG:4326", source: str = "unknown"
+    ) -> "DEM":
+        """
+        Wrap arr as float32 with nodata cells as NaN. arr is never modified: it is shared when
+        already float32 and nothing needs replacing, otherwise copied.
+        """
+        data = np.asarray(arr, dtype=np.float32)
+        if nodata is not None and not np.isnan(nodata):
+            missing = data == np.float32(nodata)
+            if missing.any():
+                data = np.where(missing, np.float32(np.nan), data)
+        return cls(data=data, transform=transform, crs=crs, source=source)
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> Optional["DEM"]:
+        """DEM from the dict form ('data', 'transform', 'nodata'); None if it holds no data."""
+        data = d.get("data")
+        transform = d.get("transform")
+        if data is None or transform is None:
+            return None
+        arr = np.array(data, dtype=np.float32)
+        if arr.ndim != 2 or arr.size == 0:
+            return None
+        return cls.from_array(
+            arr, transform, d.get("nodata", NODATA), d.get("crs", "EPSG:4326"), d.get("source", "unknown")
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable form for debug output (nested lists, NaN written as NODATA)."""
+        return {
+            "data": np.where(np.isnan(self.data), NODATA, self.data).tolist(),
+            "transform": self.transform_list,
+            "nodata": NODATA,
+            "crs": self.crs,
+            "source": self.source,
+        }
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.data.shape
+
+    @property
+    def transform_list(self) -> list:
+        """[a, b, c, d, e, f] coefficients of the transform."""
+        return list(self.transform)[:6]
+
+    @property
+    def cell_width(self) -> float:
+        return abs(self.transform.a)
+
+    @property
+    def cell_height(self) -> float:
+        return abs(self.transform.e)
+
+    @property
+    def resolution_m(self) -> Tuple[float, float]:
+        """(x, y) cell size in meters at the center latitude; assumes a geographic CRS."""
+        _, miny, _, maxy = self.bounds
+        lat = (miny + maxy) / 2.0
+        return self.cell_width * meters_per_degree_lon(lat), self.cell_height * meters_per_degree_lat(lat)
+
+    @property
+    def bounds(self) -> Tuple[float, float, float, float]:
+        """(minx, miny, maxx, maxy) of the outer cell edges."""
+        h, w = self.shape
+        x0, y0 = self.transform * (0, 0)
+        x1, y1 = self.transform * (w, h)
+        return min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)
+
+
+def as_dem(dem: Union[DEM, Dict[str, Any], None]) -> Optional[DEM]:
+    """Accept a DEM or its dict form (clients that still return dicts)."""
+    if dem is None or isinstance(dem, DEM):
+        return dem
+    return DEM.from_dict(dem)
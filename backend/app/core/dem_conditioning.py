@@ -0,0 +1,127 @@
+"""Hydrologic conditioning of DEMs before D8 routing: depression filling and flat resolution."""
+from typing import Tuple
+
+import numpy as np
+
+from app.core.flow_routing import D8_OFFSETS, flow_direction_d8
+
+
+def _sink_cells(arr: np.ndarray) -> np.ndarray:
+    """Cells water can leave the DEM through: the border and valid cells next to nodata."""
+    valid = ~np.isnan(arr)
+    sinks = np.zeros(arr.shape, dtype=bool)
+    sinks[0, :] = sinks[-1, :] = sinks[:, 0] = sinks[:, -1] = True
+    padded = np.pad(~valid, 1, constant_values=False)
+    h, w = arr.shape
+    for dr, dc in D8_OFFSETS:
+        sinks |= padded[1 + dr:h + 1 + dr, 1 + dc:w + 1 + dc]
+    return sinks & valid
+
+
+def fill_depressions(arr: np.ndarray) -> np.ndarray:
+    """
+    Priority-Flood depression filling.
+
+    Raises every cell to the lowest level at which it can spill to a sink cell
+    (see _sink_cells). This is grayscale reconstruction by erosion seeded from the
+    sinks; scikit-image runs it with a sorted priority queue in O(n log n).
+    NaN cells stay NaN.
+    """
+    from skimage.morphology import reconstruction
+
+    arr = np.asarray(arr, dtype=np.float64)
+    valid = ~np.isnan(arr)
+    if arr.ndim != 2 or min(arr.shape) < 3 or not valid.any():
+        return arr.copy()
+    floor = np.nanmin(arr) - 1.0
+    mask = np.where(valid, arr, floor)
+    seed = np.where(_sink_cells(arr) | ~valid, mask, np.nanmax(arr))
+    filled = reconstruction(seed, mask, method="erosion")
+    return np.where(valid, filled, np.nan)
+
+
+def _bfs_distance(
+    sources: np.ndarray, passable: np.ndarray, elev: np.ndarray, start: int = 0
+) -> np.ndarray:
+    """Breadth-first step counts (8-connected) from source cells through passable cells of equal elevation."""
+    h, w = passable.shape
+    passable = passable.ravel()
+    elev = elev.ravel()
+    dist = np.full(h * w, -1, dtype=np.int64)
+    frontier = np.flatnonzero(sources.ravel())
+    dist[frontier] = start
+    level = start
+    while frontier.size:
+        level += 1
+        rows, cols = np.divmod(frontier, w)
+        reached = []
+        for dr, dc in D8_OFFSETS:
+            nr, nc = rows + dr, cols + dc
+            ok = (nr >= 0) & (nr < h) & (nc >= 0) & (nc < w)
+            src = frontier[ok]
+            nbr = nr[ok] * w + nc[ok]
+            ok = passable[nbr] & (dist[nbr] < 0) & (elev[nbr] == elev[src])
+            reached.append(nbr[ok])
+        frontier = np.unique(np.concatenate(reached))
+        dist[frontier] = level
+    return dist.reshape(h, w)
+
+
+def resolve_flats(elev: np.ndarray, flow_dirs: np.ndarray) -> np.ndarray:
+    """
+    Assign D8 directions across flats (Barnes et al. 2014).
+
+    Flat cells are interior cells without a downslope neighbor. Each flat gets a
+    synthetic gradient of 2 x (steps toward lower terrain) + (steps away from
+    higher terrain), and cells drain down that gradient toward the flat's low
+    edges. Flats with no way out (only possible on unfilled DEMs) keep 0.
+    """
+    from scipy import ndimage
+
+    h, w = elev.shape
+    flow = flow_dirs.copy()
+    valid = ~np.isnan(elev)
+    flat = (flow == 0) & valid & ~_sink_cells(elev)
+    if not flat.any():
+        return flow
+
+    padded_z = np.pad(elev, 1, constant_values=np.nan)
+    padded_flat = np.pad(flat, 1, constant_values=False)
+    low_edge = np.zeros((h, w), dtype=bool)
+    high_edge = np.zeros((h, w), dtype=bool)
+    for dr, dc in D8_OFFSETS:
+        nz = padded_z[1 + dr:h + 1 + dr, 1 + dc:w + 1 + dc]
+        nflat = padded_flat[1 + dr:h + 1 + dr, 1 + dc:w + 1 + dc]
+        low_edge |= ~flat & valid & nflat & (nz == elev)
+        high_edge |= flat & (nz > elev)
+
+    toward_lower = _bfs_distance(low_edge, flat, elev)
+    away_from_higher = _bfs_distance(high_edge, flat, elev, start=1)
+    labels, n_flats = ndimage.label(flat, structure=np.ones((3, 3), dtype=bool))
+    flat_height = ndimage.maximum(away_from_higher, labels, index=np.arange(n_flats + 1))
+    flat_height = np.maximum(np.asarray(flat_height), 0)
+    away = np.where(away_from_higher > 0, flat_height[labels] - away_from_higher, 0)
+    gradient = np.where(flat, 2 * toward_lower + away, 0).astype(np.float64)
+    gradient[~(flat | low_edge)] = np.inf
+
+    drains = flat & (toward_lower > 0)
+    cells = np.flatnonzero(drains)
+    rows, cols = np.divmod(cells, w)
+    g = gradient.ravel()
+    z = elev.ravel()
+    best_drop = np.zeros(cells.size)
+    best_dir = np.zeros(cells.size, dtype=np.int32)
+    for idx, (dr, dc) in enumerate(D8_OFFSETS):
+        nbr = (rows + dr) * w + (cols + dc)
+        drop = g[cells] - g[nbr]
+        steeper = (z[nbr] == z[cells]) & (drop > best_drop)
+        best_drop[steeper] = drop[steeper]
+        best_dir[steeper] = idx + 1
+    flow.ravel()[cells] = best_dir
+    return flow
+
+
+def condition_dem(arr: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Fill depressions, then route D8 over the filled surface with flats resolved. Returns (filled, flow_dirs)."""
+    filled = fill_depressions(arr)
+    return filled, resolve_flats(filled, flow_direction_d8(filled))
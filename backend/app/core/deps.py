@@ -4,6 +4,7 @@ from app.models.drainage import DrainageModel
 from app.models.watershed import WatershedModel
 from app.models.flood_risk import FloodRiskModel
 from app.models.placement import PlacementModel
+from app.models.tiles import VectorTileModel
 
 
 @lru_cache()
@@ -15,6 +16,7 @@ def get_drainage_model() -> DrainageModel:
     return DrainageModel()
 
 
+@lru_cache()
 def get_watershed_model() -> WatershedModel:
     return WatershedModel()
 
@@ -25,3 +27,8 @@ def get_flood_risk_model() -> FloodRiskModel:
 
 def get_placement_model() -> PlacementModel:
     return PlacementModel()
+
+
+@lru_cache()
+def get_vector_tile_model() -> VectorTileModel:
+    return VectorTileModel(get_elevation_model(), get_watershed_model(), get_flood_risk_model())
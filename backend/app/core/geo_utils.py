@@ -16,6 +16,11 @@ def web_mercator_to_latlon(x: float, y: float) -> Tuple[float, float]:
     return lat, lon
 
 
+def web_mercator_pixel_m(zoom: float, lat: float) -> float:
+    """Ground size in meters of one 256 px web map tile pixel at zoom and latitude."""
+    return 2 * math.pi * 6378137 * math.cos(math.radians(lat)) / (256 * 2 ** zoom)
+
+
 def meters_per_degree_lat(lat: float) -> float:
     """Approximate meters per degree latitude at given latitude."""
     return 111320  # ~constant
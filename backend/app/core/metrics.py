@@ -0,0 +1,253 @@
+"""
+Lightweight instrumentation: named processing stages feed per-stage latency histograms
+(exposed in Prometheus text format) and the Server-Timing header of the current request.
+"""
+import bisect
+import contextvars
+import functools
+import inspect
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from fastapi.routing import APIRoute
+from starlette.datastructures import MutableHeaders
+from starlette.responses import Response
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a single label, as Prometheus renders it."""
+
+    def __init__(self, name: str, help: str, label: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name, self.help, self.label = name, help, label
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # label value -> (per-bucket counts with a final +Inf slot, sum, count)
+        self._series: Dict[str, List] = {}
+
+    def observe(self, value: str, seconds: float) -> None:
+        with self._lock:
+            series = self._series.get(value)
+            if series is None:
+                series = self._series[value] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][bisect.bisect_left(self.buckets, seconds)] += 1
+            series[1] += seconds
+            series[2] += 1
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            series = {k: (list(v[0]), v[1], v[2]) for k, v in self._series.items()}
+        for value, (counts, total, count) in sorted(series.items()):
+            label = f'{self.label}="{_escape(value)}"'
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                yield f'{self.name}_bucket{{{label},le="{bound:g}"}} {cumulative}'
+            yield f'{self.name}_bucket{{{label},le="+Inf"}} {count}'
+            yield f"{self.name}_sum{{{label}}} {total:.6f}"
+            yield f"{self.name}_count{{{label}}} {count}"
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+class Counter:
+    """Monotonic counter keyed by a single label."""
+
+    def __init__(self, name: str, help: str, label: str):
+        self.name, self.help, self.label = name, help, label
+        self._lock = threading.Lock()
+        self._values: Dict[str, float] = defaultdict(float)
+
+    def inc(self, value: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[value] += amount
+
+    def get(self, value: str) -> float:
+        with self._lock:
+            return self._values.get(value, 0.0)
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            values = dict(self._values)
+        for value, total in sorted(values.items()):
+            yield f'{self.name}{{{self.label}="{_escape(value)}"}} {total:g}'
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+STAGE_SECONDS = Histogram("watershed_stage_seconds", "Time spent per processing stage.", "stage")
+REQUEST_SECONDS = Histogram("watershed_request_seconds", "HTTP request latency per route.", "route")
+UPSTREAM_ERRORS = Counter("watershed_upstream_errors_total", "Failed upstream calls per service.", "service")
+ROUTING_CACHE = Counter("watershed_routing_cache_lookups_total", "Routing products cache lookups by result.", "result")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def gauge_lines(name: str, help: str, samples: Iterable[Tuple[Dict[str, str], float]], kind: str = "gauge") -> List[str]:
+    """Prometheus text for a metric computed at scrape time (samples are (labels, value))."""
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        label_text = ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items())
+        lines.append(f"{name}{{{label_text}}} {value:g}" if label_text else f"{name} {value:g}")
+    return lines
+
+
+def render_metrics(extra: Iterable[str] = ()) -> str:
+    """Prometheus text exposition of the stage/request histograms, error counters and extra lines."""
+    lines = [
+        *STAGE_SECONDS.render(), *REQUEST_SECONDS.render(), *UPSTREAM_ERRORS.render(), *ROUTING_CACHE.render(), *extra
+    ]
+    return "\n".join(lines) + "\n"
+
+
+class RequestTimings:
+    """Stage durations of one request, summed per stage (stages may nest or overlap)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stages: Dict[str, float] = {}
+        self.endpoint_done: Optional[float] = None
+
+    def add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def header(self, total_s: float) -> str:
+        with self._lock:
+            stages = list(self.stages.items())
+        parts = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in stages]
+        parts.append(f"total;dur={total_s * 1000:.1f}")
+        return ", ".join(parts)
+
+
+_request_timings: contextvars.ContextVar[Optional[RequestTimings]] = contextvars.ContextVar(
+    "request_timings", default=None
+)
+
+
+def record_stage(name: str, seconds: float) -> None:
+    STAGE_SECONDS.observe(name, seconds)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.add(name, seconds)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time the enclosed block as stage name."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - start)
+
+
+def timed(name: str) -> Callable:
+    """Decorator timing every call of a function or coroutine function as stage name."""
+    def decorate(fn: Callable) -> Callable:
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with stage(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def count_upstream_error(service: str) -> None:
+    UPSTREAM_ERRORS.inc(service)
+
+
+class ServerTimingMiddleware:
+    """
+    ASGI middleware collecting the stages of each HTTP request into a Server-Timing header
+    (plus total) and observing the request latency per route. Stages that run in worker
+    threads are included when the thread runs in a copy of the request's context.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        timings = RequestTimings()
+        token = _request_timings.set(timings)
+        start = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", timings.header(time.perf_counter() - start))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_timings.reset(token)
+            route = getattr(scope.get("route"), "path", "unmatched")
+            REQUEST_SECONDS.observe(route, time.perf_counter() - start)
+
+
+def _mark_endpoint_done(endpoint: Callable) -> Callable:
+    def mark(result):
+        # A returned Response goes out as is: FastAPI neither validates nor encodes it
+        timings = _request_timings.get()
+        if timings is not None and not isinstance(result, Response):
+            timings.endpoint_done = time.perf_counter()
+        return result
+
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args, **kwargs):
+            return mark(await endpoint(*args, **kwargs))
+        return async_wrapper
+
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        return mark(endpoint(*args, **kwargs))
+    return wrapper
+
+
+class TimedRoute(APIRoute):
+    """
+    APIRoute recording response validation and JSON encoding after the endpoint as stage
+    "serialize". Endpoints that return a Response (FastJSONResponse times its own encoding)
+    record nothing here.
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, _mark_endpoint_done(endpoint), **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def timed_handler(request):
+            response = await handler(request)
+            timings = _request_timings.get()
+            if timings is not None and timings.endpoint_done is not None:
+                record_stage("serialize", time.perf_counter() - timings.endpoint_done)
+            return response
+
+        return timed_handler
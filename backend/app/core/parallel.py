@@ -0,0 +1,148 @@
+"""
+Executors for CPU-bound NumPy work: a thread pool behind async handlers, and a process pool
+that reads its input rasters from shared memory instead of pickling them per task.
+"""
+import asyncio
+import atexit
+import contextvars
+import functools
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+
+# name -> (shared memory block name, shape, dtype str); small and picklable
+RasterSpec = Dict[str, Tuple[str, Tuple[int, ...], str]]
+
+_lock = threading.Lock()
+_threads: Optional[ThreadPoolExecutor] = None
+_processes: Optional[ProcessPoolExecutor] = None
+
+
+class SharedRasters:
+    """
+    Copies named arrays into shared memory once; workers map them by spec without pickling
+    the data. outputs names zero-filled (shape, dtype) arrays for workers to write into.
+    """
+
+    def __init__(
+        self, arrays: Dict[str, np.ndarray], outputs: Optional[Dict[str, Tuple[Tuple[int, ...], Any]]] = None
+    ):
+        self._blocks: Dict[str, shared_memory.SharedMemory] = {}
+        self.spec: RasterSpec = {}
+        try:
+            for name, arr in arrays.items():
+                arr = np.ascontiguousarray(arr)
+                self._create(name, arr.shape, arr.dtype)[...] = arr
+            for name, (shape, dtype) in (outputs or {}).items():
+                self._create(name, shape, np.dtype(dtype))
+        except Exception:
+            self.close()
+            raise
+
+    def _create(self, name: str, shape: Tuple[int, ...], dtype: np.dtype) -> np.ndarray:
+        block = shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) * dtype.itemsize, 1))
+        self._blocks[name] = block
+        self.spec[name] = (block.name, tuple(shape), dtype.str)
+        return np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+    def read(self, name: str) -> np.ndarray:
+        """Copy of array name as it is now (e.g. after workers wrote to it)."""
+        _, shape, dtype = self.spec[name]
+        return np.ndarray(shape, dtype=np.dtype(dtype), buffer=self._blocks[name].buf).copy()
+
+    def close(self) -> None:
+        for block in self._blocks.values():
+            block.close()
+            block.unlink()
+        self._blocks = {}
+
+    def __enter__(self) -> "SharedRasters":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _open_block(name: str) -> shared_memory.SharedMemory:
+    # The creating process owns and unlinks the block. Pool workers share its resource
+    # tracker, so attaching before 3.13 (where track=False exists) is harmless.
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    return shared_memory.SharedMemory(name=name)
+
+
+def attach(spec: RasterSpec) -> Tuple[Dict[str, np.ndarray], List[shared_memory.SharedMemory]]:
+    """
+    Map the arrays of a SharedRasters spec in a worker. Drop every view of them before
+    closing the returned blocks.
+    """
+    arrays: Dict[str, np.ndarray] = {}
+    blocks: List[shared_memory.SharedMemory] = []
+    for name, (block_name, shape, dtype) in spec.items():
+        block = _open_block(block_name)
+        blocks.append(block)
+        arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+    return arrays, blocks
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Process pool shared by all requests, sized by settings.routing_workers when first used
+    and never resized; callers only wait on their own futures.
+    """
+    global _processes
+    with _lock:
+        if _processes is None:
+            _processes = ProcessPoolExecutor(
+                max_workers=max(settings.routing_workers, 1), mp_context=multiprocessing.get_context("spawn")
+            )
+        return _processes
+
+
+def shutdown_process_pool() -> None:
+    global _processes
+    with _lock:
+        if _processes is not None:
+            _processes.shutdown(wait=True)
+        _processes = None
+
+
+atexit.register(shutdown_process_pool)
+
+
+def get_compute_executor() -> ThreadPoolExecutor:
+    """Thread pool for CPU-bound work started from async handlers (NumPy releases the GIL)."""
+    global _threads
+    with _lock:
+        if _threads is None:
+            _threads = ThreadPoolExecutor(
+                max_workers=settings.compute_threads or os.cpu_count() or 1,
+                thread_name_prefix="compute",
+            )
+        return _threads
+
+
+async def run_in_compute_thread(fn: Callable, *args, **kwargs) -> Any:
+    """
+    Await fn(*args, **kwargs) on the compute executor without blocking the event loop,
+    in a copy of the caller's context (so request-scoped stage timings still apply).
+    """
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(get_compute_executor(), functools.partial(ctx.run, fn, *args, **kwargs))
+
+
+def shutdown_compute_executor() -> None:
+    global _threads
+    with _lock:
+        if _threads is not None:
+            _threads.shutdown(wait=True, cancel_futures=True)
+        _threads = None
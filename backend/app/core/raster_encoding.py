@@ -0,0 +1,85 @@
+"""
+Compact encodings for small float rasters: base64 float32 or uint8-quantized arrays for
+JSON, a Cloud-Optimized GeoTIFF, or a jet-colormapped RGBA PNG.
+"""
+import base64
+import struct
+import zlib
+from typing import Any, Dict, Sequence
+
+import numpy as np
+
+UINT8_NODATA = 255
+# Jet colormap stops as drawn by the frontend heatmap: blue, cyan, green, yellow, red
+_JET_STOPS = (0.0, 0.25, 0.5, 0.75, 1.0)
+_JET_RGB = ((0, 0, 0, 1, 1), (0, 1, 1, 1, 0), (1, 1, 0, 0, 0))
+
+
+def encode_float32(arr: np.ndarray) -> Dict[str, Any]:
+    """Little-endian float32 cells, row-major, base64; NaN is nodata."""
+    data = np.ascontiguousarray(arr, dtype="<f4")
+    return {"dtype": "float32", "data": base64.b64encode(data.tobytes()).decode("ascii"), "nodata": None}
+
+
+def encode_uint8(arr: np.ndarray) -> Dict[str, Any]:
+    """
+    Cells quantized to 0..254 over the array's finite range, base64; value = offset + scale
+    * byte, and UINT8_NODATA marks NaN cells.
+    """
+    finite = np.isfinite(arr)
+    lo = float(np.min(arr[finite])) if finite.any() else 0.0
+    hi = float(np.max(arr[finite])) if finite.any() else 0.0
+    scale = (hi - lo) / (UINT8_NODATA - 1) if hi > lo else 1.0
+    q = np.full(arr.shape, UINT8_NODATA, dtype=np.uint8)
+    q[finite] = np.rint((arr[finite] - lo) / scale).astype(np.uint8)
+    return {
+        "dtype": "uint8", "data": base64.b64encode(q.tobytes()).decode("ascii"),
+        "nodata": UINT8_NODATA, "scale": scale, "offset": lo,
+    }
+
+
+def encode_geotiff(bands: Dict[str, np.ndarray], transform: Sequence[float], crs: str = "EPSG:4326") -> bytes:
+    """Multi-band float32 Cloud-Optimized GeoTIFF (deflate, NaN nodata) with band names as descriptions."""
+    from affine import Affine
+    from rasterio.io import MemoryFile
+
+    names = list(bands)
+    height, width = bands[names[0]].shape
+    profile = {
+        "driver": "COG", "width": width, "height": height, "count": len(names), "dtype": "float32",
+        "crs": crs, "transform": Affine(*transform[:6]), "nodata": float("nan"), "compress": "deflate",
+    }
+    with MemoryFile() as memfile:
+        with memfile.open(**profile) as dataset:
+            for i, name in enumerate(names, start=1):
+                dataset.write(bands[name].astype(np.float32), i)
+                dataset.set_band_description(i, name)
+        return memfile.read()
+
+
+def jet_rgba(values: np.ndarray) -> np.ndarray:
+    """(h, w, 4) uint8 jet colors of 0-1 values; NaN cells are transparent."""
+    valid = np.isfinite(values)
+    v = np.clip(np.where(valid, values, 0.0), 0.0, 1.0)
+    rgba = np.empty(values.shape + (4,), dtype=np.uint8)
+    for channel, stops in enumerate(_JET_RGB):
+        rgba[..., channel] = np.rint(np.interp(v, _JET_STOPS, stops) * 255)
+    rgba[..., 3] = np.where(valid, 255, 0)
+    return rgba
+
+
+def encode_png(rgba: np.ndarray) -> bytes:
+    """RGBA uint8 image as PNG (no filtering, zlib-compressed)."""
+    height, width, _ = rgba.shape
+    # Every scanline starts with filter type 0
+    raw = np.zeros((height, width * 4 + 1), dtype=np.uint8)
+    raw[:, 1:] = rgba.reshape(height, width * 4)
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(raw.tobytes(), 6)) + chunk(b"IEND", b"")
+    )
@@ -0,0 +1,32 @@
+"""JSON and NDJSON responses encoded with orjson straight from domain data."""
+from typing import Any, Iterable
+
+import orjson
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.core.metrics import stage
+
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse encoded by orjson, with NumPy arrays and scalars supported and NaN written
+    as null. A route that declares a response_model and returns this response directly
+    keeps the model in the OpenAPI schema; FastAPI skips validating and re-encoding the
+    content, which for large FeatureCollections is most of the response time.
+    """
+
+    def render(self, content: Any) -> bytes:
+        with stage("serialize"):
+            return orjson.dumps(content, option=_ORJSON_OPTIONS)
+
+
+class NDJSONResponse(StreamingResponse):
+    """Newline-delimited JSON streamed from an iterable of records, each sent as it is produced."""
+
+    media_type = "application/x-ndjson"
+
+    def __init__(self, records: Iterable[Any], status_code: int = 200, **kwargs):
+        lines = (orjson.dumps(record, option=_ORJSON_OPTIONS) + b"\n" for record in records)
+        super().__init__(lines, status_code=status_code, **kwargs)
@@ -0,0 +1,186 @@
+"""
+Deterministic synthetic terrain: seeded, vectorized elevation rasters for benchmarks,
+tests and offline mode. The same (kind, shape, seed, params) always gives the same array.
+"""
+import math
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+
+Shape = Tuple[int, int]
+
+
+def _smoothstep(t: np.ndarray) -> np.ndarray:
+    return t * t * (3.0 - 2.0 * t)
+
+
+def _lattice_axis(n: int, step: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Lower lattice index and smoothed fraction for n pixels at step pixels per lattice cell."""
+    pos = np.arange(n, dtype=np.float64) / step
+    i0 = pos.astype(np.intp)
+    return i0, _smoothstep(pos - i0).astype(np.float32)
+
+
+def _lattice_noise(shape: Shape, cells: int, rng: np.random.Generator) -> np.ndarray:
+    """Random lattice with cells cells along the longer side, interpolated to shape in [0, 1]."""
+    h, w = shape
+    step = max(h, w) / cells
+    grid = rng.random((int((h - 1) / step) + 2, int((w - 1) / step) + 2), dtype=np.float32)
+    r0, fy = _lattice_axis(h, step)
+    c0, fx = _lattice_axis(w, step)
+    fy = fy[:, None]
+    # Separable: interpolate rows on the small lattice first, then columns at full size
+    rows = grid[r0] * (1.0 - fy) + grid[r0 + 1] * fy
+    out = np.take(rows, c0, axis=1)
+    out *= 1.0 - fx
+    right = np.take(rows, c0 + 1, axis=1)
+    right *= fx
+    out += right
+    return out
+
+
+def _normalize(arr: np.ndarray) -> np.ndarray:
+    lo, hi = float(arr.min()), float(arr.max())
+    arr -= lo
+    if hi > lo:
+        arr /= hi - lo
+    return arr
+
+
+def _coords(shape: Shape) -> Tuple[np.ndarray, np.ndarray]:
+    """Broadcastable (x, y) pixel-center coordinates scaled by the longer side."""
+    h, w = shape
+    m = max(h, w)
+    x = ((np.arange(w, dtype=np.float32) + 0.5) / m)[None, :]
+    y = ((np.arange(h, dtype=np.float32) + 0.5) / m)[:, None]
+    return x, y
+
+
+def fractal(
+    shape: Shape, rng: np.random.Generator, base_cells: int = 4, persistence: float = 0.5, octaves: int = 8
+) -> np.ndarray:
+    """
+    Fractal noise in [0, 1]: octaves of lattice noise, each with twice the lattice
+    frequency and persistence times the amplitude of the previous one (fBm). Same
+    statistics as diamond-square, but any shape and no 2**n + 1 padding.
+    """
+    h, w = shape
+    out = np.zeros(shape, dtype=np.float32)
+    cells, amp = base_cells, 1.0
+    # Stop once the lattice is as fine as the raster; finer octaves would add nothing
+    for _ in range(octaves):
+        octave = _lattice_noise(shape, cells, rng)
+        octave *= amp
+        out += octave
+        if cells >= max(h, w):
+            break
+        cells, amp = cells * 2, amp * persistence
+    return _normalize(out)
+
+
+def valleys(shape: Shape, rng: np.random.Generator, tributaries: int = 6, detail: float = 0.15) -> np.ndarray:
+    """
+    Valley network: a sinuous main valley draining east and tributaries running into it
+    from both sides, on a surface tilted towards the outlet with fractal detail.
+    """
+    h, w = shape
+    x, y = _coords(shape)
+    y_mid = (h / max(h, w)) / 2.0
+    main = y_mid + 0.08 * np.sin(2 * math.pi * (rng.uniform(1.0, 2.0) * x + rng.random()))
+    dist = np.abs(y - main)
+    out = fractal(shape, rng)
+    out *= detail
+    out += 0.5 * (1.0 - x)
+    out += dist
+    # Tributaries: V-shaped cuts into the valley wall on one side of the main valley; each
+    # cancels most of the wall's rise, so its floor slopes gently down into the main valley
+    north = np.where(y < main, 0.8 * dist, 0.0).astype(np.float32)
+    south = 0.8 * dist - north
+    for _ in range(tributaries):
+        x0 = rng.uniform(0.1, 0.9) * (w / max(h, w))
+        floor = north if rng.random() < 0.5 else south
+        axis = x0 + 0.03 * np.sin(2 * math.pi * (rng.uniform(2.0, 4.0) * y + rng.random()))
+        width = rng.uniform(0.03, 0.06)
+        cut = np.abs(x - axis)
+        np.subtract(1.0, cut / width, out=cut)
+        np.maximum(cut, 0.0, out=cut)
+        cut *= floor
+        out -= cut
+    return _normalize(out)
+
+
+def bowls(shape: Shape, rng: np.random.Generator, n_bowls: int = 3, n_pits: int = 50) -> np.ndarray:
+    """
+    Closed basins: overlapping paraboloid bowls with fractal detail, plus single-cell
+    pits scattered over the raster (what depression conditioning has to fill).
+    """
+    h, w = shape
+    x, y = _coords(shape)
+    xs = rng.uniform(0.2, 0.8, n_bowls) * (w / max(h, w))
+    ys = rng.uniform(0.2, 0.8, n_bowls) * (h / max(h, w))
+    radii = rng.uniform(0.2, 0.4, n_bowls)
+    out = np.full(shape, np.inf, dtype=np.float32)
+    for bx, by, r in zip(xs, ys, radii):
+        np.minimum(out, ((x - bx) ** 2 + (y - by) ** 2) / np.float32(r * r), out=out)
+    np.minimum(out, 1.0, out=out)
+    detail = fractal(shape, rng)
+    detail *= 0.1
+    out += detail
+    rows = rng.integers(0, h, n_pits)
+    cols = rng.integers(0, w, n_pits)
+    out[rows, cols] -= rng.uniform(0.02, 0.1, n_pits).astype(np.float32)
+    return _normalize(out)
+
+
+def flats(shape: Shape, rng: np.random.Generator, levels: int = 8) -> np.ndarray:
+    """Terraces: a gentle tilted surface quantized to levels exactly flat steps."""
+    x, y = _coords(shape)
+    out = fractal(shape, rng, base_cells=2)
+    out *= 0.5
+    out += 0.5 * (1.0 - x)
+    _normalize(out)
+    out *= levels - 1e-3
+    np.floor(out, out=out)
+    out /= levels - 1
+    return out
+
+
+def cone(shape: Shape, rng: np.random.Generator, noise: float = 0.1) -> np.ndarray:
+    """Single peak at the center falling off linearly with distance, with uniform noise."""
+    h, w = shape
+    rows = np.arange(h, dtype=np.float32)[:, None] - h // 2
+    cols = np.arange(w, dtype=np.float32)[None, :] - w // 2
+    out = np.hypot(rows, cols)
+    out /= max(h // 2, 1)
+    np.subtract(1.0, out, out=out)
+    out += noise * rng.random(shape, dtype=np.float32)
+    return out
+
+
+TERRAINS: Dict[str, Callable[..., np.ndarray]] = {
+    "fractal": fractal,
+    "valleys": valleys,
+    "bowls": bowls,
+    "flats": flats,
+    "cone": cone,
+}
+
+
+def generate_terrain(
+    kind: str, shape: Shape, seed: int = 0, base_m: float = 100.0, relief_m: float = 100.0, **params
+) -> np.ndarray:
+    """
+    float32 elevation raster of the given kind (see TERRAINS): base_m plus relief_m times
+    the generator's unit-range surface. params go to the generator.
+    """
+    try:
+        generator = TERRAINS[kind]
+    except KeyError:
+        raise ValueError(f"Unknown terrain {kind!r}, expected one of {sorted(TERRAINS)}")
+    h, w = shape
+    if h < 2 or w < 2:
+        raise ValueError(f"Terrain shape must be at least 2x2, got {shape}")
+    out = generator((int(h), int(w)), np.random.default_rng(seed), **params)
+    out *= relief_m
+    out += base_m
+    return out
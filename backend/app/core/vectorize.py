@@ -0,0 +1,43 @@
+"""Raster mask to vector boundary extraction."""
+from typing import Optional, Sequence
+
+import numpy as np
+from shapely.geometry import mapping, shape
+from shapely.geometry.base import BaseGeometry
+from shapely.ops import unary_union
+
+
+def mask_to_shape(
+    mask: np.ndarray, transform: Sequence[float], simplify_tolerance: float = 0.0
+) -> Optional[BaseGeometry]:
+    """
+    Trace the outline of the True cells of mask into a Polygon (holes included) or MultiPolygon.
+
+    Cell edges are followed exactly by GDAL polygonize (rasterio.features.shapes).
+    Cells joined only at a corner become separate parts, since a ring touching itself is
+    not a valid polygon. transform is the affine [a, b, c, d, e, f] of the raster and
+    simplify_tolerance (same units) runs topology-preserving simplification when > 0.
+    """
+    from affine import Affine
+    from rasterio.features import shapes
+
+    mask = np.asarray(mask, dtype=bool)
+    if not mask.any():
+        return None
+    aff = transform if isinstance(transform, Affine) else Affine(*transform[:6])
+    parts = [
+        shape(geom)
+        for geom, _ in shapes(mask.astype(np.uint8), mask=mask, connectivity=4, transform=aff)
+    ]
+    geom = parts[0] if len(parts) == 1 else unary_union(parts)
+    if simplify_tolerance > 0:
+        geom = geom.simplify(simplify_tolerance, preserve_topology=True)
+    return None if geom.is_empty else geom
+
+
+def mask_to_geojson(
+    mask: np.ndarray, transform: Sequence[float], simplify_tolerance: float = 0.0
+) -> Optional[dict]:
+    """GeoJSON geometry dict for mask_to_shape, or None for an empty mask."""
+    geom = mask_to_shape(mask, transform, simplify_tolerance)
+    return None if geom is None else mapping(geom)
@@ -2,5 +2,6 @@ from app.data.usgs_client import USGSClient
 from app.data.nhd_client import NHDClient
 from app.data.fema_client import FEMAClient
 from app.data.osm_client import OSMClient
+from app.data.dem_provider import SyntheticDEMClient, default_dem_client
 
-__all__ = ["USGSClient", "NHDClient", "FEMAClient", "OSMClient"]
+__all__ = ["USGSClient", "NHDClient", "FEMAClient", "OSMClient", "SyntheticDEMClient", "default_dem_client"]
@@ -0,0 +1,219 @@
+"""Tile grid and two-tier (memory LRU + compressed on-disk) cache for DEM tiles."""
+import logging
+import math
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TileKey = Tuple[int, int, int]  # (z, tx, ty)
+
+# Geographic tile pyramid: level z splits the world into 180 / 2**z degree squares,
+# tx counted east from -180 and ty counted south from +90.
+MAX_LEVEL = 20
+
+
+def tile_span_deg(z: int) -> float:
+    return 180.0 / (2 ** z)
+
+
+def tile_cell_deg(z: int, tile_px: int) -> float:
+    return tile_span_deg(z) / tile_px
+
+
+def level_for_cell_size(cell_deg: float, tile_px: int) -> int:
+    """Coarsest level whose cell size is no larger than cell_deg."""
+    if cell_deg <= 0:
+        return MAX_LEVEL
+    z = math.ceil(math.log2(180.0 / (tile_px * cell_deg)))
+    return int(min(max(z, 0), MAX_LEVEL))
+
+
+def tile_bounds(z: int, tx: int, ty: int) -> Tuple[float, float, float, float]:
+    """(minx, miny, maxx, maxy) of a tile in WGS84 degrees."""
+    span = tile_span_deg(z)
+    west = -180.0 + tx * span
+    north = 90.0 - ty * span
+    return west, north - span, west + span, north
+
+
+def tile_range(
+    minx: float, miny: float, maxx: float, maxy: float, z: int
+) -> Tuple[int, int, int, int]:
+    """Inclusive (tx0, ty0, tx1, ty1) of the tiles covering a bbox."""
+    span = tile_span_deg(z)
+    tx0 = int(math.floor((minx + 180.0) / span))
+    tx1 = int(math.floor((maxx + 180.0) / span - 1e-12))
+    ty0 = int(math.floor((90.0 - maxy) / span))
+    ty1 = int(math.floor((90.0 - miny) / span - 1e-12))
+    return tx0, ty0, max(tx1, tx0), max(ty1, ty0)
+
+
+class DemTileCache:
+    """
+    Float32 DEM tiles (NaN = nodata) keyed by (z, tx, ty).
+
+    The memory tier is bounded in bytes and evicts by policy ("lru" refreshes a tile on
+    every hit, "fifo" evicts in insertion order). The optional disk tier keeps compressed
+    .npz tiles under cache_dir and prunes the least recently used files past disk_bytes.
+    """
+
+    def __init__(
+        self,
+        memory_bytes: int = 256 * 1024 * 1024,
+        cache_dir: Optional[str] = None,
+        disk_bytes: int = 2 * 1024 ** 3,
+        eviction: str = "lru",
+    ):
+        if eviction not in ("lru", "fifo"):
+            raise ValueError(f"Unknown DEM cache eviction policy: {eviction}")
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.eviction = eviction
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._tiles: "OrderedDict[TileKey, np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self._disk_usage: Optional[int] = None
+        self._lock = threading.Lock()
+        self.counters: Dict[str, int] = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "disk_evictions": 0,
+        }
+
+    def get(self, key: TileKey) -> Optional[np.ndarray]:
+        with self._lock:
+            tile = self._tiles.get(key)
+            if tile is not None:
+                if self.eviction == "lru":
+                    self._tiles.move_to_end(key)
+                self.counters["memory_hits"] += 1
+                return tile
+        tile = self._read_disk(key)
+        with self._lock:
+            if tile is None:
+                self.counters["misses"] += 1
+                return None
+            self.counters["disk_hits"] += 1
+            self._put_memory(key, tile)
+        return tile
+
+    def put(self, key: TileKey, tile: np.ndarray) -> None:
+        tile = np.ascontiguousarray(tile, dtype=np.float32)
+        with self._lock:
+            self._put_memory(key, tile)
+        self._write_disk(key, tile)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.counters["memory_hits"] + self.counters["disk_hits"] + self.counters["misses"]
+            hits = self.counters["memory_hits"] + self.counters["disk_hits"]
+            return {
+                **self.counters,
+                "memory_tiles": len(self._tiles),
+                "memory_bytes": self._bytes,
+                "hit_ratio": hits / lookups if lookups else 0.0,
+            }
+
+    def clear(self) -> None:
+        """Drop the memory tier (disk tiles stay)."""
+        with self._lock:
+            self._tiles.clear()
+            self._bytes = 0
+
+    def _put_memory(self, key: TileKey, tile: np.ndarray) -> None:
+        if tile.nbytes > self.memory_bytes:
+            return
+        old = self._tiles.pop(key, None)
+        if old is not None:
+            self._bytes -= old.nbytes
+        self._tiles[key] = tile
+        self._bytes += tile.nbytes
+        while self._bytes > self.memory_bytes:
+            _, evicted = self._tiles.popitem(last=False)
+            self._bytes -= evicted.nbytes
+            self.counters["evictions"] += 1
+
+    def _tile_path(self, key: TileKey) -> Path:
+        z, tx, ty = key
+        return self.cache_dir / str(z) / str(tx) / f"{ty}.npz"
+
+    def _read_disk(self, key: TileKey) -> Optional[np.ndarray]:
+        if self.cache_dir is None:
+            return None
+        path = self._tile_path(key)
+        try:
+            with np.load(path) as npz:
+                tile = npz["dem"].astype(np.float32, copy=False)
+            os.utime(path)
+            return tile
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Unreadable DEM tile {path}: {e}")
+            return None
+
+    def _write_disk(self, key: TileKey, tile: np.ndarray) -> None:
+        if self.cache_dir is None:
+            return
+        path = self._tile_path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp, "wb") as f:
+                np.savez_compressed(f, dem=tile)
+            os.replace(tmp, path)
+            with self._lock:
+                if self._disk_usage is None:
+                    self._disk_usage = sum(p.stat().st_size for p in self._disk_files())
+                else:
+                    self._disk_usage += path.stat().st_size
+                over = self._disk_usage > self.disk_bytes
+            if over:
+                self._prune_disk()
+        except OSError as e:
+            logger.warning(f"Could not write DEM tile {path}: {e}")
+
+    def _disk_files(self) -> Iterator[Path]:
+        return self.cache_dir.glob("*/*/*.npz")
+
+    def _prune_disk(self) -> None:
+        files = sorted(self._disk_files(), key=lambda p: p.stat().st_mtime)
+        usage = sum(p.stat().st_size for p in files)
+        target = self.disk_bytes * 0.9
+        for path in files:
+            if usage <= target:
+                break
+            size = path.stat().st_size
+            path.unlink(missing_ok=True)
+            usage -= size
+            self.counters["disk_evictions"] += 1
+        with self._lock:
+            self._disk_usage = usage
+
+
+_default_cache: Optional[DemTileCache] = None
+_default_lock = threading.Lock()
+
+
+def get_dem_tile_cache() -> DemTileCache:
+    """Process-wide tile cache configured from settings."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = DemTileCache(
+                memory_bytes=settings.dem_cache_memory_bytes,
+                cache_dir=settings.dem_cache_dir or None,
+                disk_bytes=settings.dem_cache_disk_bytes,
+                eviction=settings.dem_cache_eviction,
+            )
+        return _default_cache
@@ -0,0 +1,53 @@
+"""DEM providers: the offline synthetic client and the one selected by settings.dem_provider."""
+from typing import Optional
+
+from affine import Affine
+
+from app.core.config import settings
+from app.core.dem import DEM
+from app.core.geo_utils import bbox_from_center
+from app.core.parallel import run_in_compute_thread
+from app.core.terrain import generate_terrain
+from app.data.usgs_client import USGSClient, _Resolution
+
+
+class SyntheticDEMClient(USGSClient):
+    """
+    Offline stand-in for USGSClient: same fetch_dem/fetch_dem_async interface, resolution
+    handling and pixel budget, but the raster comes from app.core.terrain. Identical
+    requests with the same terrain and seed return identical rasters.
+    """
+
+    def __init__(
+        self, terrain: Optional[str] = None, seed: Optional[int] = None,
+        base_m: Optional[float] = None, relief_m: Optional[float] = None
+    ):
+        self.terrain = terrain or settings.synthetic_terrain
+        self.seed = settings.synthetic_seed if seed is None else seed
+        self.base_m = settings.synthetic_base_m if base_m is None else base_m
+        self.relief_m = settings.synthetic_relief_m if relief_m is None else relief_m
+        # USGSClient.__init__ is not called: it would attach the shared DEM tile cache. Only
+        # base_url (part of the single-flight key) is read by the inherited fetch path, since
+        # _fetch_dem/_fetch_dem_async are replaced and nothing is tiled or cached.
+        self.base_url = f"synthetic://{self.terrain}/{self.seed}"
+        self.tile_cache = None
+
+    def _fetch_dem(self, lat: float, lon: float, radius_m: float, res: _Resolution) -> Optional[DEM]:
+        minx, miny, maxx, maxy = bbox_from_center(lat, lon, radius_m)
+        arr = generate_terrain(
+            self.terrain, (res.height, res.width), self.seed, base_m=self.base_m, relief_m=self.relief_m
+        )
+        transform = Affine((maxx - minx) / res.width, 0.0, minx, 0.0, -(maxy - miny) / res.height, maxy)
+        return DEM(data=arr, transform=transform, source=f"synthetic_{self.terrain}_{self.seed}")
+
+    async def _fetch_dem_async(self, lat: float, lon: float, radius_m: float, res: _Resolution) -> Optional[DEM]:
+        return await run_in_compute_thread(self._fetch_dem, lat, lon, radius_m, res)
+
+
+def default_dem_client() -> USGSClient:
+    """DEM client for models constructed without one: USGS, or synthetic terrain when offline."""
+    if settings.dem_provider == "synthetic":
+        return SyntheticDEMClient()
+    if settings.dem_provider != "usgs":
+        raise ValueError(f"Unknown dem_provider {settings.dem_provider!r}, expected 'usgs' or 'synthetic'")
+    return USGSClient()
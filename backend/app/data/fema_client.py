@@ -1,6 +1,8 @@
-import httpx
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from app.core.config import settings
+from app.core.metrics import count_upstream_error, timed
+from app.data.http import get_async_http_client, get_http_client, request_timeout
+from app.data.singleflight import bbox_key, fetch_coalescer
 
 
 class FEMAClient:
@@ -9,29 +11,61 @@ class FEMAClient:
     def __init__(self, base_url: str = None):
         self.base_url = base_url or settings.fema_base_url
 
+    @timed("fema_fetch")
     def get_flood_zones_geojson(
         self, minx: float, miny: float, maxx: float, maxy: float
     ) -> Dict[str, Any]:
         """Return GeoJSON FeatureCollection of flood zones in bbox (WGS84)."""
+        return fetch_coalescer.do(
+            bbox_key("fema_flood_zones", minx, miny, maxx, maxy, self.base_url),
+            lambda: self._get_flood_zones_geojson(minx, miny, maxx, maxy),
+        )
+
+    @timed("fema_fetch")
+    async def get_flood_zones_geojson_async(
+        self, minx: float, miny: float, maxx: float, maxy: float
+    ) -> Dict[str, Any]:
+        """get_flood_zones_geojson on the pooled async client."""
+        return await fetch_coalescer.do_async(
+            bbox_key("fema_flood_zones", minx, miny, maxx, maxy, self.base_url),
+            lambda: self._get_flood_zones_geojson_async(minx, miny, maxx, maxy),
+        )
+
+    def _get_flood_zones_geojson(self, minx: float, miny: float, maxx: float, maxy: float) -> Dict[str, Any]:
+        try:
+            url, params = self._query(minx, miny, maxx, maxy)
+            r = get_http_client(url).get(url, params=params, timeout=request_timeout(15.0))
+            if r.status_code == 200:
+                return r.json()
+        except Exception:
+            pass
+        count_upstream_error("fema")
+        return {"type": "FeatureCollection", "features": []}
+
+    async def _get_flood_zones_geojson_async(self, minx: float, miny: float, maxx: float, maxy: float) -> Dict[str, Any]:
         try:
-            url = f"{self.base_url}/NFHL/MapServer/28/query"
-            params = {
-                "where": "1=1",
-                "outFields": "FLD_ZONE,ZONE",
-                "returnGeometry": "true",
-                "outSR": "4326",
-                "f": "geojson",
-                "geometry": f'{{"xmin":{minx},"ymin":{miny},"xmax":{maxx},"ymax":{maxy},"spatialReference":{{"wkid":4326}}}}',
-                "geometryType": "esriGeometryEnvelope",
-            }
-            with httpx.Client(timeout=15.0) as client:
-                r = client.get(url, params=params)
-                if r.status_code == 200:
-                    return r.json()
+            url, params = self._query(minx, miny, maxx, maxy)
+            r = await get_async_http_client(url).get(url, params=params, timeout=request_timeout(15.0))
+            if r.status_code == 200:
+                return r.json()
         except Exception:
             pass
+        count_upstream_error("fema")
         return {"type": "FeatureCollection", "features": []}
 
+    def _query(self, minx: float, miny: float, maxx: float, maxy: float) -> Tuple[str, Dict[str, str]]:
+        url = f"{self.base_url}/NFHL/MapServer/28/query"
+        params = {
+            "where": "1=1",
+            "outFields": "FLD_ZONE,ZONE",
+            "returnGeometry": "true",
+            "outSR": "4326",
+            "f": "geojson",
+            "geometry": f'{{"xmin":{minx},"ymin":{miny},"xmax":{maxx},"ymax":{maxy},"spatialReference":{{"wkid":4326}}}}',
+            "geometryType": "esriGeometryEnvelope",
+        }
+        return url, params
+
     def get_zone_at_point(self, lat: float, lon: float) -> Optional[Dict[str, Any]]:
         """Return flood zone at point if any."""
         tol = 0.001
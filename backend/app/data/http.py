@@ -0,0 +1,106 @@
+"""Process-wide pooled HTTP clients shared by the data clients."""
+import asyncio
+import logging
+import threading
+import weakref
+from typing import Dict
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_clients: Dict[str, httpx.Client] = {}
+_lock = threading.Lock()
+# Async clients are bound to the event loop that opened their connections
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, httpx.AsyncClient]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _client_options() -> dict:
+    return dict(
+        http2=settings.http2 and _http2_available(),
+        limits=httpx.Limits(
+            max_connections=settings.http_max_connections_per_host,
+            max_keepalive_connections=settings.http_max_keepalive_per_host,
+            keepalive_expiry=settings.http_keepalive_expiry_s,
+        ),
+        timeout=httpx.Timeout(settings.http_timeout_s, connect=settings.http_connect_timeout_s),
+        follow_redirects=True,
+    )
+
+
+def _new_client() -> httpx.Client:
+    return httpx.Client(**_client_options())
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def get_http_client(url: str) -> httpx.Client:
+    """
+    Keep-alive client for the origin (scheme://host:port) of url.
+
+    One pool per origin gives each upstream host its own connection limit. Callers must not
+    close the returned client; close_http_clients() does that at shutdown.
+    """
+    origin = _origin(url)
+    with _lock:
+        client = _clients.get(origin)
+        if client is None or client.is_closed:
+            client = _new_client()
+            _clients[origin] = client
+        return client
+
+
+def get_async_http_client(url: str) -> httpx.AsyncClient:
+    """Async counterpart of get_http_client, pooled per origin on the running event loop."""
+    loop = asyncio.get_running_loop()
+    origin = _origin(url)
+    with _lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(origin)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(**_client_options())
+            clients[origin] = client
+        return client
+
+
+def request_timeout(seconds: float) -> httpx.Timeout:
+    """Per-request read/write budget that keeps the pooled connect timeout."""
+    return httpx.Timeout(seconds, connect=settings.http_connect_timeout_s)
+
+
+def close_http_clients() -> None:
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        try:
+            client.close()
+        except Exception as e:
+            logger.warning(f"Error closing HTTP client: {e}")
+
+
+async def aclose_http_clients() -> None:
+    """Close the async clients of the running event loop."""
+    with _lock:
+        clients = list(_async_clients.pop(asyncio.get_running_loop(), {}).values())
+    for client in clients:
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.warning(f"Error closing HTTP client: {e}")
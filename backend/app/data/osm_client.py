@@ -1,6 +1,10 @@
-import httpx
 from typing import Dict, Any
 from app.core.config import settings
+from app.core.metrics import count_upstream_error, timed
+from app.data.http import get_async_http_client, get_http_client, request_timeout
+from app.data.singleflight import bbox_key, fetch_coalescer
+
+OVERPASS_URL = "https://overpass-api.de/api/interpreter"
 
 
 class OSMClient:
@@ -9,13 +13,58 @@ class OSMClient:
     def __init__(self, base_url: str = None):
         self.base_url = base_url or settings.osm_base_url
 
+    @timed("osm_fetch")
     def get_structures_geojson(
         self, minx: float, miny: float, maxx: float, maxy: float
     ) -> Dict[str, Any]:
         """Return GeoJSON of buildings in bbox (WGS84). Uses Overpass API."""
+        return fetch_coalescer.do(
+            bbox_key("osm_structures", minx, miny, maxx, maxy),
+            lambda: self._get_structures_geojson(minx, miny, maxx, maxy),
+        )
+
+    @timed("osm_fetch")
+    async def get_structures_geojson_async(
+        self, minx: float, miny: float, maxx: float, maxy: float
+    ) -> Dict[str, Any]:
+        """get_structures_geojson on the pooled async client."""
+        return await fetch_coalescer.do_async(
+            bbox_key("osm_structures", minx, miny, maxx, maxy),
+            lambda: self._get_structures_geojson_async(minx, miny, maxx, maxy),
+        )
+
+    def _get_structures_geojson(self, minx: float, miny: float, maxx: float, maxy: float) -> Dict[str, Any]:
+        try:
+            r = get_http_client(OVERPASS_URL).post(
+                OVERPASS_URL, data={"data": self._query(minx, miny, maxx, maxy)}, timeout=request_timeout(25.0)
+            )
+            if r.status_code != 200:
+                count_upstream_error("osm")
+                return {"type": "FeatureCollection", "features": []}
+            data = r.json()
+            from app.core.overpass_to_geojson import overpass_to_geojson
+            return overpass_to_geojson(data)
+        except Exception:
+            count_upstream_error("osm")
+            return {"type": "FeatureCollection", "features": []}
+
+    async def _get_structures_geojson_async(self, minx: float, miny: float, maxx: float, maxy: float) -> Dict[str, Any]:
         try:
-            overpass = "https://overpass-api.de/api/interpreter"
-            query = f"""
+            r = await get_async_http_client(OVERPASS_URL).post(
+                OVERPASS_URL, data={"data": self._query(minx, miny, maxx, maxy)}, timeout=request_timeout(25.0)
+            )
+            if r.status_code != 200:
+                count_upstream_error("osm")
+                return {"type": "FeatureCollection", "features": []}
+            data = r.json()
+            from app.core.overpass_to_geojson import overpass_to_geojson
+            return overpass_to_geojson(data)
+        except Exception:
+            count_upstream_error("osm")
+            return {"type": "FeatureCollection", "features": []}
+
+    def _query(self, minx: float, miny: float, maxx: float, maxy: float) -> str:
+        return f"""
             [out:json][timeout:25];
             (
               way["building"]({miny},{minx},{maxy},{maxx});
@@ -24,12 +73,3 @@ class OSMClient:
             >;
             out skel qt;
             """
-            with httpx.Client(timeout=25.0) as client:
-                r = client.post(overpass, data={"data": query})
-                if r.status_code != 200:
-                    return {"type": "FeatureCollection", "features": []}
-                data = r.json()
-            from app.core.overpass_to_geojson import overpass_to_geojson
-            return overpass_to_geojson(data)
-        except Exception:
-            return {"type": "FeatureCollection", "features": []}
@@ -0,0 +1,86 @@
+"""Single-flight coalescing: concurrent identical fetches share one upstream call."""
+import asyncio
+import threading
+import weakref
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+# Keys are tuples whose first item names the service, e.g. ("usgs_tile", z, tx, ty);
+# callers normalize floats (rounding) so equivalent extents map to one key.
+Key = tuple
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Runs at most one fetch per key at a time; callers arriving while it is in flight wait
+    for it and receive the same result (or exception). Results are shared between callers
+    and must be treated as read-only.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._tasks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Hashable, asyncio.Future]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self.executed: Counter = Counter()
+        self.saved: Counter = Counter()
+
+    def do(self, key: Key, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed[key[0]] += 1
+            else:
+                self.saved[key[0]] += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def do_async(self, key: Key, fn: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            tasks = self._tasks.setdefault(loop, {})
+            task = tasks.get(key)
+            if task is None:
+                task = tasks[key] = loop.create_task(fn())
+                task.add_done_callback(lambda _: tasks.pop(key, None))
+                self.executed[key[0]] += 1
+            else:
+                self.saved[key[0]] += 1
+        # Shielded so a cancelled caller does not cancel the fetch for the others
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Upstream calls made and duplicate calls saved, per service."""
+        with self._lock:
+            return {"executed": dict(self.executed), "saved": dict(self.saved)}
+
+
+fetch_coalescer = SingleFlight()
+
+
+def bbox_key(service: str, minx: float, miny: float, maxx: float, maxy: float, *extra: Hashable) -> Key:
+    """Normalized key for a bbox request (~1 cm rounding absorbs float noise in equal extents)."""
+    return (service, round(minx, 7), round(miny, 7), round(maxx, 7), round(maxy, 7), *extra)
@@ -1,114 +1,447 @@
-import httpx
+import asyncio
+import contextvars
+import functools
 import numpy as np
-import io
 import logging
-from typing import Optional, Dict, Any
+import math
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, Dict, Any, Awaitable, Callable, List, NamedTuple, Tuple
+from affine import Affine
 from app.core.config import settings
-from app.core.geo_utils import bbox_from_center, latlon_to_web_mercator
+from app.core.dem import DEM
+from app.core.metrics import count_upstream_error, timed
+from app.core.parallel import run_in_compute_thread
+from app.core.terrain import generate_terrain
+from app.core.geo_utils import bbox_from_center, meters_per_degree_lat, meters_per_degree_lon
+from app.data.http import get_async_http_client, get_http_client, request_timeout
+from app.data.singleflight import bbox_key, fetch_coalescer
+from app.data.dem_cache import (
+    DemTileCache,
+    TileKey,
+    get_dem_tile_cache,
+    level_for_cell_size,
+    tile_bounds,
+    tile_cell_deg,
+    tile_range,
+)
 
 logger = logging.getLogger(__name__)
 
 
+class _Resolution(NamedTuple):
+    """Requested DEM size in pixels and the pixel budget it was fitted to."""
+    width: int
+    height: int
+    max_pixels: int
+
+
 class USGSClient:
     """Fetch elevation/DEM data from USGS 3DEP."""
 
-    def __init__(self, base_url: str = None):
+    # Pixels per side of the untiled request; the tiled path picks the tile level whose
+    # cell size is at least this fine
+    DEM_SIZE_PX = 100
+
+    def __init__(self, base_url: str = None, tile_cache: Optional[DemTileCache] = None):
         self.base_url = base_url or settings.usgs_base_url
+        if tile_cache is None and settings.dem_cache_enabled:
+            tile_cache = get_dem_tile_cache()
+        self.tile_cache = tile_cache
+        self.tile_px = settings.dem_tile_size_px
 
+    @timed("dem_fetch")
     def fetch_dem(
-        self, lat: float, lon: float, radius_m: float
-    ) -> Optional[Dict[str, Any]]:
-        """Fetch DEM data for area around lat, lon. Returns dict with 'data' (2D array), 'transform', 'nodata'."""
-        try:
+        self, lat: float, lon: float, radius_m: float,
+        cell_size_m: Optional[float] = None, max_pixels: Optional[int] = None
+    ) -> Optional[DEM]:
+        """
+        Fetch DEM data for area around lat, lon (float32 array with NaN nodata, affine transform).
+
+        cell_size_m asks for a target ground resolution; otherwise the DEM is DEM_SIZE_PX
+        square. max_pixels (default settings.dem_max_pixels) caps the cell count, coarsening
+        the resolution if needed. DEM.resolution_m reports what was achieved.
+        """
+        res = self._resolution(lat, lon, radius_m, cell_size_m, max_pixels)
+        return fetch_coalescer.do(
+            self._dem_key(lat, lon, radius_m, res), lambda: self._fetch_dem(lat, lon, radius_m, res)
+        )
+
+    @timed("dem_fetch")
+    async def fetch_dem_async(
+        self, lat: float, lon: float, radius_m: float,
+        cell_size_m: Optional[float] = None, max_pixels: Optional[int] = None
+    ) -> Optional[DEM]:
+        """fetch_dem on the pooled async client; the event loop is free while USGS responds."""
+        res = self._resolution(lat, lon, radius_m, cell_size_m, max_pixels)
+        return await fetch_coalescer.do_async(
+            self._dem_key(lat, lon, radius_m, res), lambda: self._fetch_dem_async(lat, lon, radius_m, res)
+        )
+
+    def _resolution(
+        self, lat: float, lon: float, radius_m: float,
+        cell_size_m: Optional[float], max_pixels: Optional[int]
+    ) -> _Resolution:
+        """Pixel size of the request for the target resolution, within the pixel budget."""
+        if cell_size_m:
             minx, miny, maxx, maxy = bbox_from_center(lat, lon, radius_m)
-            x1, y1 = latlon_to_web_mercator(miny, minx)
-            x2, y2 = latlon_to_web_mercator(maxy, maxx)
-            extent = f"{x1},{y1},{x2},{y2}"
-            # Use 3DEPElevation/ImageServer (correct path per USGS docs)
-            url = f"{self.base_url}/3DEPElevation/ImageServer/exportImage"
-            params = {
-                "bbox": extent,
-                "bboxSR": "3857",  # Web Mercator
-                "imageSR": "4326",  # Request output in WGS84
-                "size": "100,100",
-                "format": "tiff",
-                "pixelType": "F32",
-                "f": "json",
-            }
-            with httpx.Client(timeout=30.0) as client:
-                r = client.get(url, params=params)
-                if r.status_code != 200:
-                    logger.warning(f"USGS API returned {r.status_code}, using synthetic DEM")
-                    return self._synthetic_dem(lat, lon, radius_m)
-                data = r.json()
-                if "href" not in data:
-                    logger.warning("USGS response missing 'href', using synthetic DEM")
-                    return self._synthetic_dem(lat, lon, radius_m)
-                # Fetch the actual TIFF
-                tiff_url = data["href"]
-                with httpx.Client(timeout=30.0) as img_client:
-                    img_r = img_client.get(tiff_url)
-                    if img_r.status_code != 200:
-                        logger.warning(f"TIFF fetch returned {img_r.status_code}, using synthetic DEM")
-                        return self._synthetic_dem(lat, lon, radius_m)
-                    # Parse TIFF with rasterio
-                    return self._parse_tiff(img_r.content, lat, lon, radius_m, minx, miny, maxx, maxy)
+            # Guard the ceil against float noise when the extent is a whole number of cells
+            width = math.ceil((maxx - minx) * meters_per_degree_lon(lat) / cell_size_m - 1e-6)
+            height = math.ceil((maxy - miny) * meters_per_degree_lat(lat) / cell_size_m - 1e-6)
+        else:
+            width = height = self.DEM_SIZE_PX
+        budget = max_pixels or settings.dem_max_pixels
+        if width * height > budget:
+            scale = math.sqrt(budget / (width * height))
+            width, height = int(width * scale), int(height * scale)
+        return _Resolution(max(width, 2), max(height, 2), budget)
+
+    def _dem_key(self, lat: float, lon: float, radius_m: float, res: _Resolution) -> tuple:
+        """Single-flight key: the DEM bbox at the requested size on this client's service."""
+        return bbox_key("usgs_dem", *bbox_from_center(lat, lon, radius_m), self.base_url, res.width, res.height)
+
+    def _tile_key(self, key: TileKey) -> tuple:
+        return ("usgs_tile", *key, self.base_url, self.tile_px)
+
+    def _fetch_dem(self, lat: float, lon: float, radius_m: float, res: _Resolution) -> Optional[DEM]:
+        if self.tile_cache is not None:
+            try:
+                dem = self._fetch_dem_tiled(lat, lon, radius_m, res)
+                if dem is not None:
+                    return dem
+            except Exception as e:
+                logger.warning(f"Tiled DEM fetch failed: {e}, falling back to direct request")
+        try:
+            bbox = bbox_from_center(lat, lon, radius_m)
+            blocks = self._direct_blocks(bbox, res)
+            arr = np.full((res.height, res.width), np.nan, dtype=np.float32)
+            jobs = [
+                (window, functools.partial(self._fetch_export, url, params, window[2:], "DEM block"))
+                for url, params, window in blocks
+            ]
+            failed = self._fetch_many(jobs, functools.partial(self._place_block, arr))
+            if failed == len(jobs):
+                logger.warning("No DEM block could be fetched, using synthetic DEM")
+                return self._synthetic_dem(lat, lon, radius_m)
+            return self._direct_dem(arr, bbox, res, complete=not failed)
         except Exception as e:
             logger.warning(f"Error fetching DEM: {e}, using synthetic DEM")
+            count_upstream_error("usgs")
             return self._synthetic_dem(lat, lon, radius_m)
 
-    def _parse_tiff(
-        self, tiff_bytes: bytes, lat: float, lon: float, radius_m: float,
-        minx: float, miny: float, maxx: float, maxy: float
-    ) -> Dict[str, Any]:
-        """Parse TIFF bytes using rasterio and return elevation array + transform."""
+    async def _fetch_dem_async(self, lat: float, lon: float, radius_m: float, res: _Resolution) -> Optional[DEM]:
+        if self.tile_cache is not None:
+            try:
+                dem = await self._fetch_dem_tiled_async(lat, lon, radius_m, res)
+                if dem is not None:
+                    return dem
+            except Exception as e:
+                logger.warning(f"Tiled DEM fetch failed: {e}, falling back to direct request")
         try:
-            import rasterio
-            from rasterio.io import MemoryFile
-
-            with MemoryFile(tiff_bytes) as memfile:
-                with memfile.open() as dataset:
-                    arr = dataset.read(1)  # First band
-                    nodata = dataset.nodata if dataset.nodata is not None else -9999
-                    # Get transform (Affine) - convert to list for JSON serialization
-                    t = dataset.transform
-                    # Transform is Affine(a, b, c, d, e, f) -> [a, b, c, d, e, f]
-                    # a = cell_width, e = -cell_height, c = lon_ul, f = lat_ul
-                    transform = [t.a, t.b, t.c, t.d, t.e, t.f]
-                    logger.info(f"Parsed TIFF: shape={arr.shape}, nodata={nodata}")
-                    return {
-                        "data": arr.tolist(),
-                        "transform": transform,
-                        "nodata": nodata,
-                        "source": "usgs_3dep",
-                    }
+            bbox = bbox_from_center(lat, lon, radius_m)
+            blocks = self._direct_blocks(bbox, res)
+            arr = np.full((res.height, res.width), np.nan, dtype=np.float32)
+            jobs = [
+                (window, functools.partial(self._fetch_export_async, url, params, window[2:], "DEM block"))
+                for url, params, window in blocks
+            ]
+            failed = await self._fetch_many_async(jobs, functools.partial(self._place_block, arr))
+            if failed == len(jobs):
+                logger.warning("No DEM block could be fetched, using synthetic DEM")
+                return self._synthetic_dem(lat, lon, radius_m)
+            return self._direct_dem(arr, bbox, res, complete=not failed)
         except Exception as e:
-            logger.warning(f"Error parsing TIFF: {e}, using synthetic DEM")
+            logger.warning(f"Error fetching DEM: {e}, using synthetic DEM")
+            count_upstream_error("usgs")
             return self._synthetic_dem(lat, lon, radius_m)
 
-    def _synthetic_dem(self, lat: float, lon: float, radius_m: float) -> Dict[str, Any]:
+    def _fetch_many(self, jobs: List[Tuple[Any, Callable[[], Optional[np.ndarray]]]], place: Callable) -> int:
+        """
+        Run (key, fetch) jobs on up to settings.dem_fetch_concurrency threads and place(key, raster)
+        each result as soon as it arrives. Returns how many jobs failed (their cells stay NaN).
+        """
+        failed = 0
+        with ThreadPoolExecutor(max_workers=max(1, min(len(jobs), settings.dem_fetch_concurrency))) as pool:
+            # Each download runs in a copy of the caller's context so its stages count for the request
+            futures = {pool.submit(contextvars.copy_context().run, fetch): key for key, fetch in jobs}
+            for future in as_completed(futures):
+                try:
+                    raster = future.result()
+                except Exception as e:
+                    logger.warning(f"DEM download {futures[future]} failed: {e}")
+                    count_upstream_error("usgs")
+                    raster = None
+                if raster is None:
+                    failed += 1
+                else:
+                    place(futures[future], raster)
+        return failed
+
+    async def _fetch_many_async(
+        self, jobs: List[Tuple[Any, Callable[[], Awaitable[Optional[np.ndarray]]]]], place: Callable
+    ) -> int:
+        """_fetch_many on the event loop, with settings.dem_tile_timeout_s as a hard deadline per job."""
+        limit = asyncio.Semaphore(settings.dem_fetch_concurrency)
+
+        async def run(key, fetch) -> int:
+            async with limit:
+                try:
+                    raster = await asyncio.wait_for(fetch(), settings.dem_tile_timeout_s)
+                except Exception as e:
+                    logger.warning(f"DEM download {key} failed: {e!r}")
+                    count_upstream_error("usgs")
+                    return 1
+            if raster is None:
+                return 1
+            place(key, raster)
+            return 0
+
+        return sum(await asyncio.gather(*(run(key, fetch) for key, fetch in jobs)))
+
+    def _direct_blocks(
+        self, bbox: Tuple[float, float, float, float], res: _Resolution
+    ) -> List[Tuple[str, Dict[str, str], Tuple[int, int, int, int]]]:
+        """
+        exportImage requests covering bbox at res, split into blocks of at most
+        settings.usgs_max_image_px per side. Each item is (url, params, (row, col, height, width)).
+        """
+        minx, miny, maxx, maxy = bbox
+        width, height = res.width, res.height
+        cell_w = (maxx - minx) / width
+        cell_h = (maxy - miny) / height
+        step = settings.usgs_max_image_px
+        # Use 3DEPElevation/ImageServer (correct path per USGS docs)
+        url = f"{self.base_url}/3DEPElevation/ImageServer/exportImage"
+        blocks = []
+        for row in range(0, height, step):
+            for col in range(0, width, step):
+                bh, bw = min(step, height - row), min(step, width - col)
+                west, north = minx + col * cell_w, maxy - row * cell_h
+                params = {
+                    "bbox": f"{west},{north - bh * cell_h},{west + bw * cell_w},{north}",
+                    "bboxSR": "4326",
+                    "imageSR": "4326",  # Request output in WGS84
+                    "size": f"{bw},{bh}",
+                    "format": "tiff",
+                    "pixelType": "F32",
+                    "f": "json",
+                }
+                blocks.append((url, params, (row, col, bh, bw)))
+        return blocks
+
+    @staticmethod
+    def _place_block(arr: np.ndarray, window: Tuple[int, int, int, int], block: np.ndarray) -> None:
+        row, col, bh, bw = window
+        arr[row:row + bh, col:col + bw] = block
+
+    def _direct_dem(
+        self, arr: np.ndarray, bbox: Tuple[float, float, float, float], res: _Resolution, complete: bool = True
+    ) -> DEM:
+        """DEM for the stitched _direct_blocks array, on the requested cell grid."""
+        minx, miny, maxx, maxy = bbox
+        transform = Affine((maxx - minx) / res.width, 0.0, minx, 0.0, -(maxy - miny) / res.height, maxy)
+        return DEM(data=arr, transform=transform, source="usgs_3dep", complete=complete)
+
+    def _export_href(self, r, what: str) -> Optional[str]:
+        """TIFF url from an exportImage response, or None (logged) when the export failed."""
+        if r.status_code != 200:
+            logger.warning(f"USGS API returned {r.status_code} for {what}")
+            count_upstream_error("usgs")
+            return None
+        href = r.json().get("href")
+        if not href:
+            logger.warning(f"USGS response missing 'href' for {what}")
+            count_upstream_error("usgs")
+            return None
+        return href
+
+    def _fetch_export(
+        self, url: str, params: Dict[str, str], shape: Tuple[int, int], what: str
+    ) -> Optional[np.ndarray]:
+        """One exportImage call: request the export, download the TIFF and decode it."""
+        timeout = request_timeout(settings.dem_tile_timeout_s)
+        r = get_http_client(url).get(url, params=params, timeout=timeout)
+        href = self._export_href(r, what)
+        if href is None:
+            return None
+        img_r = get_http_client(href).get(href, timeout=timeout)
+        if img_r.status_code != 200:
+            logger.warning(f"TIFF fetch returned {img_r.status_code} for {what}")
+            count_upstream_error("usgs")
+            return None
+        return self._read_raster(img_r.content, shape, what)
+
+    async def _fetch_export_async(
+        self, url: str, params: Dict[str, str], shape: Tuple[int, int], what: str
+    ) -> Optional[np.ndarray]:
+        timeout = request_timeout(settings.dem_tile_timeout_s)
+        r = await get_async_http_client(url).get(url, params=params, timeout=timeout)
+        href = self._export_href(r, what)
+        if href is None:
+            return None
+        img_r = await get_async_http_client(href).get(href, timeout=timeout)
+        if img_r.status_code != 200:
+            logger.warning(f"TIFF fetch returned {img_r.status_code} for {what}")
+            count_upstream_error("usgs")
+            return None
+        # Decode off the event loop so other downloads keep flowing
+        return await run_in_compute_thread(self._read_raster, img_r.content, shape, what)
+
+    def _tile_plan(self, lat: float, lon: float, radius_m: float, res: _Resolution) -> Dict[str, Any]:
+        """
+        Tile level, covered tile keys and the window of tile-grid cells covering the bbox: the
+        coarsest level at least as fine as res, coarsened while the window exceeds the pixel budget.
+        """
+        bbox = bbox_from_center(lat, lon, radius_m)
+        minx, miny, maxx, maxy = bbox
+        target_cell = math.sqrt((maxx - minx) / res.width * (maxy - miny) / res.height)
+        z = level_for_cell_size(target_cell, self.tile_px)
+        while True:
+            plan = self._tile_window(bbox, z)
+            height, width = plan["shape"]
+            if z == 0 or height * width <= res.max_pixels:
+                return plan
+            z -= 1
+
+    def _tile_window(self, bbox: Tuple[float, float, float, float], z: int) -> Dict[str, Any]:
+        """Tiles of level z covering bbox, and the bbox's (row0, row1, col0, col1) in their cell grid."""
+        minx, miny, maxx, maxy = bbox
+        tx0, ty0, tx1, ty1 = tile_range(minx, miny, maxx, maxy, z)
+        n = self.tile_px
+        cell = tile_cell_deg(z, n)
+        west, _, _, north = tile_bounds(z, tx0, ty0)
+        col0 = max(int(math.floor((minx - west) / cell)), 0)
+        col1 = min(int(math.ceil((maxx - west) / cell)), (tx1 - tx0 + 1) * n)
+        row0 = max(int(math.floor((north - maxy) / cell)), 0)
+        row1 = min(int(math.ceil((north - miny) / cell)), (ty1 - ty0 + 1) * n)
+        return {
+            "z": z,
+            "range": (tx0, ty0, tx1, ty1),
+            "keys": [(z, tx, ty) for ty in range(ty0, ty1 + 1) for tx in range(tx0, tx1 + 1)],
+            "window": (row0, row1, col0, col1),
+            "shape": (row1 - row0, col1 - col0),
+            "transform": Affine(cell, 0.0, west + col0 * cell, 0.0, -cell, north - row0 * cell),
+        }
+
+    def _fetch_dem_tiled(self, lat: float, lon: float, radius_m: float, res: _Resolution) -> Optional[DEM]:
+        """
+        Assemble the DEM from the fixed tile grid: cached tiles are placed directly and missing
+        ones downloaded concurrently, each copying only its part inside the bbox window. Tiles
+        that fail stay NaN; returns None when none could be fetched so the caller can fall back.
+        """
+        plan = self._tile_plan(lat, lon, radius_m, res)
+        arr = np.full(plan["shape"], np.nan, dtype=np.float32)
+        place = functools.partial(self._place_tile, plan, arr)
+        jobs = []
+        for key in plan["keys"]:
+            tile = self.tile_cache.get(key)
+            if tile is not None:
+                place(key, tile)
+            else:
+                fetch = functools.partial(fetch_coalescer.do, self._tile_key(key),
+                                          functools.partial(self._fetch_and_cache_tile, key))
+                jobs.append((key, fetch))
+        failed = self._fetch_many(jobs, place) if jobs else 0
+        if jobs and failed == len(plan["keys"]):
+            return None
+        return DEM(data=arr, transform=plan["transform"], source="usgs_3dep", complete=not failed)
+
+    async def _fetch_dem_tiled_async(
+        self, lat: float, lon: float, radius_m: float, res: _Resolution
+    ) -> Optional[DEM]:
+        plan = self._tile_plan(lat, lon, radius_m, res)
+        arr = np.full(plan["shape"], np.nan, dtype=np.float32)
+        place = functools.partial(self._place_tile, plan, arr)
+        jobs = []
+        for key in plan["keys"]:
+            tile = self.tile_cache.get(key)
+            if tile is not None:
+                place(key, tile)
+            else:
+                fetch = functools.partial(fetch_coalescer.do_async, self._tile_key(key),
+                                          functools.partial(self._fetch_and_cache_tile_async, key))
+                jobs.append((key, fetch))
+        failed = await self._fetch_many_async(jobs, place) if jobs else 0
+        if jobs and failed == len(plan["keys"]):
+            return None
+        return DEM(data=arr, transform=plan["transform"], source="usgs_3dep", complete=not failed)
+
+    def _place_tile(self, plan: Dict[str, Any], arr: np.ndarray, key: TileKey, tile: np.ndarray) -> None:
+        """Copy the part of tile inside the plan's window into arr (the window's cells)."""
+        tx0, ty0, _, _ = plan["range"]
+        row0, row1, col0, col1 = plan["window"]
+        _, tx, ty = key
+        n = self.tile_px
+        r, c = (ty - ty0) * n, (tx - tx0) * n
+        r0, r1 = max(r, row0), min(r + n, row1)
+        c0, c1 = max(c, col0), min(c + n, col1)
+        if r0 < r1 and c0 < c1:
+            arr[r0 - row0:r1 - row0, c0 - col0:c1 - col0] = tile[r0 - r:r1 - r, c0 - c:c1 - c]
+
+    def _fetch_and_cache_tile(self, key: TileKey) -> Optional[np.ndarray]:
+        tile = self._fetch_tile(key)
+        if tile is not None:
+            self.tile_cache.put(key, tile)
+        return tile
+
+    async def _fetch_and_cache_tile_async(self, key: TileKey) -> Optional[np.ndarray]:
+        tile = await self._fetch_tile_async(key)
+        if tile is not None:
+            self.tile_cache.put(key, tile)
+        return tile
+
+    def _tile_request(self, key: TileKey) -> Tuple[str, Dict[str, str]]:
+        tminx, tminy, tmaxx, tmaxy = tile_bounds(*key)
+        url = f"{self.base_url}/3DEPElevation/ImageServer/exportImage"
+        params = {
+            "bbox": f"{tminx},{tminy},{tmaxx},{tmaxy}",
+            "bboxSR": "4326",
+            "imageSR": "4326",
+            "size": f"{self.tile_px},{self.tile_px}",
+            "format": "tiff",
+            "pixelType": "F32",
+            "f": "json",
+        }
+        return url, params
+
+    def _fetch_tile(self, key: TileKey) -> Optional[np.ndarray]:
+        """Fetch one tile as a float32 (tile_px x tile_px) array with NaN for nodata."""
+        url, params = self._tile_request(key)
+        return self._fetch_export(url, params, (self.tile_px, self.tile_px), f"DEM tile {key}")
+
+    async def _fetch_tile_async(self, key: TileKey) -> Optional[np.ndarray]:
+        url, params = self._tile_request(key)
+        return await self._fetch_export_async(url, params, (self.tile_px, self.tile_px), f"DEM tile {key}")
+
+    @timed("tiff_decode")
+    def _read_raster(self, tiff_bytes: bytes, shape: Tuple[int, int], what: str) -> Optional[np.ndarray]:
+        """First band of a TIFF as float32 with NaN for nodata; None if it is not the expected shape."""
+        from rasterio.io import MemoryFile
+
+        with MemoryFile(tiff_bytes) as memfile:
+            with memfile.open() as dataset:
+                arr = dataset.read(1, out_dtype="float32")
+                if dataset.nodata is not None:
+                    arr[arr == np.float32(dataset.nodata)] = np.nan
+        if arr.shape != shape:
+            logger.warning(f"{what} has shape {arr.shape}, expected {shape}")
+            return None
+        return arr
+
+    def _synthetic_dem(self, lat: float, lon: float, radius_m: float) -> DEM:
         """Return synthetic DEM for testing when USGS is unavailable."""
         size = 50
-        arr = np.zeros((size, size))
-        cx, cy = size // 2, size // 2
-        for i in range(size):
-            for j in range(size):
-                dist = np.sqrt((i - cx) ** 2 + (j - cy) ** 2) / cx
-                arr[i, j] = 200 - dist * 50 + np.random.rand() * 5
+        # 200 m peak falling 50 m per half-width, with 0-5 m of seeded noise
+        arr = generate_terrain("cone", (size, size), settings.synthetic_seed, base_m=150.0, relief_m=50.0)
         meters_per_deg_lat = 111320
         meters_per_deg_lon = 111320 * 0.7
         cell_width = (2 * radius_m) / size / meters_per_deg_lon
         cell_height = (2 * radius_m) / size / meters_per_deg_lat
-        transform = [
+        transform = Affine(
             cell_width,
             0,
             lon - radius_m / meters_per_deg_lon,
             0,
             -cell_height,
             lat + radius_m / meters_per_deg_lat,
-        ]
-        return {
-            "data": arr.tolist(),
-            "transform": transform,
-            "nodata": -9999,
-        }
+        )
+        return DEM(data=arr, transform=transform, source="synthetic")
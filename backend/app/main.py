@@ -1,9 +1,26 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.controllers.hydrology_controller import router as hydrology_router
+from app.controllers.metrics_controller import router as metrics_router
+from app.controllers.tiles_controller import router as tiles_router
+from app.core.metrics import ServerTimingMiddleware
+from app.core.parallel import shutdown_compute_executor, shutdown_process_pool
+from app.data.http import aclose_http_clients, close_http_clients
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await aclose_http_clients()
+    close_http_clients()
+    shutdown_compute_executor()
+    shutdown_process_pool()
+
 
-app = FastAPI(title="Watershed Analysis API", version="0.2.0")
+app = FastAPI(title="Watershed Analysis API", version="0.2.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -11,10 +28,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "ETag", "X-Raster-Transform"],
 )
+app.add_middleware(ServerTimingMiddleware)
 
-# Only include watershed analysis endpoints
+# Only include watershed analysis and map tile endpoints
 app.include_router(hydrology_router)
+app.include_router(metrics_router)
+app.include_router(tiles_router)
 
 
 @app.get("/health")
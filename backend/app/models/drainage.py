@@ -1,6 +1,9 @@
 from dataclasses import dataclass
 from typing import List, Any
+from app.data.dem_provider import default_dem_client
 from app.data.usgs_client import USGSClient
+from app.core.dem import as_dem
+from app.core.metrics import timed
 from app.core.geo_utils import bbox_from_center
 import numpy as np
 
@@ -21,37 +24,35 @@ class DrainageModel:
     """Pure business logic for water flow direction and accumulation."""
 
     def __init__(self, usgs_client: USGSClient = None):
-        self._client = usgs_client or USGSClient()
+        self._client = usgs_client or default_dem_client()
 
     def calculate_flow_direction(self, lat: float, lon: float) -> FlowPath:
         """Calculate where water flows from a given point. Returns flow path as LineString."""
-        dem = self._client.fetch_dem(lat, lon, 500)
+        dem = as_dem(self._client.fetch_dem(lat, lon, 500))
         if dem is None:
             return FlowPath(
                 geometry={"type": "LineString", "coordinates": [[lon, lat]]},
                 properties={"distance_m": 0, "reaches_stream": False},
             )
-        arr = np.array(dem.get("data", []))
+        arr = dem.data
         if arr.size == 0:
             return FlowPath(
                 geometry={"type": "LineString", "coordinates": [[lon, lat]]},
                 properties={"distance_m": 0, "reaches_stream": False},
             )
-        transform = dem.get("transform", [])
-        coords = self._trace_flow_path(arr, transform, lat, lon)
+        coords = self._trace_flow_path(arr, dem.transform_list, lat, lon)
         dist_m = self._path_length_m(coords) if len(coords) > 1 else 0
         return FlowPath(
             geometry={"type": "LineString", "coordinates": coords},
             properties={"distance_m": round(dist_m, 2), "reaches_stream": False},
         )
 
+    @timed("flow_trace")
     def _trace_flow_path(
         self, arr: np.ndarray, transform: list, lat: float, lon: float
     ) -> List[List[float]]:
-        """Trace downhill from point; return list of [lon, lat]."""
+        """Trace downhill from point; return list of [lon, lat]. arr has NaN for nodata."""
         h, w = arr.shape
-        nodata = -9999
-        arr = np.where(arr == nodata, np.nan, arr)
         cell_width = transform[0] if len(transform) >= 1 else 0.0001
         cell_height = -transform[4] if len(transform) >= 5 else 0.0001
         lon_ul, lat_ul = transform[2], transform[5]
@@ -1,5 +1,12 @@
+import math
 from dataclasses import dataclass
-from typing import List, Any
+from typing import Dict, List, Any, Optional, Tuple, Union
+import numpy as np
+from app.core.contouring import clip_lines, contour_lines, simplify_lines
+from app.core.dem import DEM, as_dem
+from app.core.geo_utils import meters_per_degree_lat, meters_per_degree_lon, web_mercator_pixel_m
+from app.core.metrics import stage, timed
+from app.data.dem_provider import default_dem_client
 from app.data.usgs_client import USGSClient
 
 
@@ -7,31 +14,70 @@ from app.data.usgs_client import USGSClient
 class Contours:
     type: str = "FeatureCollection"
     features: List[Any] = None
+    properties: Dict[str, Any] = None
 
     def __post_init__(self):
         if self.features is None:
             self.features = []
+        if self.properties is None:
+            self.properties = {}
+
+
+@dataclass
+class ContourOutput:
+    """
+    Output stage settings: simplification tolerance in meters (0 = none) and decimal places
+    kept in coordinates (None = full precision).
+    """
+    tolerance_m: float = 0.0
+    precision: Optional[int] = None
+
+    # Simplify to half a map pixel; keep enough decimals to resolve a quarter pixel
+    TOLERANCE_PX = 0.5
+    PRECISION_PX = 0.25
+
+    @classmethod
+    def for_request(
+        cls, lat: float, zoom: Optional[float] = None, tolerance_m: Optional[float] = None,
+        precision: Optional[int] = None
+    ) -> "ContourOutput":
+        """Settings for a map zoom level; explicit tolerance_m/precision take precedence."""
+        if zoom is not None:
+            pixel_m = web_mercator_pixel_m(zoom, lat)
+            if tolerance_m is None:
+                tolerance_m = cls.TOLERANCE_PX * pixel_m
+            if precision is None:
+                pixel_deg = cls.PRECISION_PX * pixel_m / meters_per_degree_lat(lat)
+                precision = min(max(math.ceil(-math.log10(pixel_deg)), 0), 9)
+        return cls(tolerance_m=tolerance_m or 0.0, precision=precision)
+
+    @property
+    def active(self) -> bool:
+        return self.tolerance_m > 0 or self.precision is not None
 
 
 class ElevationModel:
     """Pure business logic for elevation and contour processing."""
 
     def __init__(self, usgs_client: USGSClient = None):
-        self._client = usgs_client or USGSClient()
+        self._client = usgs_client or default_dem_client()
 
-    def get_contours(self, lat: float, lon: float, radius_m: float, interval_m: float) -> Contours:
+    def get_contours(
+        self, lat: float, lon: float, radius_m: float, interval_m: float, output: Optional[ContourOutput] = None
+    ) -> Contours:
         dem_data = self._client.fetch_dem(lat, lon, radius_m)
         if dem_data is None:
             return Contours(features=[])
-        return self._generate_contours(dem_data, interval_m)
+        return self._generate_contours(dem_data, interval_m, output)
 
     def get_contours_for_bbox(
-        self, minx: float, miny: float, maxx: float, maxy: float, interval_m: float = 5.0
+        self, minx: float, miny: float, maxx: float, maxy: float, interval_m: float = 5.0,
+        output: Optional[ContourOutput] = None
     ) -> Contours:
-        """Generate contours for a bounding box (lon, lat) with jet_value for colormap."""
-        import math
-        from app.core.geo_utils import meters_per_degree_lat, meters_per_degree_lon
-
+        """
+        Generate contours for a bounding box (lon, lat) with jet_value for colormap.
+        output simplifies and quantizes the lines clipped to the box.
+        """
         center_lon = (minx + maxx) / 2.0
         center_lat = (miny + maxy) / 2.0
         # Radius to cover bbox: half the diagonal in meters
@@ -46,85 +92,49 @@ class ElevationModel:
         dem_data = self._client.fetch_dem(center_lat, center_lon, radius_m)
         if dem_data is None:
             return Contours(features=[])
-        
-        contours = self._generate_contours_with_jet(dem_data, interval_m)
-        
-        # Clip contours to the requested bbox
-        clipped_features = []
-        for feature in contours.features:
-            coords = feature.get("geometry", {}).get("coordinates", [])
-            # Filter coordinates to only those within bbox
-            clipped_coords = [
-                [x, y] for x, y in coords
-                if minx <= x <= maxx and miny <= y <= maxy
-            ]
-            # Only include if we have at least 2 points (valid line)
-            if len(clipped_coords) >= 2:
-                clipped_feature = {
-                    "type": "Feature",
-                    "geometry": {"type": "LineString", "coordinates": clipped_coords},
-                    "properties": feature.get("properties", {}),
-                }
-                clipped_features.append(clipped_feature)
-        
-        return Contours(features=clipped_features)
-
-    def _generate_contours(self, dem_data: dict, interval_m: float) -> Contours:
-        import numpy as np
-        from affine import Affine
-        data = dem_data.get("data")
-        transform = dem_data.get("transform")
-        if data is None or transform is None:
+
+        return self._generate_contours_with_jet(dem_data, interval_m, output, clip_bbox=(minx, miny, maxx, maxy))
+
+    @timed("contours")
+    def _generate_contours(
+        self, dem_data: Union[DEM, dict], interval_m: float, output: Optional[ContourOutput] = None
+    ) -> Contours:
+        dem = as_dem(dem_data)
+        if dem is None:
             return Contours(features=[])
-        arr = np.array(data)
+        arr = dem.data
         if arr.size == 0:
             return Contours(features=[])
-        nodata = dem_data.get("nodata", -9999)
-        arr = np.where(arr == nodata, np.nan, arr)
         valid = np.nanmin(arr), np.nanmax(arr)
         if np.isnan(valid[0]) or np.isnan(valid[1]):
             return Contours(features=[])
         min_elev = int(np.nanmin(arr) // interval_m) * interval_m
         max_elev = int(np.nanmax(arr) // interval_m + 1) * interval_m
         levels = np.arange(min_elev, max_elev + interval_m, interval_m)
+        # Every line is closed back to its first vertex
+        lines = [(level, np.vstack([v, v[:1]])) for level, v in contour_lines(arr, levels, dem.transform)]
+        lines, properties = self._apply_output(lines, dem, output)
         features = []
-        aff = Affine(*transform) if isinstance(transform, (list, tuple)) else transform
-        for level in levels:
-            from skimage import measure
-            try:
-                contours = measure.find_contours(arr, level)
-            except Exception:
-                continue
-            for contour in contours:
-                if len(contour) < 3:
-                    continue
-                coords = []
-                for row, col in contour:
-                    x, y = aff * (col, row)
-                    coords.append([float(x), float(y)])
-                coords.append(coords[0])
-                features.append({
-                    "type": "Feature",
-                    "geometry": {"type": "LineString", "coordinates": coords},
-                    "properties": {"elevation": float(level)},
-                })
-        return Contours(features=features)
-
-    def _generate_contours_with_jet(self, dem_data: dict, interval_m: float) -> Contours:
-        """Generate contours with jet_value (0-1) for colormap."""
-        import numpy as np
-        from affine import Affine
-        from skimage import measure
-
-        data = dem_data.get("data")
-        transform = dem_data.get("transform")
-        if data is None or transform is None:
+        for level, vertices in lines:
+            features.append({
+                "type": "Feature",
+                "geometry": {"type": "LineString", "coordinates": vertices.tolist()},
+                "properties": {"elevation": level},
+            })
+        return Contours(features=features, properties=properties)
+
+    @timed("contours")
+    def _generate_contours_with_jet(
+        self, dem_data: Union[DEM, dict], interval_m: float, output: Optional[ContourOutput] = None,
+        clip_bbox: Optional[Tuple[float, float, float, float]] = None
+    ) -> Contours:
+        """Generate contours with jet_value (0-1) for colormap, clipped to clip_bbox if given."""
+        dem = as_dem(dem_data)
+        if dem is None:
             return Contours(features=[])
-        arr = np.array(data)
+        arr = dem.data
         if arr.size == 0:
             return Contours(features=[])
-        nodata = dem_data.get("nodata", -9999)
-        arr = np.where(arr == nodata, np.nan, arr)
         valid_min, valid_max = np.nanmin(arr), np.nanmax(arr)
         if np.isnan(valid_min) or np.isnan(valid_max):
             return Contours(features=[])
@@ -135,32 +145,47 @@ class ElevationModel:
         start_level = int(min_elev // interval_m) * interval_m
         end_level = int(max_elev // interval_m + 1) * interval_m
         levels = np.arange(start_level, end_level + interval_m, interval_m)
+        levels = levels[(levels >= min_elev) & (levels <= max_elev)]
 
+        lines = contour_lines(arr, levels, dem.transform)
+        if clip_bbox is not None:
+            with stage("contour_clip"):
+                lines = clip_lines(lines, clip_bbox)
+        lines, properties = self._apply_output(lines, dem, output)
         features = []
-        aff = Affine(*transform) if isinstance(transform, (list, tuple)) else transform
-        for level in levels:
-            if level < min_elev or level > max_elev:
-                continue
-            try:
-                contour_list = measure.find_contours(arr, level)
-            except Exception:
-                continue
-            for contour in contour_list:
-                if len(contour) < 3:
-                    continue
-                coords = []
-                for row, col in contour:
-                    x, y = aff * (col, row)
-                    coords.append([float(x), float(y)])
-                if len(coords) < 2:
-                    continue
-                jet_value = float((level - min_elev) / elev_range)
-                features.append({
-                    "type": "Feature",
-                    "geometry": {"type": "LineString", "coordinates": coords},
-                    "properties": {
-                        "elevation": float(level),
-                        "jet_value": round(jet_value, 4),
-                    },
-                })
-        return Contours(features=features)
+        for level, vertices in lines:
+            jet_value = float((level - min_elev) / elev_range)
+            features.append({
+                "type": "Feature",
+                "geometry": {"type": "LineString", "coordinates": vertices.tolist()},
+                "properties": {
+                    "elevation": level,
+                    "jet_value": round(jet_value, 4),
+                },
+            })
+        return Contours(features=features, properties=properties)
+
+    def _apply_output(
+        self, lines: List[Tuple[float, np.ndarray]], dem: DEM, output: Optional[ContourOutput]
+    ) -> Tuple[List[Tuple[float, np.ndarray]], Dict[str, Any]]:
+        """
+        Simplify and quantize lines per output as the last step before they become features
+        (after any clipping), so vertex_count_in/out count the vertices of the emitted lines
+        without and with this stage. properties also report the settings.
+        """
+        if output is None or not output.active:
+            return lines, {}
+        _, miny, _, maxy = dem.bounds
+        tolerance_deg = output.tolerance_m / meters_per_degree_lat((miny + maxy) / 2.0)
+        vertices_in = sum(len(v) for _, v in lines)
+        with stage("contour_simplify"):
+            lines = simplify_lines(lines, tolerance_deg, output.precision)
+        vertices_out = sum(len(v) for _, v in lines)
+        return lines, {
+            "simplify_tolerance_m": round(output.tolerance_m, 3),
+            "simplify_tolerance_deg": tolerance_deg,
+            "precision_decimals": output.precision,
+            "vertex_count_in": vertices_in,
+            "vertex_count_out": vertices_out,
+            "vertex_reduction": round(1 - vertices_out / vertices_in, 4) if vertices_in else 0.0,
+        }
@@ -2,6 +2,7 @@ from dataclasses import dataclass
 from typing import List, Optional, Dict, Any
 from app.models.flood_risk import FloodRiskModel
 from app.models.drainage import DrainageModel
+from app.data.dem_provider import default_dem_client
 from app.data.usgs_client import USGSClient
 
 
@@ -34,7 +35,7 @@ class PlacementModel:
     ):
         self._flood = flood_model or FloodRiskModel()
         self._drainage = drainage_model or DrainageModel()
-        self._usgs = usgs_client or USGSClient()
+        self._usgs = usgs_client or default_dem_client()
 
     def suggest_placements(
         self, lat: float, lon: float, radius_m: float, num_suggestions: int
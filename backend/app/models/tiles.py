@@ -0,0 +1,137 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core import mvt
+from app.core.config import settings
+from app.core.geo_utils import web_mercator_pixel_m
+from app.core.metrics import stage
+from app.data.singleflight import SingleFlight
+from app.models.elevation import ContourOutput, ElevationModel
+from app.models.flood_risk import FloodRiskModel
+from app.models.watershed import WatershedModel
+
+TileKey = Tuple[Any, ...]  # (layer, z, x, y, *params)
+
+
+@dataclass
+class VectorTile:
+    data: bytes
+    etag: str
+
+
+class VectorTileCache:
+    """Rendered tiles in memory, bounded in bytes with least-recently-used eviction."""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._tiles: "OrderedDict[TileKey, VectorTile]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.counters: Dict[str, int] = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key: TileKey) -> Optional[VectorTile]:
+        with self._lock:
+            tile = self._tiles.get(key)
+            if tile is None:
+                self.counters["misses"] += 1
+                return None
+            self._tiles.move_to_end(key)
+            self.counters["hits"] += 1
+            return tile
+
+    def put(self, key: TileKey, tile: VectorTile) -> None:
+        size = len(tile.data)
+        with self._lock:
+            if size > self.max_bytes:
+                return
+            old = self._tiles.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old.data)
+            self._tiles[key] = tile
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._tiles.popitem(last=False)
+                self._bytes -= len(evicted.data)
+                self.counters["evictions"] += 1
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.counters["hits"] + self.counters["misses"]
+            return {
+                **self.counters,
+                "tiles": len(self._tiles),
+                "bytes": self._bytes,
+                "hit_ratio": self.counters["hits"] / lookups if lookups else 0.0,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tiles.clear()
+            self._bytes = 0
+
+
+class VectorTileModel:
+    """
+    z/x/y Mapbox Vector Tiles of contour lines, the watershed heatmap and FEMA flood zones,
+    rendered from the elevation, watershed and flood models and kept in a bounded cache.
+    Concurrent misses for one tile share a single render. Tiles below settings.tile_min_zoom
+    are empty.
+    """
+
+    LAYERS = ("contours", "watershed", "flood")
+
+    def __init__(
+        self, elevation_model: ElevationModel = None, watershed_model: WatershedModel = None,
+        flood_model: FloodRiskModel = None, cache: VectorTileCache = None
+    ):
+        self._elevation = elevation_model or ElevationModel()
+        self._watershed = watershed_model or WatershedModel()
+        self._flood = flood_model or FloodRiskModel()
+        self.cache = cache or VectorTileCache(settings.tile_cache_bytes)
+        self.renders = SingleFlight()
+
+    def get_tile(self, layer: str, z: int, x: int, y: int, interval_m: float = 5.0) -> VectorTile:
+        """Tile of layer; raises ValueError for an unknown layer or a tile outside the z grid."""
+        if layer not in self.LAYERS:
+            raise ValueError(f"Unknown tile layer: {layer}")
+        if not (0 <= x < 2 ** z and 0 <= y < 2 ** z):
+            raise ValueError(f"Tile {z}/{x}/{y} is outside the grid")
+        key = (layer, z, x, y, interval_m) if layer == "contours" else (layer, z, x, y)
+        tile = self.cache.get(key)
+        if tile is not None:
+            return tile
+        return self.renders.do(key, lambda: self._render(key, layer, z, x, y, interval_m))
+
+    def _render(self, key: TileKey, layer: str, z: int, x: int, y: int, interval_m: float) -> VectorTile:
+        features = []
+        if z >= settings.tile_min_zoom:
+            features = getattr(self, f"_{layer}_features")(z, x, y, interval_m)
+        with stage("tile_encode"):
+            data = mvt.encode_tile({layer: mvt.encode_layer(layer, features, mvt.tile_bounds(z, x, y))})
+        tile = VectorTile(data=data, etag=f'"{hashlib.blake2b(data, digest_size=12).hexdigest()}"')
+        self.cache.put(key, tile)
+        return tile
+
+    def _contours_features(self, z: int, x: int, y: int, interval_m: float) -> List[Dict[str, Any]]:
+        # Lines run into the tile buffer so they join up across tile edges
+        minx, miny, maxx, maxy = mvt.buffered_bounds(z, x, y)
+        output = ContourOutput.for_request((miny + maxy) / 2.0, zoom=z)
+        return self._elevation.get_contours_for_bbox(minx, miny, maxx, maxy, interval_m, output).features
+
+    def _watershed_features(self, z: int, x: int, y: int, interval_m: float) -> List[Dict[str, Any]]:
+        minx, miny, maxx, maxy = mvt.tile_bounds(z, x, y)
+        # About tile_grid_cells heatmap cells across the tile, within the grid endpoint's limits
+        tile_m = 256 * web_mercator_pixel_m(z, (miny + maxy) / 2.0)
+        spacing_m = min(max(tile_m / settings.tile_grid_cells, 50.0), 1000.0)
+        # Basins are routed on a DEM reaching past the tile so they are not cut at its edge
+        mx, my = (maxx - minx) * settings.tile_dem_margin, (maxy - miny) * settings.tile_dem_margin
+        dem = self._watershed.fetch_grid_dem(minx - mx, miny - my, maxx + mx, maxy + my, spacing_m)
+        # Raw area_ha and tc_min only: jet values normalized per tile would not match across edges
+        records = self._watershed.stream_watershed_grid(minx, miny, maxx, maxy, spacing_m, dem=dem)
+        return [r for r in records if r["type"] == "Feature"]
+
+    def _flood_features(self, z: int, x: int, y: int, interval_m: float) -> List[Dict[str, Any]]:
+        return self._flood.get_flood_zones(*mvt.tile_bounds(z, x, y)).features
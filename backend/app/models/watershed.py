@@ -1,31 +1,29 @@
+import asyncio
+import hashlib
+import math
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import wait
 from dataclasses import dataclass
-from typing import List, Any, Set, Tuple
+from typing import List, Any, Dict, Iterator, Optional, Set, Tuple, Union
 from app.data.nhd_client import NHDClient
-from app.core.geo_utils import bbox_from_center
+from app.core.geo_utils import bbox_from_center, meters_per_degree_lat, meters_per_degree_lon
 import numpy as np
+from app.data.dem_provider import default_dem_client
 from app.data.usgs_client import USGSClient
-from shapely.geometry import Polygon as ShapelyPolygon
+from app.core import dem_conditioning
+from app.core.contouring import contour_lines
+from app.core.dem import DEM, as_dem
+from app.core.metrics import ROUTING_CACHE, stage, timed
+from app.core.config import settings
+from app.core.parallel import SharedRasters, attach, get_process_pool, run_in_compute_thread
+from app.core.flow_routing import FlowRouting, flow_direction_d8
+from app.core.vectorize import mask_to_geojson
+from shapely.geometry import Polygon as ShapelyPolygon, shape
 from pyproj import Geod
 
-
-# D8 flow direction encoding: 1=E, 2=SE, 3=S, 4=SW, 5=W, 6=NW, 7=N, 8=NE
-# Row,col deltas for each direction (drow, dcol)
-D8_OFFSETS = [
-    (0, 1),   # 1 E
-    (1, 1),   # 2 SE
-    (1, 0),   # 3 S
-    (1, -1),  # 4 SW
-    (0, -1),  # 5 W
-    (-1, -1), # 6 NW
-    (-1, 0),  # 7 N
-    (-1, 1),  # 8 NE
-]
-
-# Inverse: for direction d, which neighbors flow INTO this cell (their flow points to us)
-# Neighbor at (r+dr, c+dc) flows into (r,c) if its flow direction points to (r,c)
-def _inverse_d8() -> List[Tuple[int, int]]:
-    # All 8 neighbors can potentially flow into us
-    return [(-dr, -dc) for dr, dc in D8_OFFSETS]
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -63,18 +61,381 @@ class WatershedContours:
             self.properties = {}
 
 
+@dataclass
+class WatershedCollection:
+    type: str = "FeatureCollection"
+    features: List[Any] = None
+    properties: dict = None
+
+    def __post_init__(self):
+        if self.features is None:
+            self.features = []
+        if self.properties is None:
+            self.properties = {}
+
+
 @dataclass
 class WatershedGrid:
     features: List[dict]
     metadata: dict
 
 
+@dataclass
+class WatershedRaster:
+    """Grid values as north-up float32 rasters keyed by name, [a, b, c, d, e, f] lon/lat geotransform."""
+    bands: Dict[str, np.ndarray]
+    transform: List[float]
+    metadata: dict
+
+
+@dataclass
+class _GridSamples:
+    """Grid point axes (lat-major order) and the area/Tc evaluated at every point."""
+    lats: np.ndarray
+    lons: np.ndarray
+    ok: np.ndarray
+    areas: np.ndarray
+    tcs: np.ndarray
+    lat_spacing_deg: float
+    lon_spacing_deg: float
+    dem_metadata: Dict[str, Any]
+    error: Optional[str] = None
+
+    @classmethod
+    def failed(cls, error: str) -> "_GridSamples":
+        empty = np.zeros(0)
+        return cls(empty, empty, empty.astype(bool), empty, empty, 0.0, 0.0, {}, error=error)
+
+    def stats(self) -> Dict[str, float]:
+        """Min/max of the valid values, with the ranges used to normalize them (1 when flat)."""
+        areas, tcs = self.areas[self.ok], self.tcs[self.ok]
+        stats = {
+            "min_area_ha": float(np.min(areas)), "max_area_ha": float(np.max(areas)),
+            "min_tc_min": float(np.min(tcs)), "max_tc_min": float(np.max(tcs)),
+        }
+        area_range = stats["max_area_ha"] - stats["min_area_ha"]
+        tc_range = stats["max_tc_min"] - stats["min_tc_min"]
+        stats["area_range"] = area_range if area_range > 0 else 1.0
+        stats["tc_range"] = tc_range if tc_range > 0 else 1.0
+        return stats
+
+    def metadata(self, point_count: int) -> Dict[str, Any]:
+        return _grid_metadata(self.dem_metadata, point_count, self.stats())
+
+
+def _grid_metadata(dem_metadata: Dict[str, Any], point_count: int, stats: Dict[str, float]) -> Dict[str, Any]:
+    """Grid response metadata: spacing, point count, value min/max and the DEM used."""
+    return {
+        "grid_spacing_m": dem_metadata["grid_spacing_m"],
+        "point_count": point_count,
+        **{k: round(stats[k], 2) for k in ("min_area_ha", "max_area_ha", "min_tc_min", "max_tc_min")},
+        **{k: v for k, v in dem_metadata.items() if k != "grid_spacing_m"},
+    }
+
+
+def _cell_rectangle(lat: float, lon: float, half_lat: float, half_lon: float) -> List[List[List[float]]]:
+    """Polygon coordinates of the heatmap cell centered on a grid point."""
+    return [[
+        [lon - half_lon, lat - half_lat],
+        [lon + half_lon, lat - half_lat],
+        [lon + half_lon, lat + half_lat],
+        [lon - half_lon, lat + half_lat],
+        [lon - half_lon, lat - half_lat],
+    ]]
+
+
+@dataclass
+class _GridPlan:
+    """DEM grid and routing products for a bbox, with the grid point axes to sample on it."""
+    grid: Optional["_DemGrid"]
+    products: Optional["_RoutingProducts"]
+    lats: np.ndarray
+    lons: np.ndarray
+    lat_spacing_deg: float
+    lon_spacing_deg: float
+    dem_metadata: Dict[str, Any]
+    error: Optional[str] = None
+
+    @classmethod
+    def failed(cls, error: str) -> "_GridPlan":
+        empty = np.zeros(0)
+        return cls(None, None, empty, empty, 0.0, 0.0, {}, error=error)
+
+
+@dataclass
+class FlowAccumulation:
+    """Upstream cell count and contributing area (m²) for every DEM cell."""
+    cell_count: np.ndarray
+    area_m2: np.ndarray
+    transform: list
+
+
+@dataclass
+class TimeOfConcentration:
+    """Kirpich Tc inputs and result for every DEM cell taken as a potential outlet."""
+    longest_path_m: np.ndarray
+    max_elevation: np.ndarray
+    slope: np.ndarray
+    tc_min: np.ndarray
+    transform: list
+
+
+@dataclass
+class _DemGrid:
+    """DEM array with NaN nodata plus the cell geometry the hydrology steps need."""
+    arr: np.ndarray
+    transform: list
+    cell_width: float
+    cell_height: float
+    lon_ul: float
+    lat_ul: float
+    source: str = "unknown"
+    complete: bool = True
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.arr.shape
+
+    def content_key(self) -> Tuple[int, float, str]:
+        """
+        Cheap fingerprint of the elevations: NaN count and sum over every cell plus a hash of
+        a strided sample of at most 256 x 256 cells. A few ms at 2000 x 2000, against the
+        seconds routing takes.
+        """
+        h, w = self.arr.shape
+        valid = ~np.isnan(self.arr)
+        total = float(np.sum(self.arr, where=valid, dtype=np.float64))
+        sample = np.ascontiguousarray(self.arr[::max(h // 256, 1), ::max(w // 256, 1)])
+        digest = hashlib.blake2b(sample.tobytes(), digest_size=16).hexdigest()
+        return int(self.arr.size - np.count_nonzero(valid)), total, digest
+
+    def cell_of(self, lat: float, lon: float) -> Tuple[int, int]:
+        h, w = self.arr.shape
+        col = int(np.clip((lon - self.lon_ul) / self.cell_width, 0, w - 1))
+        row = int(np.clip((self.lat_ul - lat) / self.cell_height, 0, h - 1))
+        return row, col
+
+    def cells_of(self, lats: np.ndarray, lons: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized cell_of for arrays of points."""
+        h, w = self.arr.shape
+        cols = np.clip((np.asarray(lons) - self.lon_ul) / self.cell_width, 0, w - 1).astype(np.int64)
+        rows = np.clip((self.lat_ul - np.asarray(lats)) / self.cell_height, 0, h - 1).astype(np.int64)
+        return rows, cols
+
+    def cell_size_m(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Per-row cell width and height in meters (h x 1), using the row-center latitude."""
+        h = self.arr.shape[0]
+        row_lats = self.lat_ul - (np.arange(h) + 0.5) * self.cell_height
+        m_lon = np.array([meters_per_degree_lon(lat) for lat in row_lats])
+        m_lat = np.array([meters_per_degree_lat(lat) for lat in row_lats])
+        return (self.cell_width * m_lon)[:, None], (self.cell_height * m_lat)[:, None]
+
+    def cell_area_m2(self) -> np.ndarray:
+        """Per-row cell area (h x 1)."""
+        dx, dy = self.cell_size_m()
+        return dx * dy
+
+
+def _time_of_concentration_kirpich(L_m: np.ndarray, slope: np.ndarray) -> np.ndarray:
+    """
+    Kirpich (1940): Tc (min) = 0.0078 * L^0.77 * S^(-0.385), L in m, S = slope (rise/run),
+    elementwise; 0 where L or S is not positive.
+    """
+    L_m = np.asarray(L_m, dtype=np.float64)
+    slope = np.asarray(slope, dtype=np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where((L_m > 0) & (slope > 0), 0.0078 * L_m ** 0.77 * slope ** -0.385, 0.0)
+
+
+def _routing_pass(spec, name: str, arg: Any = None) -> Any:
+    """
+    Process-pool entry point: one upstream or downstream pass of _RoutingProducts over the
+    routing graph in shared memory (levels stored as one index array plus frontier starts),
+    written into the shared output raster of the same name. Only basin outlets are returned.
+    """
+    arrays, blocks = attach(spec)
+    try:
+        levels = np.split(arrays["order"], arrays["starts"][1:])
+        routing = FlowRouting(arrays["flow_dirs"], receivers=arrays["receivers"], levels=levels)
+        outlets = None
+        if name == "cell_count":
+            result = routing.accumulate()
+        elif name == "area_m2":
+            result = routing.accumulate(arg)
+        elif name == "labels":
+            result, outlets = routing.basin_labels()
+        elif name == "longest_path_m":
+            result = routing.longest_upstream_length(*arg)
+        else:
+            result = routing.upstream_max(arrays["dem"])
+        arrays[name][...] = result
+        return outlets
+    finally:
+        # Views into the blocks must be gone before they are closed
+        arrays = levels = routing = None
+        for block in blocks:
+            block.close()
+
+
+class _RoutingProducts:
+    """Flow grid and routing graph for one DEM, computed lazily and cached by the model."""
+
+    def __init__(self, grid: _DemGrid, flow_dirs: np.ndarray):
+        self.grid = grid
+        self.flow_dirs = flow_dirs
+        self.routing = FlowRouting(flow_dirs)
+        self._accumulation: Optional[FlowAccumulation] = None
+        self._labels: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._tc: Optional[TimeOfConcentration] = None
+
+    @property
+    def accumulation(self) -> FlowAccumulation:
+        if self._accumulation is None:
+            with stage("flow_accumulation"):
+                self._set_accumulation(self.routing.accumulate(), self.routing.accumulate(self.grid.cell_area_m2()))
+        return self._accumulation
+
+    def _set_accumulation(self, cell_count: np.ndarray, area_m2: np.ndarray) -> None:
+        self._accumulation = FlowAccumulation(
+            cell_count=cell_count.astype(np.int64), area_m2=area_m2, transform=self.grid.transform
+        )
+
+    @property
+    def time_of_concentration(self) -> TimeOfConcentration:
+        """Longest upstream path, max upstream elevation and Kirpich Tc, from one downstream-ordered pass."""
+        if self._tc is None:
+            with stage("tc_rasters"):
+                dx, dy = self.grid.cell_size_m()
+                self._set_tc(self.routing.longest_upstream_length(dx, dy), self.routing.upstream_max(self.grid.arr))
+        return self._tc
+
+    def _set_tc(self, length: np.ndarray, max_elev: np.ndarray) -> None:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            slope = np.where(length > 0, (max_elev - self.grid.arr) / length, 0.001)
+        slope = np.fmax(slope, 0.001)
+        self._tc = TimeOfConcentration(
+            longest_path_m=length,
+            max_elevation=max_elev,
+            slope=slope,
+            tc_min=_time_of_concentration_kirpich(length, slope),
+            transform=self.grid.transform,
+        )
+
+    def compute_parallel(self) -> bool:
+        """
+        Run the five routing passes (cell counts, contributing area, basin labels, longest
+        upstream path, upstream max elevation) side by side on the process pool, with the
+        DEM and routing graph handed over through shared memory. Returns False, leaving the
+        products to the lazy serial properties, if the pool fails.
+        """
+        dx, dy = self.grid.cell_size_m()
+        levels = self.routing.levels
+        starts = np.cumsum([0] + [len(level) for level in levels[:-1]]) if levels else np.zeros(1, dtype=np.int64)
+        shape = self.grid.arr.shape
+        rasters = {
+            "dem": self.grid.arr,
+            "flow_dirs": self.flow_dirs,
+            "receivers": self.routing.receivers,
+            "order": np.concatenate(levels) if levels else np.zeros(0, dtype=np.int64),
+            "starts": np.asarray(starts, dtype=np.int64),
+        }
+        passes = {
+            "cell_count": None, "area_m2": self.grid.cell_area_m2(), "labels": None,
+            "longest_path_m": (dx, dy), "max_elevation": None,
+        }
+        outputs = {name: (shape, np.int32 if name == "labels" else np.float64) for name in passes}
+        try:
+            with stage("routing_parallel"), SharedRasters(rasters, outputs) as shared:
+                pool = get_process_pool()
+                futures = {name: pool.submit(_routing_pass, shared.spec, name, arg) for name, arg in passes.items()}
+                # Every worker is done with the blocks before they are unlinked
+                wait(futures.values())
+                outlets = futures["labels"].result()
+                for future in futures.values():
+                    future.result()
+                results = {name: shared.read(name) for name in passes}
+        except Exception as e:
+            logger.warning(f"Parallel routing failed: {e}, computing serially")
+            return False
+        self._set_accumulation(results["cell_count"], results["area_m2"])
+        self._labels = (results["labels"], outlets)
+        self._set_tc(results["longest_path_m"], results["max_elevation"])
+        return True
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the DEM, the routing graph and the rasters computed so far."""
+        arrays = [self.grid.arr, self.flow_dirs, self.routing.receivers, *self.routing.levels]
+        if self._accumulation is not None:
+            arrays += [self._accumulation.cell_count, self._accumulation.area_m2]
+        if self._labels is not None:
+            arrays += list(self._labels)
+        if self._tc is not None:
+            tc = self._tc
+            arrays += [tc.longest_path_m, tc.max_elevation, tc.slope, tc.tc_min]
+        return sum(a.nbytes for a in arrays)
+
+    def grid_rasters(self) -> Dict[str, np.ndarray]:
+        """Rasters _evaluate_grid_points reads, by name."""
+        labels = self.labels
+        return {
+            "dem": self.grid.arr,
+            "labels": labels,
+            "outlets": self._labels[1],
+            "cell_count": self.accumulation.cell_count,
+            "area_m2": self.accumulation.area_m2,
+            "tc_min": self.time_of_concentration.tc_min,
+        }
+
+    @property
+    def labels(self) -> np.ndarray:
+        """Basin id per cell; cells sharing an id drain to the same outlet."""
+        if self._labels is None:
+            with stage("basin_labels"):
+                self._labels = self.routing.basin_labels()
+        return self._labels[0]
+
+    def outlet_of(self, row: int, col: int) -> Tuple[int, int]:
+        """Outlet (pour point) cell that (row, col) finally drains to."""
+        basin = self.labels[row, col]
+        if basin < 0:
+            # Only reachable for cyclic flow grids, which D8 descent never produces
+            return row, col
+        r, c = divmod(int(self._labels[1][basin]), self.flow_dirs.shape[1])
+        return r, c
+
+    @timed("basin")
+    def basin_mask(self, outlet_r: int, outlet_c: int) -> np.ndarray:
+        """All cells that drain to the outlet cell (labels == outlet id)."""
+        basin = self.labels[outlet_r, outlet_c]
+        if basin < 0:
+            mask = np.zeros(self.flow_dirs.shape, dtype=bool)
+            mask[outlet_r, outlet_c] = True
+            return mask
+        return self.labels == basin
+
+
+def _evaluate_grid_points(
+    rasters: Dict[str, np.ndarray], rows: np.ndarray, cols: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Area (ha) and Tc (min) at the outlet of each sample cell; ok is False off-DEM or for degenerate basins."""
+    basin = rasters["labels"][rows, cols]
+    valid = ~np.isnan(rasters["dem"][rows, cols]) & (basin >= 0)
+    outlet = rasters["outlets"][np.where(valid, basin, 0)]
+    ok = valid & (rasters["cell_count"].ravel()[outlet] >= 3)
+    area_ha = rasters["area_m2"].ravel()[outlet] / 10000.0
+    tc_min = rasters["tc_min"].ravel()[outlet]
+    return ok, area_ha, tc_min
+
+
 class WatershedModel:
     """Watershed delineation and river data."""
 
     def __init__(self, nhd_client: NHDClient = None, usgs_client: USGSClient = None):
         self._nhd = nhd_client or NHDClient()
-        self._usgs = usgs_client or USGSClient()
+        self._usgs = usgs_client or default_dem_client()
+        self._routing_cache: "OrderedDict[tuple, _RoutingProducts]" = OrderedDict()
+        self._routing_lock = threading.Lock()
 
     def get_rivers_in_bbox(
         self, minx: float, miny: float, maxx: float, maxy: float
@@ -85,59 +446,250 @@ class WatershedModel:
             features=fc.get("features", []),
         )
 
-    def delineate_watershed(self, lat: float, lon: float, radius_m: float = 1500) -> Watershed:
-        """Delineate watershed containing the clicked point. Traces downstream to find pour point, then upstream."""
-        dem = self._usgs.fetch_dem(lat, lon, radius_m)
-        if dem is None:
-            return self._fallback_watershed(lat, lon)
-        arr = np.array(dem.get("data", []))
-        if arr.size == 0:
+    def get_flow_accumulation(
+        self, lat: float, lon: float, radius_m: float = 1500, condition_dem: bool = False
+    ) -> Optional[FlowAccumulation]:
+        """Upstream cell counts and contributing area for every cell of the DEM around lat, lon."""
+        grid = self._dem_grid(self._usgs.fetch_dem(lat, lon, radius_m))
+        if grid is None:
+            return None
+        return self._routing_products(grid, condition_dem).accumulation
+
+    def get_time_of_concentration(
+        self, lat: float, lon: float, radius_m: float = 1500, condition_dem: bool = False
+    ) -> Optional[TimeOfConcentration]:
+        """Kirpich Tc rasters for every cell of the DEM around lat, lon taken as an outlet."""
+        grid = self._dem_grid(self._usgs.fetch_dem(lat, lon, radius_m))
+        if grid is None:
+            return None
+        return self._routing_products(grid, condition_dem).time_of_concentration
+
+    def _dem_grid(self, dem: Union[DEM, dict, None]) -> Optional[_DemGrid]:
+        """Cell geometry around the fetched DEM's array (NaN nodata; not copied)."""
+        dem = as_dem(dem)
+        if dem is None or dem.data.size == 0:
+            return None
+        return _DemGrid(
+            arr=dem.data,
+            transform=dem.transform_list,
+            cell_width=dem.cell_width,
+            cell_height=dem.cell_height,
+            lon_ul=dem.transform.c,
+            lat_ul=dem.transform.f,
+            source=dem.source,
+            complete=dem.complete,
+        )
+
+    def _routing_products(self, grid: _DemGrid, condition_dem: bool = False) -> _RoutingProducts:
+        """
+        Flow grid and routing graph for the DEM, reused across requests over the same raster.
+        With condition_dem, depressions are filled and flats resolved before routing.
+
+        Entries are keyed by the DEM's cell grid (transform and shape) and a fingerprint of
+        its contents, so rasters with the same source and bbox but different elevations do
+        not share products. DEMs with failed tiles (complete=False) are routed but not cached:
+        a later fetch may fill their holes. The cache holds at most settings.routing_cache_bytes
+        of rasters, least recently used evicted first.
+        """
+        key = (grid.source, grid.arr.shape, tuple(grid.transform), grid.content_key(), condition_dem)
+        with self._routing_lock:
+            products = self._routing_cache.get(key)
+            if products is not None:
+                self._routing_cache.move_to_end(key)
+                # Lazily computed rasters grow entries after they are stored
+                self._trim_routing_cache()
+                ROUTING_CACHE.inc("hit")
+                return products
+        ROUTING_CACHE.inc("miss")
+        with stage("d8_routing"):
+            if condition_dem:
+                _, flow_dirs = dem_conditioning.condition_dem(grid.arr)
+            else:
+                flow_dirs = self._flow_direction_d8(grid.arr)
+        products = _RoutingProducts(grid, flow_dirs)
+        if settings.routing_workers > 1 and grid.arr.size >= settings.routing_parallel_min_cells:
+            products.compute_parallel()
+        if not grid.complete:
+            return products
+        with self._routing_lock:
+            self._routing_cache[key] = products
+            self._trim_routing_cache()
+        return products
+
+    def _trim_routing_cache(self) -> None:
+        """Evict least recently used routing products down to settings.routing_cache_bytes (lock held)."""
+        total = sum(p.nbytes for p in self._routing_cache.values())
+        while total > settings.routing_cache_bytes and self._routing_cache:
+            _, evicted = self._routing_cache.popitem(last=False)
+            total -= evicted.nbytes
+
+    def delineate_watershed(
+        self, lat: float, lon: float, radius_m: float = 1500, condition_dem: bool = False,
+        simplify_tolerance_m: float = 0.0
+    ) -> Watershed:
+        """
+        Delineate watershed containing the clicked point. Traces downstream to find pour point, then upstream.
+        simplify_tolerance_m > 0 simplifies the traced boundary (topology preserving).
+        """
+        grid = self._dem_grid(self._usgs.fetch_dem(lat, lon, radius_m))
+        if grid is None:
             return self._fallback_watershed(lat, lon)
-        transform = dem.get("transform", [])
-        nodata = dem.get("nodata", -9999)
-        arr = np.where(arr == nodata, np.nan, arr)
-        h, w = arr.shape
-        cell_width = abs(transform[0]) if len(transform) >= 1 else 0.0001
-        cell_height = abs(transform[4]) if len(transform) >= 5 else 0.0001
-        lon_ul, lat_ul = transform[2], transform[5]
         # Starting cell (where user clicked)
-        col = int(np.clip((lon - lon_ul) / cell_width, 0, w - 1))
-        row = int(np.clip((lat_ul - lat) / cell_height, 0, h - 1))
+        row, col = grid.cell_of(lat, lon)
 
         # D8 flow direction: flow_dirs[r,c] = 1..8 (direction of steepest descent), 0 = no flow
-        flow_dirs = self._flow_direction_d8(arr)
+        products = self._routing_products(grid, condition_dem)
+
+        # Pour point (outlet) the clicked cell drains to, from the basin label raster
+        outlet = products.outlet_of(row, col)
+        watershed = self._watershed_at_outlet(products, outlet, simplify_tolerance_m / meters_per_degree_lat(lat))
+        return watershed or self._fallback_watershed(lat, lon)
+
+    def delineate_watersheds(
+        self, points: List[Tuple[float, float]], radius_m: float = 1500, condition_dem: bool = False,
+        simplify_tolerance_m: float = 0.0, dems: Optional[List[Union[DEM, dict, None]]] = None
+    ) -> WatershedCollection:
+        """
+        Delineate the watershed of each (lat, lon) pour point from DEMs shared by nearby points.
+        Points are grouped by _batch_clusters; each group gets one DEM at the resolution a single
+        delineate_watershed call would use, and its points draining to the same outlet share one basin.
+        dems, when given, are the already fetched DEMs of the clusters, in order.
+        """
+        if not points:
+            return WatershedCollection(features=[], properties={"point_count": 0, "basin_count": 0})
+        clusters = self._batch_clusters(points, radius_m)
+        if dems is None:
+            dems = [
+                self._usgs.fetch_dem(
+                    *self._batch_dem_extent([points[i] for i in cluster], radius_m),
+                    cell_size_m=self._batch_dem_cell_size(radius_m),
+                )
+                for cluster in clusters
+            ]
+
+        features: List[Optional[Dict[str, Any]]] = [None] * len(points)
+        basin_count = 0
+        for cluster, dem in zip(clusters, dems):
+            center_lat = self._batch_dem_extent([points[i] for i in cluster], radius_m)[0]
+            grid = self._dem_grid(dem)
+            products = self._routing_products(grid, condition_dem) if grid is not None else None
+            tolerance_deg = simplify_tolerance_m / meters_per_degree_lat(center_lat)
 
-        # Trace downstream from clicked point to find the pour point (outlet)
-        outlet_r, outlet_c = self._trace_downstream(flow_dirs, row, col, h, w)
+            basins = {}
+            for i in cluster:
+                lat, lon = points[i]
+                watershed = None
+                if products is not None:
+                    outlet = products.outlet_of(*grid.cell_of(lat, lon))
+                    if outlet not in basins:
+                        basins[outlet] = self._watershed_at_outlet(products, outlet, tolerance_deg)
+                    watershed = basins[outlet]
+                if watershed is None:
+                    watershed = self._fallback_watershed(lat, lon)
+                features[i] = {
+                    "type": "Feature",
+                    "geometry": watershed.geometry,
+                    "properties": {**watershed.properties, "lat": lat, "lon": lon},
+                }
+            basin_count += len(basins)
+        return WatershedCollection(
+            features=features,
+            properties={"point_count": len(points), "basin_count": basin_count},
+        )
+
+    async def delineate_watersheds_async(
+        self, points: List[Tuple[float, float]], radius_m: float = 1500, condition_dem: bool = False,
+        simplify_tolerance_m: float = 0.0
+    ) -> WatershedCollection:
+        """delineate_watersheds with the DEMs awaited concurrently on the event loop and routing on the compute executor."""
+        dems = None
+        if points:
+            dems = await asyncio.gather(*(
+                self._fetch_dem_async(
+                    *self._batch_dem_extent([points[i] for i in cluster], radius_m),
+                    cell_size_m=self._batch_dem_cell_size(radius_m),
+                )
+                for cluster in self._batch_clusters(points, radius_m)
+            ))
+        return await run_in_compute_thread(
+            self.delineate_watersheds, points, radius_m, condition_dem, simplify_tolerance_m, dems=dems
+        )
+
+    def _batch_dem_extent(self, points: List[Tuple[float, float]], radius_m: float) -> Tuple[float, float, float]:
+        """(center_lat, center_lon, radius_m) of the DEM covering every point plus radius_m."""
+        lats = [p[0] for p in points]
+        lons = [p[1] for p in points]
+        center_lat = (min(lats) + max(lats)) / 2.0
+        center_lon = (min(lons) + max(lons)) / 2.0
+        half_height_m = (max(lats) - min(lats)) * meters_per_degree_lat(center_lat) / 2.0
+        half_width_m = (max(lons) - min(lons)) * meters_per_degree_lon(center_lat) / 2.0
+        return center_lat, center_lon, max(half_width_m, half_height_m) + radius_m
+
+    def _batch_dem_cell_size(self, radius_m: float) -> float:
+        """Cell size of the DEM delineate_watershed fetches for radius_m (DEM_SIZE_PX across 2 * radius_m)."""
+        return 2.0 * radius_m / USGSClient.DEM_SIZE_PX
+
+    def _batch_clusters(self, points: List[Tuple[float, float]], radius_m: float) -> List[List[int]]:
+        """
+        Indices of points grouped so that each group's _batch_dem_extent at _batch_dem_cell_size
+        fits settings.dem_max_pixels: points are bucketed on a square grid as wide as the largest
+        spread that fits (one group per distinct point when not even two points fit).
+        """
+        cell_size_m = self._batch_dem_cell_size(radius_m)
+        max_spread_m = cell_size_m * math.sqrt(settings.dem_max_pixels) - 2.0 * radius_m
+        mean_lat = sum(p[0] for p in points) / len(points)
+        clusters: Dict[Tuple[float, float], List[int]] = {}
+        for i, (lat, lon) in enumerate(points):
+            key = (lat, lon)
+            if max_spread_m > 0:
+                key = (
+                    math.floor(lat * meters_per_degree_lat(mean_lat) / max_spread_m),
+                    math.floor(lon * meters_per_degree_lon(mean_lat) / max_spread_m),
+                )
+            clusters.setdefault(key, []).append(i)
+        return list(clusters.values())
+
+    async def _fetch_dem_async(self, lat: float, lon: float, radius_m: float, **kwargs) -> Union[DEM, dict, None]:
+        """Await the DEM; clients without fetch_dem_async are run on the compute executor."""
+        fetch_async = getattr(self._usgs, "fetch_dem_async", None)
+        if fetch_async is not None:
+            return await fetch_async(lat, lon, radius_m, **kwargs)
+        return await run_in_compute_thread(self._usgs.fetch_dem, lat, lon, radius_m, **kwargs)
+
+    def _watershed_at_outlet(
+        self, products: _RoutingProducts, outlet: Tuple[int, int], simplify_tolerance: float = 0.0
+    ) -> Optional[Watershed]:
+        """Watershed polygon, area and Tc for the basin draining to outlet; None if it is degenerate."""
+        grid = products.grid
+        outlet_r, outlet_c = outlet
 
         # Watershed mask: all cells that drain to the pour point
-        mask = self._drainage_basin(flow_dirs, outlet_r, outlet_c, h, w)
+        mask = products.basin_mask(outlet_r, outlet_c)
         if mask is None or np.sum(mask) < 3:
-            return self._fallback_watershed(lat, lon)
+            return None
 
-        # Polygon from watershed boundary (convex hull of mask cells for simplicity)
-        coords = self._mask_to_polygon(mask, lon_ul, lat_ul, cell_width, cell_height)
-        if not coords:
-            return self._fallback_watershed(lat, lon)
+        # Polygon traced along the outer cell edges of the watershed mask
+        geometry = self._mask_to_polygon(
+            mask, grid.lon_ul, grid.lat_ul, grid.cell_width, grid.cell_height, simplify_tolerance
+        )
+        if not geometry:
+            return None
 
         # Area in hectares: geodesic area of polygon (WGS84)
-        area_ha = self._geodesic_area_ha(coords)
+        area_ha = self._geodesic_area_ha(geometry)
 
-        meters_per_deg_lat = 111320
-        meters_per_deg_lon = 111320 * 0.707
-        # Longest flow path L (m) and slope for time of concentration
-        L_m, slope = self._longest_flow_path_and_slope(
-            arr, flow_dirs, mask, outlet_r, outlet_c, cell_width, cell_height,
-            meters_per_deg_lat, meters_per_deg_lon
-        )
-        tc_min = self._time_of_concentration_kirpich(L_m, slope)
+        # Longest flow path L (m), slope and time of concentration from the Tc rasters
+        tc = products.time_of_concentration
+        L_m = float(tc.longest_path_m[outlet_r, outlet_c])
+        slope = float(tc.slope[outlet_r, outlet_c])
+        tc_min = float(tc.tc_min[outlet_r, outlet_c])
 
         # Convert outlet cell back to lat/lon for response
-        outlet_lon = lon_ul + (outlet_c + 0.5) * cell_width
-        outlet_lat = lat_ul - (outlet_r + 0.5) * cell_height
+        outlet_lon = grid.lon_ul + (outlet_c + 0.5) * grid.cell_width
+        outlet_lat = grid.lat_ul - (outlet_r + 0.5) * grid.cell_height
 
         return Watershed(
-            geometry={"type": "Polygon", "coordinates": [coords]},
+            geometry=geometry,
             properties={
                 "area_ha": round(area_ha, 2),
                 "time_of_concentration_min": round(tc_min, 2),
@@ -148,181 +700,24 @@ class WatershedModel:
             },
         )
 
-    def _trace_downstream(self, flow_dirs: np.ndarray, start_r: int, start_c: int, h: int, w: int) -> Tuple[int, int]:
-        """Trace flow downstream from start cell until we hit edge, pit, or cycle. Returns pour point (outlet)."""
-        r, c = start_r, start_c
-        visited = set()
-        visited.add((r, c))
-
-        while True:
-            d = flow_dirs[r, c]
-            if d == 0:
-                # No flow direction (flat or pit) - this is the outlet
-                break
-            dr, dc = D8_OFFSETS[d - 1]
-            nr, nc = r + dr, c + dc
-            # Check bounds
-            if nr < 0 or nr >= h or nc < 0 or nc >= w:
-                # Flow goes off edge - current cell is outlet
-                break
-            if (nr, nc) in visited:
-                # Cycle detected - use current cell as outlet
-                break
-            visited.add((nr, nc))
-            r, c = nr, nc
-
-        return r, c
-
     def _flow_direction_d8(self, arr: np.ndarray) -> np.ndarray:
         """D8 flow direction grid: 1-8, 0 = no data or flat."""
-        h, w = arr.shape
-        flow = np.zeros((h, w), dtype=np.int32)
-        for r in range(1, h - 1):
-            for c in range(1, w - 1):
-                z = arr[r, c]
-                if np.isnan(z):
-                    continue
-                best_drop = 0
-                best_dir = 0
-                for idx, (dr, dc) in enumerate(D8_OFFSETS):
-                    nr, nc = r + dr, c + dc
-                    nz = arr[nr, nc]
-                    if np.isnan(nz):
-                        continue
-                    drop = z - nz
-                    if drop > best_drop:
-                        best_drop = drop
-                        best_dir = idx + 1
-                flow[r, c] = best_dir
-        return flow
-
-    def _drainage_basin(self, flow_dirs: np.ndarray, outlet_r: int, outlet_c: int, h: int, w: int) -> np.ndarray:
-        """All cells that drain to outlet. BFS from outlet following flow backwards (upstream)."""
-        mask = np.zeros((h, w), dtype=bool)
-        mask[outlet_r, outlet_c] = True
-        queue: List[Tuple[int, int]] = [(outlet_r, outlet_c)]
-        inv = _inverse_d8()
-        while queue:
-            r, c = queue.pop(0)
-            for dr, dc in inv:
-                nr, nc = r + dr, c + dc
-                if nr < 0 or nr >= h or nc < 0 or nc >= w or mask[nr, nc]:
-                    continue
-                # Neighbor (nr,nc) flows toward (r,c) if its D8 points to (r,c)
-                ndir = flow_dirs[nr, nc]
-                if ndir == 0:
-                    continue
-                sr, sc = D8_OFFSETS[ndir - 1]
-                if nr + sr == r and nc + sc == c:
-                    mask[nr, nc] = True
-                    queue.append((nr, nc))
-        return mask
+        return flow_direction_d8(arr)
 
+    @timed("polygon")
     def _mask_to_polygon(
-        self, mask: np.ndarray, lon_ul: float, lat_ul: float, cell_width: float, cell_height: float
-    ) -> List[List[float]]:
-        """Convert watershed mask to polygon (boundary). Use convex hull of mask cell centers."""
-        h, w = mask.shape
-        points: List[Tuple[float, float]] = []
-        for r in range(h):
-            for c in range(w):
-                if not mask[r, c]:
-                    continue
-                lon = lon_ul + (c + 0.5) * cell_width
-                lat = lat_ul - (r + 0.5) * cell_height
-                points.append((lon, lat))
-        if len(points) < 3:
-            return []
-        # Convex hull (Graham scan or use boundary)
-        hull = self._convex_hull(points)
-        # Close ring
-        hull.append(hull[0])
-        return [[x, y] for x, y in hull]
-
-    def _convex_hull(self, points: List[Tuple[float, float]]) -> List[Tuple[float, float]]:
-        """Convex hull of points (lon, lat). Returns ordered boundary (no closing point)."""
-        if len(points) <= 2:
-            return list(points)
-        points = sorted(set(points))
-        start = min(points, key=lambda p: (p[1], p[0]))
-
-        def polar_key(p):
-            if p == start:
-                return -999, -999
-            dx = p[0] - start[0]
-            dy = p[1] - start[1]
-            return np.arctan2(dy, dx), (dx * dx + dy * dy)
-
-        sorted_pts = sorted(points, key=polar_key)
-        hull: List[Tuple[float, float]] = [sorted_pts[0], sorted_pts[1]]
-        for i in range(2, len(sorted_pts)):
-            p = sorted_pts[i]
-            while len(hull) >= 2:
-                a, b = hull[-2], hull[-1]
-                cross = (b[0] - a[0]) * (p[1] - a[1]) - (b[1] - a[1]) * (p[0] - a[0])
-                if cross <= 0:
-                    hull.pop()
-                else:
-                    break
-            hull.append(p)
-        return hull
-
-    def _longest_flow_path_and_slope(
-        self,
-        arr: np.ndarray,
-        flow_dirs: np.ndarray,
-        mask: np.ndarray,
-        outlet_r: int,
-        outlet_c: int,
-        cell_width: float,
-        cell_height: float,
-        m_per_deg_lat: float,
-        m_per_deg_lon: float,
-    ) -> Tuple[float, float]:
-        """BFS from outlet upstream; track distance along flow. L = max distance (m), slope = (elev_max - elev_outlet) / L."""
-        h, w = arr.shape
-        dist_cells = np.full((h, w), -1.0)
-        dist_cells[outlet_r, outlet_c] = 0
-        queue: List[Tuple[int, int]] = [(outlet_r, outlet_c)]
-        cell_m = np.sqrt((cell_width * m_per_deg_lon) ** 2 + (cell_height * m_per_deg_lat) ** 2)
-        while queue:
-            r, c = queue.pop(0)
-            d = dist_cells[r, c]
-            for dr, dc in _inverse_d8():
-                nr, nc = r + dr, c + dc
-                if nr < 0 or nr >= h or nc < 0 or nc >= w or not mask[nr, nc]:
-                    continue
-                ndir = flow_dirs[nr, nc]
-                if ndir == 0:
-                    continue
-                sr, sc = D8_OFFSETS[ndir - 1]
-                if nr + sr != r or nc + sc != c:
-                    continue
-                step = 1.0 if (dr != 0 and dc != 0) else 1.0  # diagonal ~ sqrt2, use 1 for simplicity
-                ndist = d + step * cell_m
-                if dist_cells[nr, nc] < 0 or ndist > dist_cells[nr, nc]:
-                    dist_cells[nr, nc] = ndist
-                    queue.append((nr, nc))
-        valid = (dist_cells >= 0) & mask
-        if not np.any(valid):
-            return 0.0, 0.001
-        L_m = float(np.max(dist_cells[valid]))
-        if L_m <= 0:
-            return 0.0, 0.001
-        elev_outlet = float(arr[outlet_r, outlet_c])
-        elev_max = float(np.nanmax(arr[mask]))
-        slope = (elev_max - elev_outlet) / L_m
-        slope = max(slope, 0.001)
-        return L_m, slope
-
-    def _time_of_concentration_kirpich(self, L_m: float, slope: float) -> float:
-        """Kirpich (1940): Tc (min) = 0.0078 * L^0.77 * S^(-0.385), L in m, S = slope (rise/run)."""
-        if L_m <= 0 or slope <= 0:
-            return 0.0
-        return 0.0078 * (L_m ** 0.77) * (slope ** -0.385)
+        self, mask: np.ndarray, lon_ul: float, lat_ul: float, cell_width: float, cell_height: float,
+        simplify_tolerance: float = 0.0
+    ) -> Optional[dict]:
+        """Convert watershed mask to its traced cell outline (GeoJSON Polygon/MultiPolygon, holes included)."""
+        transform = [cell_width, 0, lon_ul, 0, -cell_height, lat_ul]
+        return mask_to_geojson(mask, transform, simplify_tolerance)
 
-    def _geodesic_area_ha(self, ring: List[List[float]]) -> float:
-        """Compute geodesic area (m²) of polygon ring (closed list of [lon, lat]), return hectares."""
+    @timed("geodesic_area")
+    def _geodesic_area_ha(self, ring: Union[List[List[float]], dict]) -> float:
+        """Compute geodesic area (m²) of polygon ring (closed list of [lon, lat]) or GeoJSON geometry, return hectares."""
+        if isinstance(ring, dict):
+            return self._geodesic_area_ha_geometry(ring)
         if len(ring) < 3:
             return 0.0
         try:
@@ -335,6 +730,16 @@ class WatershedModel:
         except Exception:
             return 0.0
 
+    def _geodesic_area_ha_geometry(self, geometry: dict) -> float:
+        try:
+            geom = shape(geometry)
+            if geom.is_empty or not geom.is_valid:
+                return 0.0
+            area_m2 = abs(Geod(ellps="WGS84").geometry_area_perimeter(geom)[0])
+            return float(area_m2 / 10000.0)
+        except Exception:
+            return 0.0
+
     def _fallback_watershed(self, lat: float, lon: float) -> Watershed:
         """When DEM unavailable, return bbox with geodesic area (non-zero when polygon valid)."""
         minx, miny, maxx, maxy = bbox_from_center(lat, lon, 2000)
@@ -354,193 +759,296 @@ class WatershedModel:
 
     def compute_watershed_grid(
         self, minx: float, miny: float, maxx: float, maxy: float,
-        grid_spacing_m: float = 100.0
+        grid_spacing_m: float = 100.0, condition_dem: bool = False,
+        dem: Union[DEM, dict, None] = None
     ) -> WatershedGrid:
         """
         Compute watershed area and time of concentration for a grid of points within the bbox.
         Returns grid with normalized values for heatmap display.
+        dem, when given, is the already fetched DEM for _grid_dem_extent.
         """
-        import math
-        from app.core.geo_utils import meters_per_degree_lat, meters_per_degree_lon
-        
+        samples = self._grid_samples(minx, miny, maxx, maxy, grid_spacing_m, condition_dem, dem)
+        if samples.error:
+            return WatershedGrid(features=[], metadata={"error": samples.error})
+
+        point_lats, point_lons = (g.ravel() for g in np.meshgrid(samples.lats, samples.lons, indexing="ij"))
+        ok = samples.ok
+        stats = samples.stats()
+        min_area, min_tc = stats["min_area_ha"], stats["min_tc_min"]
+        area_range, tc_range = stats["area_range"], stats["tc_range"]
+
+        # Create GeoJSON features
+        with stage("grid_features"):
+            features = []
+            for lat, lon, area_ha, tc_min in zip(point_lats[ok], point_lons[ok], samples.areas[ok], samples.tcs[ok]):
+                area_ha, tc_min = float(area_ha), float(tc_min)
+                # Compute jet values (0-1 normalized)
+                jet_value_area = (area_ha - min_area) / area_range
+                jet_value_tc = (tc_min - min_tc) / tc_range
+
+                # Create a small rectangle around the point for visualization
+                half_lat = samples.lat_spacing_deg / 2.0
+                half_lon = samples.lon_spacing_deg / 2.0
+                rect_coords = _cell_rectangle(float(lat), float(lon), half_lat, half_lon)
+
+                features.append({
+                    "type": "Feature",
+                    "geometry": {
+                        "type": "Polygon",
+                        "coordinates": rect_coords,
+                    },
+                    "properties": {
+                        "area_ha": round(area_ha, 2),
+                        "tc_min": round(tc_min, 2),
+                        "jet_value_area": round(jet_value_area, 4),
+                        "jet_value_tc": round(jet_value_tc, 4),
+                    },
+                })
+
+        return WatershedGrid(features=features, metadata=samples.metadata(point_count=len(features)))
+
+    def compute_watershed_raster(
+        self, minx: float, miny: float, maxx: float, maxy: float,
+        grid_spacing_m: float = 100.0, condition_dem: bool = False,
+        dem: Union[DEM, dict, None] = None
+    ) -> WatershedRaster:
+        """
+        compute_watershed_grid as north-up rasters: one cell per grid point for area_ha,
+        tc_min, jet_value_area and jet_value_tc (NaN where no value) plus the geotransform.
+        """
+        samples = self._grid_samples(minx, miny, maxx, maxy, grid_spacing_m, condition_dem, dem)
+        if samples.error:
+            return WatershedRaster(bands={}, transform=[], metadata={"error": samples.error})
+        shape = (len(samples.lats), len(samples.lons))
+        stats = samples.stats()
+        area = np.where(samples.ok, samples.areas, np.nan).reshape(shape)[::-1]
+        tc = np.where(samples.ok, samples.tcs, np.nan).reshape(shape)[::-1]
+        bands = {
+            "area_ha": area.astype(np.float32),
+            "tc_min": tc.astype(np.float32),
+            "jet_value_area": ((area - stats["min_area_ha"]) / stats["area_range"]).astype(np.float32),
+            "jet_value_tc": ((tc - stats["min_tc_min"]) / stats["tc_range"]).astype(np.float32),
+        }
+        # Grid points are cell centers; row 0 is the northernmost row of points
+        transform = [
+            samples.lon_spacing_deg, 0.0, float(samples.lons[0]) - samples.lon_spacing_deg / 2.0,
+            0.0, -samples.lat_spacing_deg, float(samples.lats[-1]) + samples.lat_spacing_deg / 2.0,
+        ]
+        return WatershedRaster(bands=bands, transform=transform, metadata=samples.metadata(point_count=int(samples.ok.sum())))
+
+    def _grid_samples(
+        self, minx: float, miny: float, maxx: float, maxy: float, grid_spacing_m: float,
+        condition_dem: bool, dem: Union[DEM, dict, None]
+    ) -> _GridSamples:
+        """Grid points of the bbox and their area/Tc, evaluated on one DEM fetched for the whole bbox."""
+        plan = self._grid_plan(minx, miny, maxx, maxy, grid_spacing_m, condition_dem, dem)
+        if plan.error:
+            return _GridSamples.failed(plan.error)
+
+        # Sample cell of every grid point, lat-major like the heatmap rows
+        point_lats, point_lons = (g.ravel() for g in np.meshgrid(plan.lats, plan.lons, indexing="ij"))
+        rows, cols = plan.grid.cells_of(point_lats, point_lons)
+
+        # Area and Tc at each point's outlet; points sharing an outlet read the same raster cell
+        ok, areas, tcs = self._evaluate_grid(plan.products, rows, cols)
+        if not ok.any():
+            return _GridSamples.failed("No valid grid points")
+
+        return _GridSamples(
+            lats=plan.lats, lons=plan.lons, ok=ok, areas=areas, tcs=tcs,
+            lat_spacing_deg=plan.lat_spacing_deg, lon_spacing_deg=plan.lon_spacing_deg,
+            dem_metadata=plan.dem_metadata,
+        )
+
+    def _grid_plan(
+        self, minx: float, miny: float, maxx: float, maxy: float, grid_spacing_m: float,
+        condition_dem: bool, dem: Union[DEM, dict, None]
+    ) -> _GridPlan:
+        """DEM (fetched unless given) and routing products for the bbox, and its grid point axes."""
         # Calculate center and radius for DEM fetch
-        center_lon = (minx + maxx) / 2.0
         center_lat = (miny + maxy) / 2.0
-        dlat_deg = maxy - miny
-        dlon_deg = maxx - minx
         m_per_deg_lat = meters_per_degree_lat(center_lat)
         m_per_deg_lon = meters_per_degree_lon(center_lat)
-        half_width_m = (dlon_deg * m_per_deg_lon) / 2.0
-        half_height_m = (dlat_deg * m_per_deg_lat) / 2.0
-        radius_m = math.sqrt(half_width_m ** 2 + half_height_m ** 2) * 1.2  # 20% margin
-        
-        # Fetch DEM once for entire bbox
-        dem = self._usgs.fetch_dem(center_lat, center_lon, radius_m)
+
+        # Fetch DEM once for entire bbox, with cells finer than the grid spacing
         if dem is None:
-            return WatershedGrid(features=[], metadata={"error": "DEM unavailable"})
-        
-        arr = np.array(dem.get("data", []))
-        if arr.size == 0:
-            return WatershedGrid(features=[], metadata={"error": "Empty DEM"})
-        
-        transform = dem.get("transform", [])
-        nodata = dem.get("nodata", -9999)
-        arr = np.where(arr == nodata, np.nan, arr)
-        h, w = arr.shape
-        cell_width = abs(transform[0]) if len(transform) >= 1 else 0.0001
-        cell_height = abs(transform[4]) if len(transform) >= 5 else 0.0001
-        lon_ul, lat_ul = transform[2], transform[5]
-        
-        # Compute D8 flow direction grid once
-        flow_dirs = self._flow_direction_d8(arr)
-        
+            dem = self.fetch_grid_dem(minx, miny, maxx, maxy, grid_spacing_m)
+        if dem is None:
+            return _GridPlan.failed("DEM unavailable")
+
+        grid = self._dem_grid(dem)
+        if grid is None:
+            return _GridPlan.failed("Empty DEM")
+
+        # Compute D8 flow direction grid, flow accumulation and basin labels once
+        products = self._routing_products(grid, condition_dem)
+
         # Generate grid points based on spacing
         lat_spacing_deg = grid_spacing_m / m_per_deg_lat
         lon_spacing_deg = grid_spacing_m / m_per_deg_lon
-        
-        # Grid of points
-        lats = np.arange(miny, maxy, lat_spacing_deg)
-        lons = np.arange(minx, maxx, lon_spacing_deg)
-        
-        # Storage for results
-        results = []
-        
-        # For normalization
-        all_areas = []
-        all_tcs = []
-        
-        # Process each grid point
-        for lat in lats:
-            for lon in lons:
-                # Convert to array indices
-                col = int(np.clip((lon - lon_ul) / cell_width, 0, w - 1))
-                row = int(np.clip((lat_ul - lat) / cell_height, 0, h - 1))
-                
-                # Check if within valid DEM area
-                if np.isnan(arr[row, col]):
-                    continue
-                
-                # Trace downstream to find pour point
-                outlet_r, outlet_c = self._trace_downstream(flow_dirs, row, col, h, w)
-                
-                # Compute watershed mask
-                mask = self._drainage_basin(flow_dirs, outlet_r, outlet_c, h, w)
-                if mask is None or np.sum(mask) < 3:
-                    continue
-                
-                # Calculate area
-                coords = self._mask_to_polygon(mask, lon_ul, lat_ul, cell_width, cell_height)
-                if not coords:
-                    continue
-                
-                area_ha = self._geodesic_area_ha(coords)
-                if area_ha <= 0:
-                    continue
-                
-                # Calculate Tc
-                L_m, slope = self._longest_flow_path_and_slope(
-                    arr, flow_dirs, mask, outlet_r, outlet_c, cell_width, cell_height,
-                    m_per_deg_lat, m_per_deg_lon
-                )
-                tc_min = self._time_of_concentration_kirpich(L_m, slope)
-                
-                # Store result
-                results.append({
-                    "lat": float(lat),
-                    "lon": float(lon),
-                    "area_ha": float(area_ha),
-                    "tc_min": float(tc_min),
-                })
-                all_areas.append(area_ha)
-                all_tcs.append(tc_min)
-        
-        # Normalize values for jet colormap
-        if not results:
-            return WatershedGrid(features=[], metadata={"error": "No valid grid points"})
-        
-        min_area = float(np.min(all_areas))
-        max_area = float(np.max(all_areas))
-        min_tc = float(np.min(all_tcs))
-        max_tc = float(np.max(all_tcs))
-        
-        area_range = max_area - min_area if max_area > min_area else 1.0
-        tc_range = max_tc - min_tc if max_tc > min_tc else 1.0
-        
-        # Create GeoJSON features
-        features = []
-        for result in results:
-            # Compute jet values (0-1 normalized)
-            jet_value_area = (result["area_ha"] - min_area) / area_range
-            jet_value_tc = (result["tc_min"] - min_tc) / tc_range
-            
-            # Create a small rectangle around the point for visualization
-            half_lat = lat_spacing_deg / 2.0
-            half_lon = lon_spacing_deg / 2.0
-            rect_coords = [[
-                [result["lon"] - half_lon, result["lat"] - half_lat],
-                [result["lon"] + half_lon, result["lat"] - half_lat],
-                [result["lon"] + half_lon, result["lat"] + half_lat],
-                [result["lon"] - half_lon, result["lat"] + half_lat],
-                [result["lon"] - half_lon, result["lat"] - half_lat],
-            ]]
-            
-            features.append({
-                "type": "Feature",
-                "geometry": {
-                    "type": "Polygon",
-                    "coordinates": rect_coords,
-                },
-                "properties": {
-                    "area_ha": round(result["area_ha"], 2),
-                    "tc_min": round(result["tc_min"], 2),
-                    "jet_value_area": round(jet_value_area, 4),
-                    "jet_value_tc": round(jet_value_tc, 4),
-                },
-            })
-        
-        metadata = {
-            "grid_spacing_m": grid_spacing_m,
-            "point_count": len(features),
-            "min_area_ha": round(min_area, 2),
-            "max_area_ha": round(max_area, 2),
-            "min_tc_min": round(min_tc, 2),
-            "max_tc_min": round(max_tc, 2),
-            "dem_cell_size_m": round(cell_width * m_per_deg_lon, 2),
-        }
-        
-        return WatershedGrid(features=features, metadata=metadata)
+        return _GridPlan(
+            grid=grid, products=products,
+            lats=np.arange(miny, maxy, lat_spacing_deg), lons=np.arange(minx, maxx, lon_spacing_deg),
+            lat_spacing_deg=lat_spacing_deg, lon_spacing_deg=lon_spacing_deg,
+            dem_metadata={
+                "grid_spacing_m": grid_spacing_m,
+                "dem_cell_size_m": round(grid.cell_width * m_per_deg_lon, 2),
+                "dem_cell_height_m": round(grid.cell_height * m_per_deg_lat, 2),
+                "dem_shape": list(grid.shape),
+            },
+        )
+
+    def stream_watershed_grid(
+        self, minx: float, miny: float, maxx: float, maxy: float,
+        grid_spacing_m: float = 100.0, condition_dem: bool = False,
+        chunk_size: Optional[int] = None, dem: Union[DEM, dict, None] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        compute_watershed_grid as a stream: one Feature with the raw area_ha and tc_min of
+        each valid point, yielded chunk by chunk (rows of about chunk_size points), then one
+        {"type": "Metadata"} record with the grid metadata, whose min/max normalize the
+        values, or the error. The DEM, routing products and grid rasters are computed before
+        returning; the records are built as they are read, one chunk of points at a time.
+        """
+        plan = self._grid_plan(minx, miny, maxx, maxy, grid_spacing_m, condition_dem, dem)
+        if plan.error:
+            return iter([{"type": "Metadata", "metadata": {"error": plan.error}}])
+        return self._grid_records(plan, plan.products.grid_rasters(), chunk_size)
+
+    def _grid_records(
+        self, plan: _GridPlan, rasters: Dict[str, np.ndarray], chunk_size: Optional[int]
+    ) -> Iterator[Dict[str, Any]]:
+        """Feature records of stream_watershed_grid from the prepared plan, then the Metadata record."""
+        rows_per_chunk = max(1, (chunk_size or settings.grid_stream_chunk_size) // max(len(plan.lons), 1))
+        half_lat, half_lon = plan.lat_spacing_deg / 2.0, plan.lon_spacing_deg / 2.0
+        count = 0
+        stats = {"min_area_ha": math.inf, "max_area_ha": -math.inf, "min_tc_min": math.inf, "max_tc_min": -math.inf}
+
+        for start in range(0, len(plan.lats), rows_per_chunk):
+            point_lats, point_lons = (
+                g.ravel() for g in np.meshgrid(plan.lats[start:start + rows_per_chunk], plan.lons, indexing="ij")
+            )
+            rows, cols = plan.grid.cells_of(point_lats, point_lons)
+            ok, areas, tcs = _evaluate_grid_points(rasters, rows, cols)
+            if not ok.any():
+                continue
+            areas, tcs = areas[ok], tcs[ok]
+            count += len(areas)
+            stats["min_area_ha"] = min(stats["min_area_ha"], float(areas.min()))
+            stats["max_area_ha"] = max(stats["max_area_ha"], float(areas.max()))
+            stats["min_tc_min"] = min(stats["min_tc_min"], float(tcs.min()))
+            stats["max_tc_min"] = max(stats["max_tc_min"], float(tcs.max()))
+            for lat, lon, area_ha, tc_min in zip(
+                point_lats[ok].tolist(), point_lons[ok].tolist(), areas.tolist(), tcs.tolist()
+            ):
+                yield {
+                    "type": "Feature",
+                    "geometry": {"type": "Polygon", "coordinates": _cell_rectangle(lat, lon, half_lat, half_lon)},
+                    "properties": {"area_ha": round(area_ha, 2), "tc_min": round(tc_min, 2)},
+                }
+
+        if count == 0:
+            yield {"type": "Metadata", "metadata": {"error": "No valid grid points"}}
+            return
+        yield {"type": "Metadata", "metadata": _grid_metadata(plan.dem_metadata, count, stats)}
+
+    async def stream_watershed_grid_async(
+        self, minx: float, miny: float, maxx: float, maxy: float,
+        grid_spacing_m: float = 100.0, condition_dem: bool = False
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        stream_watershed_grid with the DEM awaited on the event loop and routing on the compute
+        executor, both before the response starts; only building the records is left to the stream.
+        """
+        dem = await self._fetch_dem_async(
+            *self._grid_dem_extent(minx, miny, maxx, maxy), cell_size_m=self._grid_dem_cell_size(grid_spacing_m)
+        )
+        return await run_in_compute_thread(
+            self.stream_watershed_grid, minx, miny, maxx, maxy, grid_spacing_m, condition_dem, dem=dem
+        )
+
+    async def compute_watershed_grid_async(
+        self, minx: float, miny: float, maxx: float, maxy: float,
+        grid_spacing_m: float = 100.0, condition_dem: bool = False
+    ) -> WatershedGrid:
+        """compute_watershed_grid with the DEM awaited on the event loop and routing on the compute executor."""
+        dem = await self._fetch_dem_async(
+            *self._grid_dem_extent(minx, miny, maxx, maxy), cell_size_m=self._grid_dem_cell_size(grid_spacing_m)
+        )
+        return await run_in_compute_thread(
+            self.compute_watershed_grid, minx, miny, maxx, maxy, grid_spacing_m, condition_dem, dem=dem
+        )
+
+    async def compute_watershed_raster_async(
+        self, minx: float, miny: float, maxx: float, maxy: float,
+        grid_spacing_m: float = 100.0, condition_dem: bool = False
+    ) -> WatershedRaster:
+        """compute_watershed_raster with the DEM awaited on the event loop and routing on the compute executor."""
+        dem = await self._fetch_dem_async(
+            *self._grid_dem_extent(minx, miny, maxx, maxy), cell_size_m=self._grid_dem_cell_size(grid_spacing_m)
+        )
+        return await run_in_compute_thread(
+            self.compute_watershed_raster, minx, miny, maxx, maxy, grid_spacing_m, condition_dem, dem=dem
+        )
+
+    def fetch_grid_dem(
+        self, minx: float, miny: float, maxx: float, maxy: float, grid_spacing_m: float = 100.0
+    ) -> Union[DEM, dict, None]:
+        """
+        DEM the grid methods fetch for the bbox: _grid_dem_extent at cells finer than the grid
+        spacing. Callers wanting a larger DEM around the grid fetch it for a larger bbox and
+        pass it as dem.
+        """
+        return self._usgs.fetch_dem(
+            *self._grid_dem_extent(minx, miny, maxx, maxy), cell_size_m=self._grid_dem_cell_size(grid_spacing_m)
+        )
+
+    def _grid_dem_extent(self, minx: float, miny: float, maxx: float, maxy: float) -> Tuple[float, float, float]:
+        """(center_lat, center_lon, radius_m) of the DEM covering the bbox with a 20% margin."""
+        center_lon = (minx + maxx) / 2.0
+        center_lat = (miny + maxy) / 2.0
+        half_width_m = ((maxx - minx) * meters_per_degree_lon(center_lat)) / 2.0
+        half_height_m = ((maxy - miny) * meters_per_degree_lat(center_lat)) / 2.0
+        radius_m = math.sqrt(half_width_m ** 2 + half_height_m ** 2) * 1.2  # 20% margin
+        return center_lat, center_lon, radius_m
+
+    def _grid_dem_cell_size(self, grid_spacing_m: float) -> float:
+        return grid_spacing_m / settings.grid_dem_cells_per_spacing
+
+    @timed("grid_evaluate")
+    def _evaluate_grid(
+        self, products: _RoutingProducts, rows: np.ndarray, cols: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(ok, area_ha, tc_min) for every sample cell, read from the routing rasters in one vectorized pass."""
+        return _evaluate_grid_points(products.grid_rasters(), rows, cols)
 
     def get_watershed_contours(
-        self, lat: float, lon: float, radius_m: float = 1500, interval_m: float = 5.0
+        self, lat: float, lon: float, radius_m: float = 1500, interval_m: float = 5.0,
+        condition_dem: bool = False
     ) -> WatershedContours:
         """Generate contour lines for the watershed area with jet colormap values."""
         from affine import Affine
-        from skimage import measure
 
         dem = self._usgs.fetch_dem(lat, lon, radius_m)
         if dem is None:
             return WatershedContours(features=[], properties={"error": "DEM unavailable"})
 
-        arr = np.array(dem.get("data", []))
-        if arr.size == 0:
+        grid = self._dem_grid(dem)
+        if grid is None:
             return WatershedContours(features=[], properties={"error": "Empty DEM"})
 
-        transform = dem.get("transform", [])
-        nodata = dem.get("nodata", -9999)
-        arr = np.where(arr == nodata, np.nan, arr)
-        h, w = arr.shape
-        cell_width = abs(transform[0]) if len(transform) >= 1 else 0.0001
-        cell_height = abs(transform[4]) if len(transform) >= 5 else 0.0001
-        lon_ul, lat_ul = transform[2], transform[5]
+        arr = grid.arr
+        transform = grid.transform
+        cell_width, cell_height = grid.cell_width, grid.cell_height
+        lon_ul, lat_ul = grid.lon_ul, grid.lat_ul
 
         # Starting cell (where user clicked)
-        col = int(np.clip((lon - lon_ul) / cell_width, 0, w - 1))
-        row = int(np.clip((lat_ul - lat) / cell_height, 0, h - 1))
+        row, col = grid.cell_of(lat, lon)
 
-        # Delineate watershed - trace downstream first to find pour point
-        flow_dirs = self._flow_direction_d8(arr)
-        outlet_r, outlet_c = self._trace_downstream(flow_dirs, row, col, h, w)
-        mask = self._drainage_basin(flow_dirs, outlet_r, outlet_c, h, w)
+        # Delineate watershed - the label raster gives the pour point and basin directly
+        products = self._routing_products(grid, condition_dem)
+        outlet_r, outlet_c = products.outlet_of(row, col)
+        mask = products.basin_mask(outlet_r, outlet_c)
         if mask is None or np.sum(mask) < 3:
             return WatershedContours(features=[], properties={"error": "No watershed found"})
 
@@ -562,34 +1070,25 @@ class WatershedModel:
         levels = np.arange(start_level, end_level + interval_m, interval_m)
 
         aff = Affine(*transform) if isinstance(transform, (list, tuple)) else transform
-        features = []
-
-        for level in levels:
-            if level < min_elev or level > max_elev:
-                continue
-            try:
-                contours = measure.find_contours(masked_arr, level)
-            except Exception:
-                continue
+        levels = levels[(levels >= min_elev) & (levels <= max_elev)]
 
-            for contour in contours:
-                if len(contour) < 3:
-                    continue
-                coords = []
-                for r, c in contour:
-                    x, y = aff * (c, r)
-                    coords.append([float(x), float(y)])
-                if len(coords) < 2:
-                    continue
+        # Contour only the basin's bounding window; everything outside it is NaN
+        rows_in = np.flatnonzero(mask.any(axis=1))
+        cols_in = np.flatnonzero(mask.any(axis=0))
+        r0, r1 = rows_in[0], rows_in[-1] + 1
+        c0, c1 = cols_in[0], cols_in[-1] + 1
+        window_aff = aff * Affine.translation(c0, r0)
 
+        features = []
+        with stage("contours"):
+            for level, vertices in contour_lines(masked_arr[r0:r1, c0:c1], levels, window_aff):
                 # Compute jet_value (0-1) for colormap
                 jet_value = float((level - min_elev) / elev_range)
-
                 features.append({
                     "type": "Feature",
-                    "geometry": {"type": "LineString", "coordinates": coords},
+                    "geometry": {"type": "LineString", "coordinates": vertices.tolist()},
                     "properties": {
-                        "elevation": float(level),
+                        "elevation": level,
                         "jet_value": round(jet_value, 4),
                     },
                 })
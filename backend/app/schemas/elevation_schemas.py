@@ -1,4 +1,4 @@
-from typing import List, Any
+from typing import Any, Dict, List
 from pydantic import BaseModel
 from app.models.elevation import Contours
 
@@ -6,7 +6,8 @@ from app.models.elevation import Contours
 class ContourResponse(BaseModel):
     type: str = "FeatureCollection"
     features: List[Any] = []
+    properties: Dict[str, Any] = {}
 
     @classmethod
     def from_domain(cls, contours: Contours) -> "ContourResponse":
-        return cls(type=contours.type, features=contours.features)
+        return cls(type=contours.type, features=contours.features, properties=contours.properties)
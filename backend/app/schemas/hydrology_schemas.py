@@ -1,7 +1,8 @@
-from typing import List, Any, Dict
-from pydantic import BaseModel
+from typing import List, Any, Dict, Literal
+from pydantic import BaseModel, Field
 from app.models.drainage import FlowPath
-from app.models.watershed import Rivers, Watershed, WatershedContours
+from app.core import raster_encoding
+from app.models.watershed import Rivers, Watershed, WatershedContours, WatershedRaster
 
 
 class RiversResponse(BaseModel):
@@ -41,6 +42,24 @@ class WatershedResponse(BaseModel):
         )
 
 
+class PourPoint(BaseModel):
+    lat: float = Field(ge=-90, le=90)
+    lon: float = Field(ge=-180, le=180)
+
+
+class WatershedBatchRequest(BaseModel):
+    points: List[PourPoint] = Field(min_length=1, max_length=500)
+    radius_m: float = Field(1500, gt=0, le=20000)
+    condition_dem: bool = False
+    simplify_tolerance_m: float = Field(0.0, ge=0)
+
+
+class WatershedBatchResponse(BaseModel):
+    type: str = "FeatureCollection"
+    features: List[Any] = []
+    properties: dict = {}
+
+
 class WatershedContoursResponse(BaseModel):
     type: str = "FeatureCollection"
     features: List[Any] = []
@@ -67,3 +86,31 @@ class WatershedGridResponse(BaseModel):
             features=features,
             metadata=metadata,
         )
+
+
+class WatershedRasterResponse(BaseModel):
+    """
+    Grid values as north-up rasters: width x height cells, row-major from the north-west
+    corner, transform = [a, b, c, d, e, f] mapping (col, row) to lon/lat. Each band holds
+    base64 data of dtype; uint8 bands decode as offset + scale * byte with nodata cells.
+    """
+    width: int = 0
+    height: int = 0
+    transform: List[float] = []
+    crs: str = "EPSG:4326"
+    encoding: str = "float32"
+    bands: Dict[str, Dict[str, Any]] = {}
+    metadata: Dict[str, Any] = {}
+
+    @classmethod
+    def from_domain(cls, raster: WatershedRaster, encoding: Literal["float32", "uint8"]) -> "WatershedRasterResponse":
+        encode = raster_encoding.encode_uint8 if encoding == "uint8" else raster_encoding.encode_float32
+        height, width = next(iter(raster.bands.values())).shape if raster.bands else (0, 0)
+        return cls(
+            width=width,
+            height=height,
+            transform=raster.transform,
+            encoding=encoding,
+            bands={name: encode(arr) for name, arr in raster.bands.items()},
+            metadata=raster.metadata,
+        )
@@ -0,0 +1,49 @@
+"""
+Benchmark the vectorized D8 kernel against the reference per-cell loop.
+
+Run from backend/:  python -m benchmarks.bench_flow_direction [--sizes 100 250 500 1000]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.core.flow_routing import flow_direction_d8, flow_direction_d8_naive
+
+
+def _terrain(size: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:size, 0:size] / size
+    return 200 - 50 * np.hypot(x - 0.5, y - 0.5) + rng.random((size, size)) * 5
+
+
+def _best_of(fn, arr: np.ndarray, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(arr)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    p = argparse.ArgumentParser(description="D8 flow direction benchmark")
+    p.add_argument("--sizes", type=int, nargs="+", default=[100, 250, 500, 1000])
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--naive-max", type=int, default=1000, help="Skip the loop above this size")
+    args = p.parse_args()
+
+    print(f"{'size':>8} {'naive_s':>10} {'vector_s':>10} {'speedup':>9}")
+    for size in args.sizes:
+        arr = _terrain(size)
+        vec = _best_of(flow_direction_d8, arr, args.repeat)
+        if size <= args.naive_max:
+            naive = _best_of(flow_direction_d8_naive, arr, 1)
+            assert np.array_equal(flow_direction_d8(arr), flow_direction_d8_naive(arr))
+            print(f"{size:>8} {naive:>10.3f} {vec:>10.4f} {naive / vec:>8.0f}x")
+        else:
+            print(f"{size:>8} {'-':>10} {vec:>10.4f} {'-':>9}")
+
+
+if __name__ == "__main__":
+    main()
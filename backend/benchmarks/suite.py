@@ -0,0 +1,259 @@
+"""
+Benchmark suite for the hydrology and contour hot paths, offline on synthetic terrain.
+
+Every case runs once under tracemalloc for peak memory, then --repeat times untraced for
+the best wall time. Results are compared with a saved baseline (machine-specific; keep one
+per machine) and cases slower or hungrier than baseline * (1 + threshold) are flagged.
+
+Run from backend/:
+    python -m benchmarks.suite                       # compare with benchmarks/baseline.json
+    python -m benchmarks.suite --save                # store this run as the baseline
+    python -m benchmarks.suite --sizes 100 500 --cases flow_direction_d8 contours_with_jet
+Exits with status 1 when a regression is flagged.
+"""
+import argparse
+import json
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from app.core.dem import DEM
+from app.core.flow_routing import drainage_basin_naive, longest_flow_path_naive, trace_downstream_naive
+from app.core.geo_utils import meters_per_degree_lat, meters_per_degree_lon
+from app.data.dem_provider import SyntheticDEMClient
+from app.models.elevation import ElevationModel
+from app.models.watershed import WatershedModel, _RoutingProducts
+
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+DEM_CELL_M = 10.0
+CENTER = (35.2, -80.6)
+
+
+class _FixedDEMClient:
+    """USGSClient stand-in returning one prebuilt DEM whatever is asked for."""
+
+    def __init__(self, dem: DEM):
+        self.dem = dem
+
+    def fetch_dem(self, lat, lon, radius_m, **kwargs):
+        return self.dem
+
+
+class _NoRivers:
+    def get_rivers_geojson(self, *args, **kwargs):
+        return {"type": "FeatureCollection", "features": []}
+
+
+class _Fixture:
+    """size x size valley-network DEM at DEM_CELL_M with its routing products, the outlet of
+    the largest basin, that basin's mask and its highest cell."""
+
+    def __init__(self, size: int, seed: int):
+        lat, lon = CENTER
+        self.dem = SyntheticDEMClient(terrain="valleys", seed=seed).fetch_dem(
+            lat, lon, size * DEM_CELL_M / 2, cell_size_m=DEM_CELL_M, max_pixels=size * size
+        )
+        self.client = _FixedDEMClient(self.dem)
+        self.model = WatershedModel(nhd_client=_NoRivers(), usgs_client=self.client)
+        self.grid = self.model._dem_grid(self.dem)
+        self.products = self.model._routing_products(self.grid)
+        labels, outlets = self.products.routing.basin_labels()
+        largest = int(np.argmax(np.bincount(labels[labels >= 0])))
+        self.outlet = divmod(int(outlets[largest]), self.dem.shape[1])
+        self.mask = labels == largest
+        self.source = np.unravel_index(np.argmax(np.where(self.mask, self.grid.arr, -np.inf)), self.dem.shape)
+
+
+class Case(NamedTuple):
+    # fixture, grid spacing (m, None for DEM-only cases) -> zero-argument call to time
+    setup: Callable[[_Fixture, Optional[float]], Callable[[], object]]
+    uses_spacing: bool = False
+    # Pure-Python loops grow too slow past this DEM side; --loop-max overrides
+    loop_based: bool = False
+
+
+def _flow_direction_d8(f: _Fixture, spacing):
+    return lambda: f.model._flow_direction_d8(f.grid.arr)
+
+
+def _trace_downstream(f: _Fixture, spacing):
+    return lambda: trace_downstream_naive(f.products.flow_dirs, int(f.source[0]), int(f.source[1]))
+
+
+def _drainage_basin(f: _Fixture, spacing):
+    return lambda: drainage_basin_naive(f.products.flow_dirs, *f.outlet)
+
+
+def _mask_to_polygon(f: _Fixture, spacing):
+    g = f.grid
+    return lambda: f.model._mask_to_polygon(f.mask, g.lon_ul, g.lat_ul, g.cell_width, g.cell_height)
+
+
+def _longest_flow_path_and_slope(f: _Fixture, spacing):
+    g = f.grid
+    lat = CENTER[0]
+    dx, dy = g.cell_width * meters_per_degree_lon(lat), g.cell_height * meters_per_degree_lat(lat)
+    return lambda: longest_flow_path_naive(g.arr, f.products.flow_dirs, f.mask, *f.outlet, dx, dy)
+
+
+def _compute_watershed_grid(f: _Fixture, spacing):
+    # Inner 80% of the DEM; a fresh model each call so the routing cache does not hide the work
+    minx, miny, maxx, maxy = f.dem.bounds
+    mx, my = (maxx - minx) * 0.1, (maxy - miny) * 0.1
+    return lambda: WatershedModel(nhd_client=_NoRivers(), usgs_client=f.client).compute_watershed_grid(
+        minx + mx, miny + my, maxx - mx, maxy - my, grid_spacing_m=spacing
+    )
+
+
+def _routing_products(f: _Fixture, spacing):
+    def run():
+        products = _RoutingProducts(f.grid, f.products.flow_dirs)
+        return products.accumulation, products.labels, products.time_of_concentration
+    return run
+
+
+def _routing_products_parallel(f: _Fixture, spacing):
+    # Uses the process pool as sized by ROUTING_WORKERS; the first (memory) run starts it
+    def run():
+        products = _RoutingProducts(f.grid, f.products.flow_dirs)
+        if not products.compute_parallel():
+            raise RuntimeError("parallel routing failed")
+        return products
+    return run
+
+
+def _contours_with_jet(f: _Fixture, spacing):
+    model = ElevationModel(usgs_client=f.client)
+    return lambda: model._generate_contours_with_jet(f.dem, 5.0)
+
+
+CASES: Dict[str, Case] = {
+    "flow_direction_d8": Case(_flow_direction_d8),
+    "trace_downstream": Case(_trace_downstream, loop_based=True),
+    "drainage_basin": Case(_drainage_basin, loop_based=True),
+    "mask_to_polygon": Case(_mask_to_polygon),
+    "longest_flow_path_and_slope": Case(_longest_flow_path_and_slope, loop_based=True),
+    "routing_products": Case(_routing_products),
+    "routing_products_parallel": Case(_routing_products_parallel),
+    "compute_watershed_grid": Case(_compute_watershed_grid, uses_spacing=True),
+    "contours_with_jet": Case(_contours_with_jet),
+}
+
+
+@dataclass
+class Result:
+    case: str
+    size: int
+    spacing_m: Optional[float]
+    time_s: float
+    peak_mb: float
+
+    @property
+    def key(self) -> str:
+        spacing = f",{self.spacing_m:g}m" if self.spacing_m is not None else ""
+        return f"{self.case}[{self.size}{spacing}]"
+
+
+def measure(fn: Callable[[], object], repeat: int) -> Tuple[float, float]:
+    """(best wall time in s, peak traced allocation in MB) of fn."""
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, peak / 1e6
+
+
+def run_suite(
+    sizes: List[int], spacings: List[float], cases: List[str], repeat: int = 3,
+    loop_max: int = 1000, seed: int = 0, log: Callable[[str], None] = print
+) -> List[Result]:
+    results = []
+    for size in sizes:
+        fixture = None
+        for name in cases:
+            case = CASES[name]
+            if case.loop_based and size > loop_max:
+                continue
+            fixture = fixture or _Fixture(size, seed)
+            for spacing in (spacings if case.uses_spacing else [None]):
+                t, peak = measure(case.setup(fixture, spacing), repeat)
+                result = Result(name, size, spacing, t, peak)
+                log(f"{result.key:<44} {t:>10.4f} s {peak:>10.1f} MB")
+                results.append(result)
+    return results
+
+
+def load_baseline(path: Path) -> Dict[str, Dict[str, float]]:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())["results"]
+
+
+def save_baseline(path: Path, results: List[Result]) -> None:
+    path.write_text(json.dumps({"results": {r.key: asdict(r) for r in results}}, indent=2) + "\n")
+
+
+def regressions(
+    results: List[Result], baseline: Dict[str, Dict[str, float]], threshold: float,
+    min_time_s: float = 0.005, min_peak_mb: float = 1.0
+) -> List[str]:
+    """
+    Messages for cases beyond baseline * (1 + threshold) in time or peak memory; absolute
+    floors keep timer noise on millisecond cases from being flagged.
+    """
+    flagged = []
+    for r in results:
+        base = baseline.get(r.key)
+        if base is None:
+            continue
+        if r.time_s > base["time_s"] * (1 + threshold) and r.time_s - base["time_s"] > min_time_s:
+            flagged.append(f"{r.key}: time {base['time_s']:.4f} s -> {r.time_s:.4f} s")
+        if r.peak_mb > base["peak_mb"] * (1 + threshold) and r.peak_mb - base["peak_mb"] > min_peak_mb:
+            flagged.append(f"{r.key}: peak {base['peak_mb']:.1f} MB -> {r.peak_mb:.1f} MB")
+    return flagged
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Hydrology and contour benchmark suite")
+    p.add_argument("--sizes", type=int, nargs="+", default=[100, 500, 1000, 2000, 4000], help="DEM sides (cells)")
+    p.add_argument("--spacings", type=float, nargs="+", default=[50, 100, 250], help="Grid spacings (m)")
+    p.add_argument("--cases", nargs="+", choices=sorted(CASES), default=list(CASES))
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--loop-max", type=int, default=1000, help="Skip pure-Python loop cases above this size")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    p.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown/growth over baseline")
+    p.add_argument("--save", action="store_true", help="Store this run as the baseline")
+    args = p.parse_args()
+
+    print(f"{'case':<44} {'time':>12} {'peak':>13}")
+    results = run_suite(args.sizes, args.spacings, args.cases, args.repeat, args.loop_max, args.seed)
+    if args.save:
+        save_baseline(args.baseline, results)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+    baseline = load_baseline(args.baseline)
+    if not baseline:
+        print(f"No baseline at {args.baseline}; run with --save to create one")
+        return 0
+    flagged = regressions(results, baseline, args.threshold)
+    for message in flagged:
+        print(f"REGRESSION {message}")
+    if not flagged:
+        print(f"No regressions beyond {args.threshold:.0%} of {args.baseline}")
+    return 1 if flagged else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
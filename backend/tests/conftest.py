@@ -38,7 +38,7 @@ def sample_dem():
 @pytest.fixture
 def elevation_model(sample_dem):
     class MockUSGS:
-        def fetch_dem(self, lat, lon, radius_m):
+        def fetch_dem(self, lat, lon, radius_m, **kwargs):
             return sample_dem
     return ElevationModel(usgs_client=MockUSGS())
 
@@ -46,7 +46,7 @@ def elevation_model(sample_dem):
 @pytest.fixture
 def drainage_model(sample_dem):
     class MockUSGS:
-        def fetch_dem(self, lat, lon, radius_m):
+        def fetch_dem(self, lat, lon, radius_m, **kwargs):
             return sample_dem
     return DrainageModel(usgs_client=MockUSGS())
 
@@ -71,6 +71,6 @@ def expected_watershed():
 def watershed_model(watershed_fixture_dem):
     """WatershedModel that returns fixture DEM for any lat/lon/radius."""
     class MockUSGS:
-        def fetch_dem(self, lat, lon, radius_m):
+        def fetch_dem(self, lat, lon, radius_m, **kwargs):
             return watershed_fixture_dem
     return WatershedModel(usgs_client=MockUSGS())
@@ -156,3 +156,103 @@ def test_watershed_grid_returns_valid_features(client, watershed_model):
     assert metadata["point_count"] == len(features)
     
     app.dependency_overrides.clear()
+
+
+def test_watershed_grid_with_conditioned_dem(client, watershed_model):
+    """Conditioning fills the fixture bowl, so grid points drain over the rim instead of to the pit."""
+    from app.core.deps import get_watershed_model
+    from app.main import app
+
+    app.dependency_overrides[get_watershed_model] = lambda: watershed_model
+
+    r = client.get(
+        "/api/hydrology/watershed/grid?minx=-80.65&miny=35.15&maxx=-80.55&maxy=35.25"
+        "&grid_spacing_m=200&condition_dem=true"
+    )
+    assert r.status_code == 200
+    data = r.json()
+    assert data["metadata"]["point_count"] == len(data["features"]) > 0
+    for feature in data["features"]:
+        assert feature["properties"]["area_ha"] > 0
+        assert feature["properties"]["tc_min"] > 0
+
+    app.dependency_overrides.clear()
+
+
+def test_watershed_batch_shares_one_dem(client, watershed_fixture_dem):
+    """Batch endpoint fetches one DEM and returns a feature per point, sharing basins by outlet."""
+    from app.core.deps import get_watershed_model
+    from app.main import app
+    from app.models.watershed import WatershedModel
+
+    calls = []
+
+    class MockUSGS:
+        def fetch_dem(self, lat, lon, radius_m, **kwargs):
+            calls.append((lat, lon, radius_m))
+            return watershed_fixture_dem
+
+    app.dependency_overrides[get_watershed_model] = lambda: WatershedModel(usgs_client=MockUSGS())
+
+    points = [{"lat": 35.2, "lon": -80.6}, {"lat": 35.201, "lon": -80.601}, {"lat": 35.199, "lon": -80.6}]
+    r = client.post("/api/hydrology/watershed/batch", json={"points": points, "radius_m": 500})
+    assert r.status_code == 200
+    data = r.json()
+    assert len(calls) == 1
+    assert len(data["features"]) == 3
+    assert data["properties"] == {"point_count": 3, "basin_count": 1}
+    for feature, point in zip(data["features"], points):
+        props = feature["properties"]
+        assert feature["geometry"]["type"] == "Polygon"
+        assert props["lat"] == point["lat"] and props["lon"] == point["lon"]
+        assert props["area_ha"] > 0
+        assert props["time_of_concentration_min"] > 0
+        assert "outlet_lat" in props and "outlet_lon" in props
+
+    r = client.post("/api/hydrology/watershed/batch", json={"points": []})
+    assert r.status_code == 422
+
+    app.dependency_overrides.clear()
+
+
+def test_watershed_grid_raster_encodings(client, watershed_model):
+    from app.core.deps import get_watershed_model
+    from app.main import app
+
+    app.dependency_overrides[get_watershed_model] = lambda: watershed_model
+    bbox = "minx=-80.65&miny=35.15&maxx=-80.55&maxy=35.25&grid_spacing_m=200"
+
+    data = client.get(f"/api/hydrology/watershed/grid/raster?{bbox}&encoding=uint8").json()
+    assert data["encoding"] == "uint8" and len(data["transform"]) == 6
+    assert set(data["bands"]) == {"area_ha", "tc_min", "jet_value_area", "jet_value_tc"}
+    assert data["metadata"]["point_count"] > 0
+
+    png = client.get(f"/api/hydrology/watershed/grid/raster?{bbox}&encoding=png&mode=tc")
+    assert png.headers["content-type"] == "image/png" and png.content.startswith(b"\x89PNG")
+    assert len(png.headers["x-raster-transform"].split(",")) == 6
+    cog = client.get(f"/api/hydrology/watershed/grid/raster?{bbox}&encoding=cog")
+    assert cog.headers["content-type"] == "image/tiff"
+
+    app.dependency_overrides.clear()
+
+
+def test_watershed_grid_stream_ndjson(client, watershed_model):
+    import json
+    from app.core.deps import get_watershed_model
+    from app.main import app
+
+    app.dependency_overrides[get_watershed_model] = lambda: watershed_model
+    r = client.get(
+        "/api/hydrology/watershed/grid/stream?minx=-80.65&miny=35.15&maxx=-80.55&maxy=35.25&grid_spacing_m=200"
+    )
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/x-ndjson"
+    records = [json.loads(line) for line in r.text.splitlines()]
+    assert all(rec["type"] == "Feature" for rec in records[:-1])
+    assert records[-1]["type"] == "Metadata"
+    assert records[-1]["metadata"]["point_count"] == len(records) - 1
+    # Routing runs before the response starts, so its stages reach Server-Timing
+    stages = {part.split(";")[0] for part in r.headers["server-timing"].split(", ")}
+    assert {"d8_routing", "basin_labels"} <= stages
+
+    app.dependency_overrides.clear()
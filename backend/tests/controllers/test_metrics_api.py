@@ -0,0 +1,23 @@
+def test_server_timing_lists_model_stages(client, watershed_model):
+    from app.core.deps import get_watershed_model
+    from app.main import app
+    app.dependency_overrides[get_watershed_model] = lambda: watershed_model
+
+    r = client.get(
+        "/api/hydrology/watershed/grid?minx=-80.65&miny=35.15&maxx=-80.55&maxy=35.25&grid_spacing_m=200"
+    )
+    assert r.status_code == 200
+    stages = {part.split(";")[0] for part in r.headers["server-timing"].split(", ")}
+    assert {"d8_routing", "grid_evaluate", "serialize", "total"} <= stages
+
+    app.dependency_overrides.clear()
+
+
+def test_metrics_exposition(client):
+    client.get("/health")
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'watershed_request_seconds_count{route="/health"}' in r.text
+    assert "# TYPE watershed_stage_seconds histogram" in r.text
+    assert "watershed_upstream_errors_total" in r.text
@@ -0,0 +1,68 @@
+def _tile_model(elevation_model):
+    from app.models.tiles import VectorTileModel
+
+    class NoFloodZones:
+        def get_flood_zones(self, *bbox):
+            from app.models.flood_risk import FloodZone
+            return FloodZone(features=[])
+
+    return VectorTileModel(elevation_model=elevation_model, flood_model=NoFloodZones())
+
+
+def test_contour_tile_etag_and_cache(client, elevation_model):
+    from app.core.deps import get_vector_tile_model
+    from app.main import app
+    model = _tile_model(elevation_model)
+    app.dependency_overrides[get_vector_tile_model] = lambda: model
+
+    # z16 tile over the sample DEM
+    r = client.get("/api/tiles/contours/16/18095/25891.mvt?interval_m=2")
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/vnd.mapbox-vector-tile"
+    assert r.headers["cache-control"].startswith("public, max-age=")
+    assert b"jet_value" in r.content
+    etag = r.headers["etag"]
+
+    again = client.get("/api/tiles/contours/16/18095/25891.mvt?interval_m=2", headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.headers["etag"] == etag
+    listed = client.get(
+        "/api/tiles/contours/16/18095/25891.mvt?interval_m=2", headers={"If-None-Match": f'"stale", W/{etag}'}
+    )
+    assert listed.status_code == 304
+    # A tag merely containing the ETag does not match
+    partial = client.get(
+        "/api/tiles/contours/16/18095/25891.mvt?interval_m=2", headers={"If-None-Match": f'"v1{etag}"'}
+    )
+    assert partial.status_code == 200
+    assert model.cache.stats()["hits"] == 3
+
+    app.dependency_overrides.clear()
+
+
+def test_empty_and_invalid_tiles(client, elevation_model):
+    from app.core.deps import get_vector_tile_model
+    from app.main import app
+    app.dependency_overrides[get_vector_tile_model] = lambda: _tile_model(elevation_model)
+
+    low = client.get("/api/tiles/flood/3/2/3.mvt")
+    assert low.status_code == 200 and b"\x0a\x05flood" in low.content
+    assert client.get("/api/tiles/contours/2/4/0.mvt").status_code == 404
+
+    app.dependency_overrides.clear()
+
+
+def test_tile_rendering_errors_are_not_404(client, elevation_model):
+    import pytest
+    from app.core.deps import get_vector_tile_model
+    from app.main import app
+    model = _tile_model(elevation_model)
+    app.dependency_overrides[get_vector_tile_model] = lambda: model
+
+    def broken(*args):
+        raise ValueError("bad geometry")
+
+    model._flood_features = broken
+    with pytest.raises(ValueError):
+        client.get("/api/tiles/flood/12/1000/1000.mvt")
+
+    app.dependency_overrides.clear()
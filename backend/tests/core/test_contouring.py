@@ -0,0 +1,55 @@
+import numpy as np
+from affine import Affine
+from skimage import measure
+
+from app.core.contouring import clip_lines, contour_lines, simplify_lines
+from app.core.terrain import generate_terrain
+
+
+def test_matches_per_level_find_contours():
+    arr = generate_terrain("valleys", (120, 90), seed=5)
+    levels = [130.0, 150.0, 170.0]
+    aff = Affine(0.5, 0.0, 10.0, 0.0, -0.25, 40.0)
+    lines = contour_lines(arr, levels, aff, min_vertices=1)
+    for level in levels:
+        expected = np.concatenate([c[:, ::-1] for c in measure.find_contours(arr, level)])
+        expected = np.column_stack([10.0 + 0.5 * expected[:, 0], 40.0 - 0.25 * expected[:, 1]])
+        got = np.concatenate([v for lv, v in lines if lv == level])
+        assert set(map(tuple, np.round(got, 9))) == set(map(tuple, np.round(expected, 9)))
+
+
+def test_nan_cells_and_point_levels_produce_no_lines():
+    y, x = np.mgrid[0:11, 0:11]
+    arr = np.hypot(x - 5, y - 5).astype(np.float32)
+    arr[0, :] = np.nan
+    lines = contour_lines(arr, [0.0, 2.0], Affine.identity())
+    # Level 0 touches only the center cell; level 2 is one closed ring around it
+    assert [level for level, _ in lines] == [2.0]
+    ring = lines[0][1]
+    np.testing.assert_array_equal(ring[0], ring[-1])
+    assert contour_lines(arr, [], Affine.identity()) == []
+
+
+def test_simplify_lines_reduces_vertices_and_quantizes():
+    t = np.linspace(0, 2 * np.pi, 401)
+    circle = np.column_stack([np.cos(t), np.sin(t)])
+    line = np.column_stack([np.linspace(0, 1, 50), np.zeros(50)])
+    out = simplify_lines([(1.0, circle), (2.0, line)], tolerance=0.01, decimals=3)
+    assert [level for level, _ in out] == [1.0, 2.0]
+    ring, straight = out[0][1], out[1][1]
+    assert 8 < len(ring) < len(circle)
+    np.testing.assert_array_equal(ring[0], ring[-1])
+    assert len(straight) == 2
+    np.testing.assert_array_equal(ring, np.round(ring, 3))
+    assert simplify_lines([(1.0, line)]) == [(1.0, line)]
+
+
+def test_clip_lines_splits_lines_that_reenter_the_box():
+    # A U-shaped line dipping below the box: two parts inside, no segment along the gap
+    u = np.array([[1.0, 3.0], [1.0, -1.0], [3.0, -1.0], [3.0, 3.0]])
+    outside = np.array([[10.0, 10.0], [11.0, 11.0]])
+    out = clip_lines([(5.0, u), (6.0, outside)], (0.0, 0.0, 4.0, 4.0))
+    assert [level for level, _ in out] == [5.0, 5.0]
+    parts = sorted(tuple(map(tuple, v)) for _, v in out)
+    assert parts == [((1.0, 3.0), (1.0, 0.0)), ((3.0, 0.0), (3.0, 3.0))]
+    assert clip_lines([], (0.0, 0.0, 1.0, 1.0)) == []
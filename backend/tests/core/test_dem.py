@@ -0,0 +1,33 @@
+import numpy as np
+from app.core.dem import DEM, NODATA, as_dem
+
+
+def test_from_dict_maps_nodata_to_nan(sample_dem):
+    sample_dem["data"][0][0] = -9999
+    dem = DEM.from_dict(sample_dem)
+    assert dem.data.dtype == np.float32
+    assert np.isnan(dem.data[0, 0])
+    assert dem.transform.c == -80.6 and dem.cell_height == 0.0001
+    minx, miny, maxx, maxy = dem.bounds
+    assert np.isclose(maxx - minx, 10 * 0.0001) and maxy == 35.3
+
+
+def test_from_array_leaves_the_callers_array_alone():
+    arr = np.arange(12, dtype=np.float32).reshape(3, 4)
+    dem = DEM.from_array(arr, [1, 0, 0, 0, -1, 3], nodata=0)
+    assert np.isnan(dem.data[0, 0]) and dem.data.dtype == np.float32
+    assert arr[0, 0] == 0
+    assert np.shares_memory(DEM.from_array(arr, [1, 0, 0, 0, -1, 3], nodata=-9999).data, arr)
+
+
+def test_dict_form_round_trip():
+    dem = DEM(data=np.array([[1.5, np.nan]], dtype=np.float32), transform=[0.5, 0, 10, 0, -0.5, 20], source="test")
+    d = dem.to_dict()
+    assert d["data"] == [[1.5, NODATA]]
+    assert d["transform"] == [0.5, 0, 10, 0, -0.5, 20]
+    back = as_dem(d)
+    np.testing.assert_array_equal(back.data, dem.data)
+    assert back.source == "test"
+    assert as_dem(dem) is dem
+    assert as_dem(None) is None
+    assert as_dem({"data": [], "transform": [1, 0, 0, 0, -1, 0]}) is None
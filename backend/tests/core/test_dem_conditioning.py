@@ -0,0 +1,49 @@
+import numpy as np
+from app.core.dem_conditioning import condition_dem, fill_depressions, resolve_flats
+from app.core.flow_routing import FlowRouting, flow_direction_d8
+
+
+def _noisy_dem(size=60, seed=2):
+    rng = np.random.default_rng(seed)
+    arr = np.round(rng.random((size, size)) * 20)
+    arr[rng.random(arr.shape) < 0.02] = np.nan
+    return arr
+
+
+def test_fill_depressions_raises_pits_to_spill_level(watershed_fixture_dem):
+    arr = np.array(watershed_fixture_dem["data"], dtype=float)
+    filled = fill_depressions(arr)
+    assert np.all(filled >= arr)
+    rim = min(arr[0].min(), arr[-1].min(), arr[:, 0].min(), arr[:, -1].min())
+    assert filled[10, 10] == rim  # the bowl fills up to its lowest rim cell
+    np.testing.assert_array_equal(filled[0], arr[0])
+
+
+def test_fill_depressions_keeps_nodata():
+    arr = _noisy_dem()
+    filled = fill_depressions(arr)
+    np.testing.assert_array_equal(np.isnan(filled), np.isnan(arr))
+    assert np.all(filled[~np.isnan(arr)] >= arr[~np.isnan(arr)])
+
+
+def test_condition_dem_drains_every_interior_cell():
+    arr = _noisy_dem()
+    filled, flow = condition_dem(arr)
+    valid = ~np.isnan(arr)
+    interior = np.zeros(arr.shape, dtype=bool)
+    interior[1:-1, 1:-1] = True
+    near_nodata = np.zeros(arr.shape, dtype=bool)
+    for dr in (-1, 0, 1):
+        for dc in (-1, 0, 1):
+            near_nodata |= np.roll(np.roll(~valid, dr, axis=0), dc, axis=1)
+    assert not np.any((flow == 0) & valid & interior & ~near_nodata)
+    routing = FlowRouting(flow)
+    assert sum(level.size for level in routing.levels) == arr.size  # acyclic
+
+
+def test_resolve_flats_drains_toward_low_edge():
+    arr = np.full((5, 7), 10.0)
+    arr[:, 0] = 5.0
+    flow = resolve_flats(arr, flow_direction_d8(arr))
+    assert np.all(flow[1:-1, 1:-1] > 0)
+    assert np.all(np.isin(flow[1:-1, 1], [4, 5, 6]))  # westward into the low column
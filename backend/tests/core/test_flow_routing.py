@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+from app.core.flow_routing import (
+    FlowRouting,
+    drainage_basin_naive,
+    flow_direction_d8,
+    flow_direction_d8_naive,
+    longest_flow_path_naive,
+    trace_downstream_naive,
+)
+
+
+def test_flow_direction_d8_matches_naive_on_random_dem():
+    rng = np.random.default_rng(7)
+    arr = rng.random((40, 35)) * 100
+    arr[rng.random(arr.shape) < 0.05] = np.nan
+    np.testing.assert_array_equal(flow_direction_d8(arr), flow_direction_d8_naive(arr))
+
+
+def test_flow_direction_d8_matches_naive_on_ties_and_flats():
+    arr = np.round(np.random.default_rng(3).random((25, 25)) * 3)
+    arr[5:10, 5:10] = 1.0
+    np.testing.assert_array_equal(flow_direction_d8(arr), flow_direction_d8_naive(arr))
+
+
+def test_flow_direction_d8_edges_and_pits_have_no_flow(watershed_fixture_dem):
+    arr = np.array(watershed_fixture_dem["data"], dtype=float)
+    flow = flow_direction_d8(arr)
+    assert flow.dtype == np.int32
+    assert not flow[0].any() and not flow[-1].any()
+    assert not flow[:, 0].any() and not flow[:, -1].any()
+    assert flow[10, 10] == 0
+    assert flow[1, 1] == 2  # SE, toward the bowl center
+
+
+def test_flow_accumulation_counts_every_cell_once(watershed_fixture_dem):
+    arr = np.array(watershed_fixture_dem["data"], dtype=float)
+    routing = FlowRouting(flow_direction_d8(arr))
+    acc = routing.accumulate()
+    outlets = routing.receivers.reshape(arr.shape) < 0
+    assert acc[10, 10] == 18 * 18  # every interior cell drains to the bowl center
+    assert acc[outlets].sum() == arr.size
+    assert acc.min() == 1
+
+
+def test_flow_accumulation_weights_follow_the_flow():
+    arr = np.array([[9, 9, 9, 9], [9, 4, 3, 9], [9, 9, 2, 9], [9, 9, 1, 9]], dtype=float)
+    routing = FlowRouting(flow_direction_d8(arr))
+    acc = routing.accumulate(np.full(arr.shape, 2.5))
+    assert acc[2, 2] == 2.5 * 3  # (1,1) and (1,2) drain to (2,2)
+    assert acc[3, 2] == 2.5 * 5  # plus (2,1) and the edge cell itself
+
+
+def test_basin_labels_match_downstream_trace():
+    arr = np.random.default_rng(11).random((30, 30)) * 50
+    flow = flow_direction_d8(arr)
+    labels, outlets = FlowRouting(flow).basin_labels()
+    assert labels.dtype == np.int32 and labels.min() >= 0
+    for r in range(0, 30, 3):
+        for c in range(0, 30, 4):
+            outlet = trace_downstream_naive(flow, r, c)
+            assert divmod(int(outlets[labels[r, c]]), 30) == outlet
+            mask = drainage_basin_naive(flow, *outlet)
+            np.testing.assert_array_equal(labels == labels[outlet], mask)
+
+
+def test_longest_path_and_max_elevation_match_basin_walk():
+    y, x = np.mgrid[0:30, 0:30]
+    arr = 100 - 2 * np.hypot(x - 15, y - 20) + np.random.default_rng(5).random((30, 30))
+    flow = flow_direction_d8(arr)
+    routing = FlowRouting(flow)
+    labels, outlets = routing.basin_labels()
+    length = routing.longest_upstream_length(30.0, 20.0)
+    max_elev = routing.upstream_max(arr)
+    for outlet in outlets[:25]:
+        r, c = divmod(int(outlet), 30)
+        mask = labels == labels[r, c]
+        L_m, _ = longest_flow_path_naive(arr, flow, mask, r, c, 30.0, 20.0)
+        assert length[r, c] == pytest.approx(L_m)
+        assert max_elev[r, c] == np.nanmax(arr[mask])
@@ -0,0 +1,58 @@
+import asyncio
+
+from app.core.metrics import Histogram, RequestTimings, _request_timings, stage, timed
+
+
+def test_histogram_renders_cumulative_buckets():
+    h = Histogram("x_seconds", "Test.", "stage", buckets=(0.1, 1.0))
+    for seconds in (0.05, 0.5, 0.5, 5.0):
+        h.observe("d8", seconds)
+    lines = list(h.render())
+    assert 'x_seconds_bucket{stage="d8",le="0.1"} 1' in lines
+    assert 'x_seconds_bucket{stage="d8",le="1"} 3' in lines
+    assert 'x_seconds_bucket{stage="d8",le="+Inf"} 4' in lines
+    assert 'x_seconds_count{stage="d8"} 4' in lines
+
+
+def test_stages_are_summed_into_the_current_request():
+    timings = RequestTimings()
+    token = _request_timings.set(timings)
+    try:
+        with stage("polygon"):
+            pass
+
+        @timed("polygon")
+        async def trace():
+            return 1
+
+        assert asyncio.run(trace()) == 1
+    finally:
+        _request_timings.reset(token)
+    assert list(timings.stages) == ["polygon"]
+    assert timings.header(0.25).endswith("total;dur=250.0")
+
+
+def test_serialize_is_recorded_once_per_request():
+    from fastapi import APIRouter, FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.core.metrics import STAGE_SECONDS, ServerTimingMiddleware, TimedRoute
+    from app.core.responses import FastJSONResponse
+
+    router = APIRouter(route_class=TimedRoute)
+    router.get("/fast")(lambda: FastJSONResponse({"a": 1}))
+    router.get("/model")(lambda: {"a": 1})
+    app = FastAPI()
+    app.include_router(router)
+    app.add_middleware(ServerTimingMiddleware)
+    client = TestClient(app)
+
+    def serialize_count():
+        series = STAGE_SECONDS._series.get("serialize")
+        return series[2] if series else 0
+
+    for path in ("/fast", "/model"):
+        before = serialize_count()
+        r = client.get(path)
+        assert serialize_count() == before + 1
+        assert "serialize;" in r.headers["server-timing"]
@@ -0,0 +1,36 @@
+import pytest
+from shapely import LineString, Polygon
+
+from app.core.mvt import _geometry_commands, _varints, encode_layer, encode_tile, tile_bounds
+
+
+def test_tile_bounds_and_varints():
+    minx, miny, maxx, maxy = tile_bounds(0, 0, 0)
+    assert (minx, maxx) == (-180.0, 180.0)
+    assert maxy == pytest.approx(85.0511287798) and miny == pytest.approx(-85.0511287798)
+    assert tile_bounds(1, 1, 0) == pytest.approx((0.0, 0.0, 180.0, 85.0511287798))
+    assert _varints([1, 300, 0]) == b"\x01\xac\x02\x00"
+
+
+def test_geometry_commands_match_spec_examples():
+    kind, commands = _geometry_commands(LineString([(2, 2), (2, 10), (10, 10)]))
+    assert kind == 2 and commands.tolist() == [9, 4, 4, 18, 0, 16, 16, 0]
+    kind, commands = _geometry_commands(Polygon([(3, 6), (8, 12), (20, 34)]))
+    assert kind == 3 and commands.tolist() == [9, 6, 12, 18, 10, 12, 24, 44, 15]
+
+
+def test_encode_layer_clips_and_drops_features_outside_the_tile():
+    bounds = tile_bounds(14, 4535, 6498)
+    minx, miny, maxx, maxy = bounds
+    mid = (miny + maxy) / 2
+    crossing = {"geometry": {"type": "LineString", "coordinates": [[minx - 1, mid], [maxx + 1, mid]]},
+                "properties": {"elevation": 100.0, "zone": "AE", "skip": None}}
+    outside = {"geometry": {"type": "LineString", "coordinates": [[minx - 2, mid], [minx - 1, mid]]},
+               "properties": {"elevation": 90.0}}
+    empty = encode_layer("contours", [], bounds)
+    assert encode_layer("contours", [outside], bounds) == empty
+    layer = encode_layer("contours", [crossing, outside], bounds)
+    assert len(layer) > len(empty) and b"elevation" in layer and b"skip" not in layer
+    # The line is clipped to the buffer edge: MoveTo(1) with x = zigzag(-64)
+    assert b"\x09\x7f" in layer
+    assert encode_tile({"contours": layer}) == b"\x1a" + bytes([len(layer)]) + layer
@@ -0,0 +1,24 @@
+import numpy as np
+from app.core.parallel import SharedRasters, attach
+
+
+def test_shared_rasters_round_trip():
+    arrays = {"dem": np.random.default_rng(0).random((4, 5)), "labels": np.arange(20, dtype=np.int32)}
+    with SharedRasters(arrays) as shared:
+        mapped, blocks = attach(shared.spec)
+        np.testing.assert_array_equal(mapped["dem"], arrays["dem"])
+        assert mapped["labels"].dtype == np.int32
+        del mapped
+        for block in blocks:
+            block.close()
+
+
+def test_shared_outputs_are_read_back():
+    with SharedRasters({}, outputs={"acc": ((2, 3), np.float64)}) as shared:
+        mapped, blocks = attach(shared.spec)
+        mapped["acc"][1, 2] = 7.0
+        del mapped
+        for block in blocks:
+            block.close()
+        out = shared.read("acc")
+    assert out[1, 2] == 7.0 and out.sum() == 7.0
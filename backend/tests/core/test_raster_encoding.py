@@ -0,0 +1,33 @@
+import base64
+import struct
+import zlib
+
+import numpy as np
+
+from app.core.raster_encoding import encode_float32, encode_geotiff, encode_png, encode_uint8, jet_rgba
+
+
+def test_array_encodings_round_trip():
+    arr = np.array([[0.0, 5.0], [np.nan, 10.0]], dtype=np.float32)
+    f = encode_float32(arr)
+    np.testing.assert_array_equal(np.frombuffer(base64.b64decode(f["data"]), "<f4").reshape(2, 2), arr)
+    q = encode_uint8(arr)
+    raw = np.frombuffer(base64.b64decode(q["data"]), np.uint8).reshape(2, 2)
+    assert raw[1, 0] == q["nodata"] and raw[1, 1] == 254
+    np.testing.assert_allclose(q["offset"] + q["scale"] * raw[[0, 0, 1], [0, 1, 1]], [0.0, 5.0, 10.0], atol=0.03)
+
+
+def test_jet_png_and_geotiff():
+    values = np.array([[0.0, 0.5, 1.0, np.nan]])
+    rgba = jet_rgba(values)
+    assert rgba.tolist() == [[[0, 0, 255, 255], [0, 255, 0, 255], [255, 0, 0, 255], [0, 0, 255, 0]]]
+    png = encode_png(rgba)
+    assert png.startswith(b"\x89PNG") and struct.unpack(">II", png[16:24]) == (4, 1)
+    idat = png[png.index(b"IDAT") + 4:png.index(b"IEND") - 8]
+    assert zlib.decompress(idat) == b"\x00" + rgba.tobytes()
+
+    from rasterio.io import MemoryFile
+    bands = {"area_ha": np.array([[1.0, np.nan]], dtype=np.float32), "tc_min": np.ones((1, 2), np.float32)}
+    with MemoryFile(encode_geotiff(bands, [0.5, 0, -80.0, 0, -0.5, 35.0])) as memfile, memfile.open() as ds:
+        assert ds.count == 2 and ds.descriptions == ("area_ha", "tc_min")
+        assert ds.transform.c == -80.0 and np.isnan(ds.read(1)[0, 1])
@@ -0,0 +1,17 @@
+import json
+
+import numpy as np
+
+from app.core.responses import FastJSONResponse
+
+
+def test_fast_json_response_encodes_numpy_and_nan():
+    r = FastJSONResponse({"a": np.arange(3, dtype=np.int32), "b": np.float32(1.5), "c": float("nan"), 1: "x"})
+    assert r.media_type == "application/json"
+    assert json.loads(r.body) == {"a": [0, 1, 2], "b": 1.5, "c": None, "1": "x"}
+
+
+def test_fast_routes_keep_their_openapi_schema(client):
+    schema = client.get("/openapi.json").json()
+    grid = schema["paths"]["/api/hydrology/watershed/grid"]["get"]["responses"]["200"]
+    assert grid["content"]["application/json"]["schema"]["$ref"].endswith("/WatershedGridResponse")
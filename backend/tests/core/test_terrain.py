@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+from app.core.dem_conditioning import fill_depressions
+from app.core.terrain import TERRAINS, generate_terrain
+
+
+@pytest.mark.parametrize("kind", sorted(TERRAINS))
+def test_same_seed_same_raster(kind):
+    a = generate_terrain(kind, (120, 80), seed=7)
+    assert a.dtype == np.float32 and a.shape == (120, 80)
+    np.testing.assert_array_equal(a, generate_terrain(kind, (120, 80), seed=7))
+    assert not np.array_equal(a, generate_terrain(kind, (120, 80), seed=8))
+
+
+def test_base_and_relief_scale_unit_surface():
+    arr = generate_terrain("fractal", (64, 64), seed=1, base_m=250.0, relief_m=40.0)
+    assert arr.min() == pytest.approx(250.0) and arr.max() == pytest.approx(290.0)
+
+
+def test_flats_are_terraced():
+    arr = generate_terrain("flats", (100, 100), seed=3, levels=5)
+    assert len(np.unique(arr)) <= 5
+
+
+def test_bowls_have_pits():
+    arr = generate_terrain("bowls", (100, 100), seed=2)
+    assert (fill_depressions(arr.astype(np.float64)) > arr).any()
+
+
+def test_rejects_unknown_terrain():
+    with pytest.raises(ValueError):
+        generate_terrain("volcano", (10, 10))
@@ -0,0 +1,37 @@
+import numpy as np
+from app.core.vectorize import mask_to_geojson, mask_to_shape
+
+UNIT = [1.0, 0, 0.0, 0, -1.0, 0.0]
+
+
+def test_mask_to_shape_traces_cell_edges_with_holes():
+    mask = np.ones((5, 5), dtype=bool)
+    mask[2, 2] = False
+    geom = mask_to_shape(mask, UNIT)
+    assert geom.geom_type == "Polygon"
+    assert len(geom.interiors) == 1
+    assert geom.area == 24
+
+
+def test_mask_to_shape_keeps_non_convex_outline():
+    mask = np.zeros((6, 6), dtype=bool)
+    mask[0:6, 0] = True
+    mask[5, 0:6] = True  # an L shape: the hull would cover half the square
+    geom = mask_to_shape(mask, UNIT)
+    assert geom.area == 11
+
+
+def test_diagonal_only_cells_become_valid_multipolygon():
+    mask = np.array([[1, 0], [0, 1]], dtype=bool)
+    geom = mask_to_shape(mask, UNIT)
+    assert geom.is_valid
+    assert geom.geom_type == "MultiPolygon"
+
+
+def test_simplify_tolerance_reduces_vertices():
+    y, x = np.mgrid[0:60, 0:60]
+    mask = np.hypot(x - 30, y - 30) < 25
+    full = mask_to_geojson(mask, UNIT)
+    simple = mask_to_geojson(mask, UNIT, simplify_tolerance=1.5)
+    assert len(simple["coordinates"][0]) < len(full["coordinates"][0])
+    assert mask_to_geojson(np.zeros((3, 3), dtype=bool), UNIT) is None
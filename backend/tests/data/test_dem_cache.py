@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+from app.data.dem_cache import DemTileCache, level_for_cell_size, tile_bounds, tile_cell_deg, tile_range
+from app.data.usgs_client import USGSClient
+
+
+def _tile(value, px=4):
+    return np.full((px, px), value, dtype=np.float32)
+
+
+def test_tile_grid_covers_bbox():
+    z = 12
+    tx0, ty0, tx1, ty1 = tile_range(-97.51, 35.19, -97.49, 35.21, z)
+    west, _, _, north = tile_bounds(z, tx0, ty0)
+    _, south, east, _ = tile_bounds(z, tx1, ty1)
+    assert west <= -97.51 and east >= -97.49
+    assert south <= 35.19 and north >= 35.21
+    assert tile_cell_deg(level_for_cell_size(2.7e-4, 256), 256) <= 2.7e-4
+    assert tile_cell_deg(level_for_cell_size(2.7e-4, 256) - 1, 256) > 2.7e-4
+
+
+def test_memory_tier_is_byte_bounded_lru():
+    cache = DemTileCache(memory_bytes=3 * _tile(0).nbytes, eviction="lru")
+    for i in range(3):
+        cache.put((1, i, 0), _tile(i))
+    cache.get((1, 0, 0))  # refresh, so (1, 1, 0) is least recent
+    cache.put((1, 3, 0), _tile(3))
+    assert cache.get((1, 1, 0)) is None
+    assert cache.get((1, 0, 0)) is not None
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["memory_bytes"] <= cache.memory_bytes
+
+
+def test_fifo_ignores_hits():
+    cache = DemTileCache(memory_bytes=3 * _tile(0).nbytes, eviction="fifo")
+    for i in range(3):
+        cache.put((1, i, 0), _tile(i))
+    cache.get((1, 0, 0))
+    cache.put((1, 3, 0), _tile(3))
+    assert cache.get((1, 0, 0)) is None
+
+
+def test_disk_tier_round_trip(tmp_path):
+    tile = _tile(5.5)
+    tile[0, 0] = np.nan
+    DemTileCache(cache_dir=str(tmp_path)).put((3, 1, 2), tile)
+    fresh = DemTileCache(cache_dir=str(tmp_path))
+    loaded = fresh.get((3, 1, 2))
+    np.testing.assert_array_equal(loaded, tile)
+    assert loaded.dtype == np.float32
+    assert fresh.get((3, 1, 2)) is not None
+    assert fresh.stats()["disk_hits"] == 1 and fresh.stats()["memory_hits"] == 1
+
+
+def test_unknown_eviction_policy():
+    with pytest.raises(ValueError):
+        DemTileCache(eviction="random")
+
+
+def test_tiled_fetch_reuses_cached_tiles(monkeypatch):
+    cache = DemTileCache()
+    client = USGSClient(tile_cache=cache)
+    fetched = []
+
+    def fake_fetch_tile(key):
+        fetched.append(key)
+        return np.full((client.tile_px, client.tile_px), 100.0 + key[1], dtype=np.float32)
+
+    monkeypatch.setattr(client, "_fetch_tile", fake_fetch_tile)
+    dem = client.fetch_dem(35.2, -97.5, 1500)
+    assert fetched
+    a, _, c, _, e, f = dem.transform_list
+    arr = dem.data
+    assert arr.dtype == np.float32
+    assert a == -e
+    # Cropped mosaic covers the requested bbox
+    assert c <= -97.5 - 1500 / 91000 and f >= 35.2 + 1500 / 111320
+    assert c + arr.shape[1] * a >= -97.5 + 1500 / 91000
+    assert arr.shape[0] >= 100
+
+    n_fetched = len(fetched)
+    client.fetch_dem(35.2, -97.5, 1500)
+    assert len(fetched) == n_fetched
+    assert cache.stats()["memory_hits"] == n_fetched
+
+
+def test_tiled_dem_holds_only_the_bbox_window(monkeypatch):
+    client = USGSClient(tile_cache=DemTileCache())
+    n = client.tile_px
+    # Every cell holds its global column on the tile grid
+    monkeypatch.setattr(
+        client, "_fetch_tile",
+        lambda key: np.tile(np.arange(key[1] * n, (key[1] + 1) * n, dtype=np.float32), (n, 1)),
+    )
+    dem = client.fetch_dem(35.2, -97.5, 1500, max_pixels=40_000)
+    assert dem.data.base is None and dem.data.size <= 40_000
+    first = round((dem.transform.c + 180.0) / dem.transform.a)
+    np.testing.assert_array_equal(dem.data[0], np.arange(first, first + dem.shape[1]))
@@ -0,0 +1,29 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.data.dem_provider import SyntheticDEMClient, default_dem_client
+from app.data.usgs_client import USGSClient
+
+
+def test_synthetic_client_is_deterministic_and_honors_resolution():
+    dem = SyntheticDEMClient(terrain="valleys", seed=4).fetch_dem(35.2, -80.6, 500, cell_size_m=20)
+    assert dem.shape == (50, 50)
+    assert dem.source == "synthetic_valleys_4"
+    assert dem.resolution_m[0] == pytest.approx(20, rel=0.01)
+    again = asyncio.run(SyntheticDEMClient(terrain="valleys", seed=4).fetch_dem_async(35.2, -80.6, 500, cell_size_m=20))
+    np.testing.assert_array_equal(dem.data, again.data)
+    assert dem.transform == again.transform
+
+
+def test_default_client_follows_dem_provider(monkeypatch):
+    assert type(default_dem_client()) is USGSClient
+    monkeypatch.setattr(settings, "dem_provider", "synthetic")
+    synthetic = default_dem_client()
+    assert isinstance(synthetic, SyntheticDEMClient)
+    assert synthetic.tile_cache is None and synthetic.base_url == "synthetic://fractal/0"
+    monkeypatch.setattr(settings, "dem_provider", "elsewhere")
+    with pytest.raises(ValueError):
+        default_dem_client()
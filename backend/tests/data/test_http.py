@@ -0,0 +1,13 @@
+from app.data.http import close_http_clients, get_http_client
+
+
+def test_clients_are_pooled_per_host():
+    a = get_http_client("https://hydro.nationalmap.gov/arcgis/rest/services/nhd")
+    b = get_http_client("https://hydro.nationalmap.gov/other/path")
+    c = get_http_client("https://hazards.fema.gov/gis")
+    assert a is b
+    assert a is not c
+    close_http_clients()
+    assert a.is_closed and c.is_closed
+    assert get_http_client("https://hydro.nationalmap.gov/x") is not a
+    close_http_clients()
@@ -0,0 +1,71 @@
+import asyncio
+import threading
+import time
+
+from app.data.singleflight import SingleFlight, bbox_key
+
+
+def test_concurrent_sync_callers_share_one_fetch():
+    flights = SingleFlight()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"features": [1]}
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(flights.do(("svc", 1), fetch))) for _ in range(4)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+    assert flights.stats() == {"executed": {"svc": 1}, "saved": {"svc": 3}}
+    # Completed flights are not cached
+    flights.do(("svc", 1), fetch)
+    assert len(calls) == 2
+
+
+def test_errors_reach_every_waiter():
+    flights = SingleFlight()
+    errors = []
+
+    def fetch():
+        time.sleep(0.1)
+        raise RuntimeError("upstream down")
+
+    def call():
+        try:
+            flights.do(("svc",), fetch)
+        except RuntimeError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(errors) == 3
+
+
+def test_async_callers_share_one_fetch():
+    flights = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return 42
+
+    async def run():
+        key = bbox_key("svc", -80.6, 35.2, -80.5, 35.3)
+        same = bbox_key("svc", -80.6 + 1e-12, 35.2, -80.5, 35.3)
+        return await asyncio.gather(*(flights.do_async(k, fetch) for k in [key, same, key]))
+
+    assert asyncio.run(run()) == [42, 42, 42]
+    assert len(calls) == 1
+    assert flights.saved["svc"] == 2
@@ -0,0 +1,119 @@
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+import numpy as np
+import pytest
+from rasterio.io import MemoryFile
+from rasterio.transform import from_bounds
+
+from app.core.config import settings
+from app.data.usgs_client import USGSClient
+
+
+def _export_image(request: httpx.Request) -> httpx.Response:
+    """exportImage stand-in: every cell holds the longitude of its center."""
+    params = {k: v[0] for k, v in parse_qs(urlsplit(str(request.url)).query).items()}
+    if request.url.path.endswith("exportImage"):
+        href = httpx.URL("https://tiffs.example/img", params={"bbox": params["bbox"], "size": params["size"]})
+        return httpx.Response(200, json={"href": str(href)})
+    minx, miny, maxx, maxy = map(float, params["bbox"].split(","))
+    width, height = map(int, params["size"].split(","))
+    cell = (maxx - minx) / width
+    lons = minx + (np.arange(width) + 0.5) * cell
+    arr = np.tile(lons, (height, 1)).astype(np.float32)
+    with MemoryFile() as memfile:
+        with memfile.open(
+            driver="GTiff", width=width, height=height, count=1, dtype="float32", crs="EPSG:4326",
+            transform=from_bounds(minx, miny, maxx, maxy, width, height), nodata=-9999,
+        ) as dst:
+            dst.write(arr, 1)
+        return httpx.Response(200, content=memfile.read())
+
+
+@pytest.fixture
+def usgs(monkeypatch):
+    monkeypatch.setattr(settings, "dem_cache_enabled", False)
+    requests = []
+    transport = httpx.MockTransport(lambda r: requests.append(r) or _export_image(r))
+    client = httpx.Client(transport=transport)
+    monkeypatch.setattr("app.data.usgs_client.get_http_client", lambda url: client)
+    usgs = USGSClient()
+    usgs.requests = requests
+    return usgs
+
+
+def test_default_request_is_fixed_size(usgs):
+    dem = usgs.fetch_dem(35.2, -80.6, 500)
+    assert dem.shape == (100, 100)
+    assert dem.source == "usgs_3dep" and dem.complete
+
+
+def test_cell_size_sets_request_size(usgs):
+    dem = usgs.fetch_dem(35.2, -80.6, 500, cell_size_m=20)
+    assert dem.shape == (50, 50)
+    dx, dy = dem.resolution_m
+    assert dx == pytest.approx(20, rel=0.01) and dy == pytest.approx(20, rel=0.01)
+
+
+def test_pixel_budget_coarsens_resolution(usgs):
+    dem = usgs.fetch_dem(35.2, -80.6, 500, cell_size_m=1, max_pixels=10000)
+    assert dem.data.size <= 10000
+    assert dem.resolution_m[1] == pytest.approx(10, rel=0.05)
+
+
+def test_oversized_requests_are_split_and_stitched(usgs, monkeypatch):
+    monkeypatch.setattr(settings, "usgs_max_image_px", 32)
+    dem = usgs.fetch_dem(35.2, -80.6, 500, cell_size_m=12.5)
+    assert dem.shape == (80, 80)
+    assert len(usgs.requests) == 2 * 9
+    # Stitched blocks continue the same cell grid: every cell holds its own center longitude
+    centers = dem.transform.c + (np.arange(80) + 0.5) * dem.transform.a
+    np.testing.assert_allclose(dem.data, np.tile(centers, (80, 1)), atol=1e-5)
+
+
+def test_blocks_download_concurrently_and_failures_stay_nan(monkeypatch):
+    import time
+
+    monkeypatch.setattr(settings, "dem_cache_enabled", False)
+    monkeypatch.setattr(settings, "usgs_max_image_px", 32)
+    monkeypatch.setattr(settings, "dem_fetch_concurrency", 9)
+
+    def handler(request):
+        time.sleep(0.1)
+        if request.url.path.endswith("exportImage") and "size=16%2C32" in str(request.url):
+            return httpx.Response(500)
+        return _export_image(request)
+
+    client = httpx.Client(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr("app.data.usgs_client.get_http_client", lambda url: client)
+    start = time.perf_counter()
+    dem = USGSClient().fetch_dem(35.2, -80.6, 500, cell_size_m=12.5)
+    # 9 blocks x 2 requests of 0.1 s each would take 1.8 s one after another
+    assert time.perf_counter() - start < 1.0
+    assert dem.shape == (80, 80)
+    assert np.isnan(dem.data[:32, 64:]).all()
+    assert not np.isnan(dem.data[:, :64]).any()
+    assert not dem.complete
+
+
+def test_async_blocks_respect_per_tile_deadline(monkeypatch):
+    import asyncio
+
+    monkeypatch.setattr(settings, "dem_cache_enabled", False)
+    monkeypatch.setattr(settings, "usgs_max_image_px", 32)
+    monkeypatch.setattr(settings, "dem_tile_timeout_s", 0.5)
+
+    async def handler(request):
+        slow = request.url.path.endswith("exportImage") and "size=32%2C16" in str(request.url)
+        await asyncio.sleep(5 if slow else 0.05)
+        return _export_image(request)
+
+    async def run():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr("app.data.usgs_client.get_async_http_client", lambda url: client)
+        return await USGSClient().fetch_dem_async(35.2, -80.6, 500, cell_size_m=12.5)
+
+    dem = asyncio.run(run())
+    assert dem.shape == (80, 80)
+    assert np.isnan(dem.data[64:, :64]).all()
+    assert not np.isnan(dem.data[:64]).any()
@@ -1,4 +1,41 @@
+from app.models.elevation import ContourOutput
+
+
 def test_elevation_model_get_contours(elevation_model):
     contours = elevation_model.get_contours(35.2, -80.6, 500, 2)
     assert contours.type == "FeatureCollection"
     assert isinstance(contours.features, list)
+
+
+def test_contour_output_stage_reports_reduction(elevation_model):
+    full = elevation_model.get_contours(35.2, -80.6, 500, 2)
+    output = ContourOutput.for_request(35.2, zoom=14)
+    assert output.tolerance_m > 0 and output.precision == 5
+    simplified = elevation_model.get_contours(35.2, -80.6, 500, 2, output)
+    props = simplified.properties
+    assert props["vertex_count_in"] == sum(len(f["geometry"]["coordinates"]) for f in full.features)
+    assert props["vertex_count_out"] == sum(len(f["geometry"]["coordinates"]) for f in simplified.features)
+    assert props["vertex_count_out"] <= props["vertex_count_in"]
+    assert props["precision_decimals"] == 5
+    assert full.properties == {}
+
+
+def test_bbox_contours_are_clipped_to_the_box(elevation_model):
+    bbox = (-80.5996, 35.2992, -80.5992, 35.2999)
+    contours = elevation_model.get_contours_for_bbox(*bbox, interval_m=2)
+    assert contours.features
+    for feature in contours.features:
+        coords = feature["geometry"]["coordinates"]
+        assert len(coords) >= 2
+        for x, y in coords:
+            assert bbox[0] <= x <= bbox[2] and bbox[1] <= y <= bbox[3]
+
+    output = ContourOutput.for_request(35.3, zoom=14)
+    simplified = elevation_model.get_contours_for_bbox(*bbox, interval_m=2, output=output)
+    props = simplified.properties
+    assert props["vertex_count_in"] == sum(len(f["geometry"]["coordinates"]) for f in contours.features)
+    assert props["vertex_count_out"] == sum(len(f["geometry"]["coordinates"]) for f in simplified.features)
+    for feature in simplified.features:
+        for x, y in feature["geometry"]["coordinates"]:
+            assert bbox[0] <= x <= bbox[2] and bbox[1] <= y <= bbox[3]
+            assert (x, y) == (round(x, output.precision), round(y, output.precision))
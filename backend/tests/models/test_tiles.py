@@ -0,0 +1,48 @@
+import threading
+import time
+
+from app.models.tiles import VectorTileModel
+
+
+def test_concurrent_misses_render_a_tile_once(elevation_model):
+    model = VectorTileModel(elevation_model=elevation_model)
+    renders = []
+
+    def slow_features(z, x, y, interval_m):
+        renders.append((z, x, y))
+        time.sleep(0.2)
+        return []
+
+    model._flood_features = slow_features
+    tiles = []
+    threads = [
+        threading.Thread(target=lambda: tiles.append(model.get_tile("flood", 12, 1000, 1000)))
+        for _ in range(4)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert renders == [(12, 1000, 1000)]
+    assert len(tiles) == 4 and all(tile is tiles[0] for tile in tiles)
+    assert model.renders.stats() == {"executed": {"flood": 1}, "saved": {"flood": 3}}
+
+
+def test_watershed_tiles_carry_raw_values_routed_past_the_tile_edge():
+    from app.core import mvt
+    from app.core.geo_utils import meters_per_degree_lon
+    from app.data.dem_provider import SyntheticDEMClient
+    from app.models.watershed import WatershedModel
+
+    class RecordingDEMClient(SyntheticDEMClient):
+        def fetch_dem(self, lat, lon, radius_m, **kwargs):
+            self.radius_m = radius_m
+            return super().fetch_dem(lat, lon, radius_m, **kwargs)
+
+    dems = RecordingDEMClient(terrain="valleys", seed=3)
+    model = VectorTileModel(watershed_model=WatershedModel(usgs_client=dems))
+    features = model._watershed_features(14, 4523, 6478, 5.0)
+    assert features and all(set(f["properties"]) == {"area_ha", "tc_min"} for f in features)
+    minx, miny, maxx, maxy = mvt.tile_bounds(14, 4523, 6478)
+    # The DEM reaches at least half a tile past every edge
+    assert dems.radius_m > (maxx - minx) * meters_per_degree_lon((miny + maxy) / 2.0)
@@ -0,0 +1,241 @@
+import numpy as np
+import pytest
+from app.models.watershed import FlowAccumulation
+
+
+def test_get_flow_accumulation_returns_rasters(watershed_model):
+    acc = watershed_model.get_flow_accumulation(35.2, -80.6, 500)
+    assert isinstance(acc, FlowAccumulation)
+    assert acc.cell_count.shape == acc.area_m2.shape == (20, 20)
+    assert acc.cell_count[10, 10] == 324
+    assert np.all(acc.area_m2 > 0)
+
+
+def test_routing_products_are_cached(watershed_model):
+    first = watershed_model.get_flow_accumulation(35.2, -80.6, 500)
+    second = watershed_model.get_flow_accumulation(35.2, -80.6, 500)
+    assert first is second
+
+
+def test_routing_cache_keys_on_dem_contents(watershed_fixture_dem):
+    from app.core.dem import DEM
+    from app.models.watershed import WatershedModel
+
+    bowl = DEM.from_dict(watershed_fixture_dem)
+    tilted = DEM(data=bowl.data + np.arange(bowl.shape[1], dtype=np.float32), transform=bowl.transform)
+    dems = iter([bowl, tilted, bowl])
+
+    class MockUSGS:
+        def fetch_dem(self, lat, lon, radius_m, **kwargs):
+            return next(dems)
+
+    model = WatershedModel(usgs_client=MockUSGS())
+    # Same source ("unknown"), bbox and shape, different elevations
+    first = model.get_flow_accumulation(35.2, -80.6, 500)
+    assert model.get_flow_accumulation(35.2, -80.6, 500) is not first
+    assert model.get_flow_accumulation(35.2, -80.6, 500) is first
+
+
+def test_incomplete_dems_are_not_cached(watershed_fixture_dem):
+    from app.core.dem import DEM
+    from app.models.watershed import WatershedModel
+
+    holed = DEM.from_dict(watershed_fixture_dem)
+    holed.data[:5, :5] = np.nan
+    holed.complete = False
+
+    class MockUSGS:
+        def fetch_dem(self, lat, lon, radius_m, **kwargs):
+            return holed
+
+    model = WatershedModel(usgs_client=MockUSGS())
+    assert model.get_flow_accumulation(35.2, -80.6, 500) is not model.get_flow_accumulation(35.2, -80.6, 500)
+    assert not model._routing_cache
+
+
+def test_routing_cache_is_bounded_in_bytes(watershed_model, monkeypatch):
+    from app.core.config import settings
+
+    watershed_model.get_flow_accumulation(35.2, -80.6, 500)
+    (products,) = watershed_model._routing_cache.values()
+    assert products.nbytes > products.grid.arr.nbytes
+    monkeypatch.setattr(settings, "routing_cache_bytes", products.grid.arr.nbytes)
+    first = watershed_model.get_flow_accumulation(35.2, -80.6, 500, condition_dem=True)
+    assert first is not watershed_model.get_flow_accumulation(35.2, -80.6, 500, condition_dem=True)
+    assert not watershed_model._routing_cache
+
+
+def test_time_of_concentration_raster(watershed_model):
+    tc = watershed_model.get_time_of_concentration(35.2, -80.6, 500)
+    assert tc.tc_min[10, 10] > 0
+    assert tc.max_elevation[10, 10] == 131
+    assert tc.longest_path_m[10, 10] == tc.longest_path_m.max()
+    assert np.all(tc.slope >= 0.001)
+
+
+def test_kirpich_is_elementwise_and_zero_without_length_or_slope():
+    from app.models.watershed import _time_of_concentration_kirpich
+
+    tc = _time_of_concentration_kirpich(np.array([1000.0, 0.0, 500.0]), np.array([0.01, 0.05, 0.0]))
+    assert tc[0] == pytest.approx(0.0078 * 1000 ** 0.77 * 0.01 ** -0.385)
+    assert tc[1] == 0.0 and tc[2] == 0.0
+
+
+def test_condition_dem_routes_the_bowl_over_its_rim(watershed_model):
+    raw = watershed_model.get_flow_accumulation(35.2, -80.6, 500)
+    conditioned = watershed_model.get_flow_accumulation(35.2, -80.6, 500, condition_dem=True)
+    assert conditioned is not raw
+    assert conditioned.cell_count[10, 10] < raw.cell_count[10, 10]
+    assert conditioned.cell_count[10, 19] + conditioned.cell_count[19, 10] > 300
+
+
+def test_parallel_routing_matches_serial(monkeypatch, caplog):
+    from app.core.config import settings
+    from app.core.parallel import shutdown_process_pool
+    from app.data.dem_provider import SyntheticDEMClient
+    from app.models.watershed import WatershedModel
+
+    client = SyntheticDEMClient(terrain="valleys", seed=3)
+    serial = WatershedModel(usgs_client=client).get_time_of_concentration(35.2, -80.6, 1000)
+    shutdown_process_pool()
+    monkeypatch.setattr(settings, "routing_workers", 2)
+    monkeypatch.setattr(settings, "routing_parallel_min_cells", 0)
+    try:
+        model = WatershedModel(usgs_client=client)
+        parallel = model.get_time_of_concentration(35.2, -80.6, 1000)
+        (products,) = model._routing_cache.values()
+        assert products._accumulation is not None and products._labels is not None
+    finally:
+        shutdown_process_pool()
+    assert "computing serially" not in caplog.text
+    np.testing.assert_array_equal(parallel.tc_min, serial.tc_min)
+    np.testing.assert_array_equal(parallel.longest_path_m, serial.longest_path_m)
+
+
+def test_parallel_routing_falls_back_to_serial(watershed_model, monkeypatch, caplog):
+    from app.core.config import settings
+    import app.models.watershed as watershed
+
+    def broken_pool():
+        raise OSError("no processes")
+
+    monkeypatch.setattr(settings, "routing_workers", 2)
+    monkeypatch.setattr(settings, "routing_parallel_min_cells", 0)
+    monkeypatch.setattr(watershed, "get_process_pool", broken_pool)
+    acc = watershed_model.get_flow_accumulation(35.2, -80.6, 500)
+    assert "computing serially" in caplog.text
+    assert acc.cell_count[10, 10] == 324
+
+
+def test_delineate_watershed_traces_basin_outline(watershed_model):
+    ws = watershed_model.delineate_watershed(35.2, -80.6, 500)
+    assert ws.geometry["type"] == "Polygon"
+    ring = ws.geometry["coordinates"][0]
+    assert len(ring) == 5  # the 18x18 interior basin is a rectangle of cell edges
+    cells = watershed_model.get_flow_accumulation(35.2, -80.6, 500)
+    assert abs(ws.properties["area_ha"] - cells.area_m2[10, 10] / 10000) < 0.5
+
+
+def _crater_client(requests=None):
+    """Synthetic client sampling a crater (rim 600 m out) at the requested bbox and resolution."""
+    from affine import Affine
+    from app.core.dem import DEM
+    from app.core.geo_utils import bbox_from_center, meters_per_degree_lat, meters_per_degree_lon
+    from app.data.dem_provider import SyntheticDEMClient
+
+    class CraterClient(SyntheticDEMClient):
+        def _fetch_dem(self, lat, lon, radius_m, res):
+            if requests is not None:
+                requests.append((lat, lon, radius_m, res))
+            minx, miny, maxx, maxy = bbox_from_center(lat, lon, radius_m)
+            dx, dy = (maxx - minx) / res.width, (maxy - miny) / res.height
+            lons = minx + dx * (np.arange(res.width) + 0.5)
+            lats = maxy - dy * (np.arange(res.height) + 0.5)
+            north = (lats[:, None] - 35.2013) * meters_per_degree_lat(35.2)
+            east = (lons[None, :] + 80.6017) * meters_per_degree_lon(35.2)
+            arr = 700.0 - np.abs(np.hypot(north, east) - 600.0)
+            return DEM(data=arr.astype(np.float32), transform=Affine(dx, 0.0, minx, 0.0, -dy, maxy))
+
+    return CraterClient()
+
+
+def test_batch_delineation_matches_single_point():
+    from app.models.watershed import WatershedModel
+
+    model = WatershedModel(usgs_client=_crater_client())
+    single = model.delineate_watershed(35.2, -80.6, 1000)
+    # The second point widens the batch DEM; its cells stay at the single-call resolution
+    batch = model.delineate_watersheds([(35.2, -80.6), (35.2, -80.555)], 1000)
+    props = batch.features[0]["properties"]
+    assert abs(props["area_ha"] - single.properties["area_ha"]) < 0.01 * single.properties["area_ha"]
+    assert abs(props["slope"] - single.properties["slope"]) < 0.01 * single.properties["slope"]
+    cell_deg = 2 * 1000 / 100 / 111000
+    assert abs(props["outlet_lat"] - single.properties["outlet_lat"]) < cell_deg
+    assert abs(props["outlet_lon"] - single.properties["outlet_lon"]) < cell_deg
+
+
+def test_batch_splits_points_beyond_the_pixel_budget(monkeypatch):
+    import asyncio
+    from app.core.config import settings
+    from app.models.watershed import WatershedModel
+
+    requests = []
+    model = WatershedModel(usgs_client=_crater_client(requests))
+    # 200 x 200 cells of 20 m: points more than 2 km apart need separate DEMs
+    monkeypatch.setattr(settings, "dem_max_pixels", 40000)
+    points = [(35.2, -80.6), (35.2005, -80.6005), (35.2, -80.555)]
+    batch = asyncio.run(model.delineate_watersheds_async(points, 1000))
+    assert len(requests) == 2
+    assert all(res.width * res.height <= 40000 for *_, res in requests)
+    assert [f["properties"]["lat"] for f in batch.features] == [p[0] for p in points]
+    assert batch.properties == {"point_count": 3, "basin_count": 2}
+
+
+def test_async_grid_overlaps_slow_fetches(watershed_fixture_dem):
+    import asyncio
+    import time
+    from app.models.watershed import WatershedModel
+
+    class SlowAsyncUSGS:
+        async def fetch_dem_async(self, lat, lon, radius_m, **kwargs):
+            await asyncio.sleep(0.3)
+            return watershed_fixture_dem
+
+    model = WatershedModel(usgs_client=SlowAsyncUSGS())
+
+    async def run():
+        return await asyncio.gather(*(
+            model.compute_watershed_grid_async(-80.6015, 35.2, -80.5995, 35.2018, 50) for _ in range(5)
+        ))
+
+    start = time.perf_counter()
+    grids = asyncio.run(run())
+    assert time.perf_counter() - start < 1.0
+    assert all(g.features == grids[0].features for g in grids)
+    assert grids[0].metadata["point_count"] > 0
+
+
+def test_watershed_raster_matches_grid_features(watershed_model):
+    bbox = (-80.65, 35.15, -80.55, 35.25)
+    grid = watershed_model.compute_watershed_grid(*bbox, grid_spacing_m=200)
+    raster = watershed_model.compute_watershed_raster(*bbox, grid_spacing_m=200)
+    assert raster.metadata == grid.metadata
+    area = raster.bands["area_ha"]
+    assert np.count_nonzero(~np.isnan(area)) == len(grid.features)
+    # North-up: every rectangle's center falls in the cell holding its values
+    a, _, c, _, e, f = raster.transform
+    for feature in grid.features:
+        lon, lat = np.mean(feature["geometry"]["coordinates"][0][:4], axis=0)
+        row, col = int((lat - f) / e), int((lon - c) / a)
+        assert round(float(area[row, col]), 2) == feature["properties"]["area_ha"]
+
+
+def test_streamed_grid_matches_grid_and_ends_with_metadata(watershed_model):
+    bbox = (-80.65, 35.15, -80.55, 35.25)
+    grid = watershed_model.compute_watershed_grid(*bbox, grid_spacing_m=200)
+    records = list(watershed_model.stream_watershed_grid(*bbox, grid_spacing_m=200, chunk_size=7))
+    *features, last = records
+    assert last == {"type": "Metadata", "metadata": grid.metadata}
+    assert [f["geometry"] for f in features] == [f["geometry"] for f in grid.features]
+    assert [f["properties"]["area_ha"] for f in features] == [f["properties"]["area_ha"] for f in grid.features]
+    assert "jet_value_area" not in features[0]["properties"]
@@ -0,0 +1,15 @@
+from benchmarks.suite import CASES, Result, regressions, run_suite
+
+
+def test_suite_runs_every_case_offline():
+    results = run_suite([40], [100.0], list(CASES), repeat=1, log=lambda line: None)
+    assert {r.case for r in results} == set(CASES)
+    assert all(r.time_s >= 0 and r.peak_mb >= 0 for r in results)
+
+
+def test_regressions_beyond_threshold_are_flagged():
+    baseline = {"flow_direction_d8[1000]": {"time_s": 0.1, "peak_mb": 10.0}}
+    slow = Result("flow_direction_d8", 1000, None, 0.2, 10.0)
+    noisy = Result("flow_direction_d8", 1000, None, 0.11, 10.5)
+    assert regressions([slow], baseline, threshold=0.25) == ["flow_direction_d8[1000]: time 0.1000 s -> 0.2000 s"]
+    assert regressions([noisy], baseline, threshold=0.25) == []